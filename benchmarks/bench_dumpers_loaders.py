@@ -0,0 +1,204 @@
+"""Benchmark each dumper and loader across array sizes, data types, dimensions, and tree shapes.
+
+For every combination of parameters and format, the container is dumped and then loaded, each in
+a fresh process, and the wall time, the peak resident set size (RSS) of the process, and the size
+of the output are reported. The peak RSS of a dump includes creating the container in memory.
+
+The arrays are dumped with the data type of the case, which is checked after the trusted load of
+each format that stores data types, i.e., all but plain YAML.
+
+Each container is loaded twice, with pydantic validation, which converts the arrays to the nested
+lists of the models, and with ``validate=False``, which keeps the arrays that were read, as for
+trusted files. The time and peak RSS of the latter are reported as "trusted".
+
+Run with, e.g.::
+
+    poetry run python benchmarks/bench_dumpers_loaders.py --sizes 1000 1000000 --ndims 1 3 \
+        --fanouts 1 4 --depth 2 --json results.json
+"""
+
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from containers import count_objects, create_container, create_models, create_schemaview
+
+from linkml_arrays.dumpers import (
+    Hdf5Dumper,
+    YamlDumper,
+    YamlHdf5Dumper,
+    YamlNumpyDumper,
+    ZarrDirectoryStoreDumper,
+)
+from linkml_arrays.loaders import (
+    Hdf5Loader,
+    YamlArrayFileLoader,
+    YamlLoader,
+    ZarrDirectoryStoreLoader,
+)
+
+FORMATS = ("yaml", "yaml_base64", "yaml_numpy", "yaml_hdf5", "hdf5", "zarr")
+YAML_FILE = "container.yaml"
+HDF5_FILE = "container.h5"
+ZARR_STORE = "container.zarr"
+ARRAY_DIR = "arrays"
+
+
+def _dump(format: str, container, schemaview):
+    """Dump the container in the format to the current working directory."""
+    if format in ("yaml", "yaml_base64"):
+        array_encoding = "base64" if format == "yaml_base64" else None
+        yaml_str = YamlDumper().dumps(container, schemaview, array_encoding=array_encoding)
+        Path(YAML_FILE).write_text(yaml_str)
+    elif format in ("yaml_numpy", "yaml_hdf5"):
+        dumper = YamlNumpyDumper() if format == "yaml_numpy" else YamlHdf5Dumper()
+        Path(YAML_FILE).write_text(dumper.dumps(container, schemaview, output_dir=ARRAY_DIR))
+    elif format == "hdf5":
+        Hdf5Dumper().dumps(container, schemaview, output_file_path=HDF5_FILE)
+    else:
+        ZarrDirectoryStoreDumper().dumps(container, schemaview, output_file_path=ZARR_STORE)
+
+
+def _load(format: str, target_class, schemaview, validate: bool = True):
+    """Load the container in the format from the current working directory."""
+    if format in ("yaml", "yaml_base64"):
+        yaml_str = Path(YAML_FILE).read_text()
+        return YamlLoader().load(yaml_str, target_class, schemaview, validate=validate)
+    if format in ("yaml_numpy", "yaml_hdf5"):
+        yaml_str = Path(YAML_FILE).read_text()
+        return YamlArrayFileLoader().load(yaml_str, target_class, schemaview, validate=validate)
+    if format == "hdf5":
+        return Hdf5Loader().load(HDF5_FILE, target_class, schemaview, validate=validate)
+    return ZarrDirectoryStoreLoader().load(ZARR_STORE, target_class, schemaview, validate=validate)
+
+
+def _peak_rss_mb() -> float:
+    """Return the peak resident set size of the current process in MB."""
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes on Linux
+    return peak / 1e6 if sys.platform == "darwin" else peak / 1e3
+
+
+def _check_stored_dtype(format: str, container, dtype: str):
+    """Check that the arrays of a container loaded without validation have the case's data type.
+
+    Plain YAML stores numbers without a data type, so it is not checked.
+
+    Raises:
+        RuntimeError: If the root array was stored with another data type.
+    """
+    if format == "yaml":
+        return
+    stored = np.asarray(container.values).dtype
+    if stored != np.dtype(dtype):
+        raise RuntimeError(f"The {format} dump stored {stored} arrays instead of {dtype}.")
+
+
+def _run_case(case: dict, operation: str, workdir: str, repeat: int) -> dict:
+    """Run the dump, load, or trusted load of a benchmark case in the work directory and measure it.
+
+    This is run in a fresh process so that the peak RSS is that of the operation.
+    """
+    os.chdir(workdir)
+    params = (case["dtype"], case["ndim"], case["fanout"], case["depth"])
+    schemaview = create_schemaview(*params)
+    models = create_models(*params)
+    if operation == "dump":
+        container = create_container(
+            models, case["size"], case["dtype"], case["ndim"], case["fanout"]
+        )
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        if operation == "dump":
+            _dump(case["format"], container, schemaview)
+        else:
+            loaded = _load(case["format"], models[0], schemaview, validate=operation == "load")
+        times.append(time.perf_counter() - start)
+    if operation == "load_trusted":
+        _check_stored_dtype(case["format"], loaded, case["dtype"])
+    return {"time_s": min(times), "peak_rss_mb": _peak_rss_mb()}
+
+
+def _get_size_mb(path: Path) -> float:
+    """Return the total size of the files under the path in MB."""
+    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file()) / 1e6
+
+
+def _run_in_process(case: dict, operation: str, workdir: str, repeat: int) -> dict:
+    """Run the dump, load, or trusted load of a benchmark case in a fresh process."""
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        return executor.submit(_run_case, case, operation, workdir, repeat).result()
+
+
+def main():
+    """Run the benchmark for all combinations of the parameters and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--formats", nargs="+", default=list(FORMATS), choices=FORMATS)
+    parser.add_argument("--sizes", nargs="+", type=int, default=[1000, 100000])
+    parser.add_argument("--dtypes", nargs="+", default=["float64"])
+    parser.add_argument("--ndims", nargs="+", type=int, default=[2])
+    parser.add_argument("--fanouts", nargs="+", type=int, default=[2])
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=1, help="number of timed repetitions")
+    parser.add_argument("--json", type=Path, help="file to write the results to as JSON")
+    args = parser.parse_args()
+
+    header = (
+        f"{'format':<12}{'size':>9}{'dtype':>9}{'ndim':>5}{'objects':>8}"
+        f"{'dump (s)':>10}{'load (s)':>10}{'trusted':>10}"
+        f"{'dump RSS':>10}{'load RSS':>10}{'trusted':>10}{'output':>10}"
+    )
+    print(header)
+    print(f"{'':<43}{'':>20}{'(s)':>10}{'(MB)':>10}{'(MB)':>10}{'RSS (MB)':>10}{'(MB)':>10}")
+    results = []
+    for size, dtype, ndim, fanout, format in itertools.product(
+        args.sizes, args.dtypes, args.ndims, args.fanouts, args.formats
+    ):
+        case = dict(
+            format=format, size=size, dtype=dtype, ndim=ndim, fanout=fanout, depth=args.depth
+        )
+        with tempfile.TemporaryDirectory() as workdir:
+            dump = _run_in_process(case, "dump", workdir, args.repeat)
+            output_mb = _get_size_mb(Path(workdir))
+            load = _run_in_process(case, "load", workdir, args.repeat)
+            trusted = _run_in_process(case, "load_trusted", workdir, args.repeat)
+        result = dict(
+            case,
+            objects=count_objects(fanout, args.depth),
+            dump_time_s=dump["time_s"],
+            load_time_s=load["time_s"],
+            load_trusted_time_s=trusted["time_s"],
+            dump_peak_rss_mb=dump["peak_rss_mb"],
+            load_peak_rss_mb=load["peak_rss_mb"],
+            load_trusted_peak_rss_mb=trusted["peak_rss_mb"],
+            output_mb=output_mb,
+        )
+        results.append(result)
+        print(
+            f"{format:<12}{size:>9}{dtype:>9}{ndim:>5}{result['objects']:>8}"
+            f"{result['dump_time_s']:>10.3f}{result['load_time_s']:>10.3f}"
+            f"{result['load_trusted_time_s']:>10.3f}"
+            f"{result['dump_peak_rss_mb']:>10.1f}{result['load_peak_rss_mb']:>10.1f}"
+            f"{result['load_trusted_peak_rss_mb']:>10.1f}"
+            f"{result['output_mb']:>10.2f}"
+        )
+
+    if args.json is not None:
+        args.json.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
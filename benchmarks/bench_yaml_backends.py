@@ -0,0 +1,58 @@
+"""Benchmark writing and reading large YAML manifests with each YAML backend.
+
+Run with::
+
+    poetry run python benchmarks/bench_yaml_backends.py --objects 10000
+"""
+
+import argparse
+import timeit
+
+from linkml_arrays.yaml_backend import has_libyaml, yaml_dump, yaml_load
+
+
+def _create_manifest(num_objects: int) -> dict:
+    """Create a manifest like that of YamlNumpyDumper with many objects with array files."""
+    return {
+        "name": "my_container",
+        "series": {
+            f"series_{i}": {
+                "name": f"series_{i}",
+                "reference_date": "2020-01-01",
+                "conversion_factor": 1000.0,
+                "values": {
+                    "source": [{"file": f"./out/series_{i}.values.npy", "format": "numpy"}],
+                },
+            }
+            for i in range(num_objects)
+        },
+    }
+
+
+def main():
+    """Time dumping and loading the manifest with each available YAML backend."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--objects", type=int, default=10000, help="number of objects")
+    parser.add_argument("--repeat", type=int, default=3, help="number of repetitions")
+    args = parser.parse_args()
+
+    backends = ["pyyaml", "ruamel"]
+    if has_libyaml():
+        backends.insert(0, "libyaml")
+
+    manifest = _create_manifest(args.objects)
+    yaml_str = yaml_dump(manifest, "pyyaml")
+    print(f"manifest with {args.objects} objects, {len(yaml_str) / 1e6:.1f} MB of YAML")
+    print(f"{'backend':<10}{'dump (s)':>12}{'load (s)':>12}")
+    for backend in backends:
+        dump_time = min(
+            timeit.repeat(lambda: yaml_dump(manifest, backend), number=1, repeat=args.repeat)
+        )
+        load_time = min(
+            timeit.repeat(lambda: yaml_load(yaml_str, backend), number=1, repeat=args.repeat)
+        )
+        print(f"{backend:<10}{dump_time:>12.3f}{load_time:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
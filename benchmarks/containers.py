@@ -0,0 +1,133 @@
+"""Generate LinkML schemas, pydantic models, and containers of arrays for benchmarks.
+
+A container is a tree of objects. The object at each level of the tree has a "name" identifier,
+a "values" array slot, and ``fanout`` inlined children at the next level, down to ``depth``
+levels below the root. The arrays have the given number of elements, data type, and number of
+dimensions. The pydantic models type the arrays as nested lists, like those generated by
+gen-pydantic, e.g., ``tests/array_classes_lol.py``.
+
+LinkML has no 32-bit types, so the ranges of float32 and int32 arrays are "float" and "integer",
+like those of float64 and int64 arrays. Containers are therefore constructed without validation,
+with NumPy arrays of the requested data type, which the dumpers write as they are.
+"""
+
+from typing import Any, List, Optional, Tuple, Type
+
+import numpy as np
+from linkml_runtime import SchemaView
+from linkml_runtime.linkml_model import SchemaDefinition
+from linkml_runtime.loaders import yaml_loader
+from pydantic import BaseModel, ConfigDict, create_model
+
+DTYPE_RANGES = {
+    "float64": ("float", float),
+    "float32": ("float", float),
+    "int64": ("integer", int),
+    "int32": ("integer", int),
+}
+
+
+class BenchmarkBaseModel(BaseModel):
+    """Base model for benchmark containers, configured like the generated test models."""
+
+    model_config = ConfigDict(
+        validate_assignment=True,
+        validate_default=True,
+        extra="forbid",
+        arbitrary_types_allowed=True,
+        use_enum_values=True,
+        strict=False,
+    )
+
+
+def get_shape(size: int, ndim: int) -> Tuple[int, ...]:
+    """Return a shape with ndim dimensions of about equal length and about size elements."""
+    length = max(1, round(size ** (1 / ndim)))
+    return (length,) * ndim
+
+
+def _class_name(level: int) -> str:
+    """Return the name of the class of the objects at the given level of the tree."""
+    return f"Level{level}"
+
+
+def create_schemaview(dtype: str, ndim: int, fanout: int, depth: int) -> SchemaView:
+    """Create a SchemaView for containers with the given array type and tree shape."""
+    array_range = DTYPE_RANGES[dtype][0]
+    classes = []
+    for level in range(depth + 1):
+        children = "".join(f"""
+      child_{i}:
+        range: {_class_name(level + 1)}
+        required: true
+        inlined: true""" for i in range(fanout if level < depth else 0))
+        classes.append(f"""
+  {_class_name(level)}:
+    attributes:
+      name:
+        identifier: true
+        range: string
+      values:
+        required: true
+        multivalued: true
+        range: {array_range}
+        array:
+          exact_number_dimensions: {ndim}{children}""")
+    schema_yaml = f"""
+id: https://example.org/benchmark
+name: benchmark
+prefixes:
+  linkml: https://w3id.org/linkml/
+default_prefix: https://example.org/benchmark/
+imports:
+  - linkml:types
+classes:{"".join(classes)}
+"""
+    schema = yaml_loader.loads(schema_yaml, target_class=SchemaDefinition)
+    return SchemaView(schema)
+
+
+def create_models(dtype: str, ndim: int, fanout: int, depth: int) -> List[Type[BaseModel]]:
+    """Create the pydantic model classes for each level of containers, from the root down."""
+    element_type: Any = DTYPE_RANGES[dtype][1]
+    values_type = element_type
+    for _ in range(ndim):
+        values_type = List[values_type]
+
+    models: List[Type[BaseModel]] = []
+    child_model: Optional[Type[BaseModel]] = None
+    for level in reversed(range(depth + 1)):
+        fields: dict = {"name": (str, ...), "values": (values_type, ...)}
+        if child_model is not None:
+            for i in range(fanout):
+                fields[f"child_{i}"] = (child_model, ...)
+        child_model = create_model(_class_name(level), __base__=BenchmarkBaseModel, **fields)
+        models.insert(0, child_model)
+    return models
+
+
+def create_container(
+    models: List[Type[BaseModel]], size: int, dtype: str, ndim: int, fanout: int
+) -> BaseModel:
+    """Create a container whose arrays are NumPy arrays with about size elements each.
+
+    The objects are constructed without validation, which would convert the arrays to lists of
+    Python floats or ints and lose their data type.
+    """
+    rng = np.random.default_rng(0)
+    shape = get_shape(size, ndim)
+
+    def _create(level: int, name: str) -> BaseModel:
+        values = (rng.random(shape) * 1000).astype(dtype)
+        children = dict()
+        if level + 1 < len(models):
+            for i in range(fanout):
+                children[f"child_{i}"] = _create(level + 1, f"{name}_{i}")
+        return models[level].model_construct(name=name, values=values, **children)
+
+    return _create(0, "root")
+
+
+def count_objects(fanout: int, depth: int) -> int:
+    """Return the number of objects in a container with the given tree shape."""
+    return sum(fanout**level for level in range(depth + 1))
@@ -0,0 +1,143 @@
+"""Functions for reading a selection of the elements of an array from storage.
+
+A selection is given per axis, as a tuple with one entry for each of the leading axes of the
+array. Each entry is one of:
+
+- an int, which selects one element along the axis and removes the axis
+- a slice with a positive step, e.g., ``slice(-30, None)`` for the last 30 elements
+- a list or 1-D array of ints, in any order and possibly with repeats
+- a 1-D boolean mask with the length of the axis
+
+A selection that is not a tuple applies to the first axis, and an Ellipsis expands to full
+slices. Unlike NumPy, index lists and masks on several axes select the outer product of the
+indices, i.e., orthogonal indexing like ``zarr.Array.oindex``, e.g., ``(slice(None), [0, 2],
+[1, 3])`` selects a 2 x 2 block from each row.
+
+Selections are given to loaders as a dict keyed by class-qualified slot name, e.g.,
+"TemperaturesInKMatrix.values", or by the path of the array in the file, e.g.,
+"temperature_dataset/temperatures_in_K/values", which takes precedence.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import h5py
+import numpy as np
+import zarr
+
+from .lazy_array import LazyArray
+
+
+def resolve_selection(
+    selections: Optional[Dict[str, Any]], class_name: str, slot_name: str, path: str
+) -> Optional[Any]:
+    """Return the selection for an array slot of an object, or None to read the whole array.
+
+    The selection for the path of the array overrides that for the class-qualified slot name.
+    """
+    if not selections:
+        return None
+    if path in selections:
+        return selections[path]
+    return selections.get(f"{class_name}.{slot_name}")
+
+
+def normalize_selection(selection: Any, shape: Sequence[int]) -> Tuple[Any, ...]:
+    """Return the selection with one entry per axis, with index lists and masks as int arrays.
+
+    Negative ints and indices are converted to non-negative ones.
+
+    Raises:
+        ValueError: If the selection has more entries than the array has axes, an entry is not
+            supported, an index is out of bounds, or a mask does not have the length of its axis.
+    """
+    if not isinstance(selection, tuple):
+        selection = (selection,)
+    if any(entry is Ellipsis for entry in selection):
+        i = next(i for i, entry in enumerate(selection) if entry is Ellipsis)
+        n_full = len(shape) - len(selection) + 1
+        selection = selection[:i] + (slice(None),) * n_full + selection[i + 1 :]  # noqa: E203
+    if len(selection) > len(shape):
+        raise ValueError(f"Selection {selection} has more entries than axes of shape {shape}.")
+    selection = selection + (slice(None),) * (len(shape) - len(selection))
+
+    ret: List[Any] = []
+    for axis, (entry, length) in enumerate(zip(selection, shape)):
+        if isinstance(entry, slice):
+            if entry.step is not None and entry.step <= 0:
+                raise ValueError(f"Slice {entry} on axis {axis} must have a positive step.")
+            ret.append(entry)
+            continue
+        indices = np.asarray(entry)
+        if indices.size == 0 and indices.ndim == 1:
+            # an empty list is an empty index list, whose data type NumPy infers as float
+            indices = indices.astype(np.intp)
+        if indices.dtype == bool:
+            if indices.shape != (length,):
+                raise ValueError(
+                    f"Mask on axis {axis} has shape {indices.shape}, not that of the axis, "
+                    f"({length},)."
+                )
+            indices = np.flatnonzero(indices)
+        elif indices.dtype.kind not in "iu" or indices.ndim > 1:
+            raise ValueError(f"Unsupported selection {entry} on axis {axis}.")
+        if np.any(indices >= length) or np.any(indices < -length):
+            raise ValueError(f"Index {entry} is out of bounds for axis {axis} of length {length}.")
+        indices = np.where(indices < 0, indices + length, indices)
+        ret.append(int(indices) if indices.ndim == 0 else indices)
+    return tuple(ret)
+
+
+def read_selection(array: Any, selection: Any) -> np.ndarray:
+    """Read the selected elements of an array into memory.
+
+    The selection is pushed down to the storage of HDF5 datasets, Zarr arrays, and memory-mapped
+    NumPy arrays, so that only the selected elements are read, in addition to the rest of their
+    chunks for chunked arrays. Index lists on HDF5 datasets are read sorted and without repeats,
+    as HDF5 requires, on one axis, and as the slab that spans them on the other axes, and then
+    reordered in memory. LazyArray proxies are read from the array that they wrap. Strings in
+    HDF5 datasets are read as str, like when the whole dataset is read.
+
+    Raises:
+        ValueError: If the selection is not supported for the shape of the array.
+    """
+    if isinstance(array, LazyArray):
+        array = array.array
+    if isinstance(array, h5py.Dataset) and h5py.check_string_dtype(array.dtype) is not None:
+        array = array.asstr()
+    selection = normalize_selection(selection, array.shape)
+    if isinstance(array, zarr.Array):
+        return array.oindex[selection]
+
+    is_numpy = isinstance(array, np.ndarray)
+    storage_selection: List[Any] = []
+    # index arrays to apply in memory, for the axes that remain after the storage selection
+    memory_selection: List[Optional[np.ndarray]] = []
+    has_index_array = False
+    for entry in selection:
+        if isinstance(entry, np.ndarray):
+            if is_numpy:
+                # views of NumPy arrays select in memory without reading the other elements
+                storage_selection.append(slice(None))
+                memory_selection.append(entry)
+            elif entry.size == 0:
+                storage_selection.append(slice(0, 0))
+                memory_selection.append(None)
+            elif not has_index_array:
+                unique, inverse = np.unique(entry, return_inverse=True)
+                storage_selection.append(unique)
+                memory_selection.append(inverse.reshape(-1))
+                has_index_array = True
+            else:
+                start = int(entry.min())
+                storage_selection.append(slice(start, int(entry.max()) + 1))
+                memory_selection.append(entry - start)
+        else:
+            storage_selection.append(entry)
+            if isinstance(entry, slice):
+                memory_selection.append(None)
+
+    data = array[tuple(storage_selection)]
+    for axis, indices in enumerate(memory_selection):
+        if indices is not None:
+            data = np.take(data, indices, axis=axis)
+    return np.array(data) if isinstance(data, np.memmap) else np.asarray(data)
@@ -0,0 +1,97 @@
+"""Functions for encoding arrays as base64 of their raw bytes for inline storage in YAML.
+
+An encoded array is a dict with the following keys:
+
+- ``encoding``: "base64"
+- ``dtype``: the NumPy data type string of the array, always little-endian, e.g., "<f8"
+- ``shape``: the shape of the array as a list of ints
+- ``data``: the raw bytes of the array in C order. These are written as a YAML ``!!binary`` scalar,
+  i.e., base64, and may also be given as a base64 string
+"""
+
+import binascii
+import re
+from typing import Any, Union
+
+import numpy as np
+
+from .utils import to_fixed_width
+
+BASE64_ENCODING = "base64"
+ENCODINGS = (BASE64_ENCODING,)
+
+# number of base64 characters decoded at a time, a multiple of 4 so that chunks decode separately
+_BASE64_CHUNK_SIZE = 4 << 20
+
+
+def encode_array(array: Any) -> dict:
+    """Encode an array as a dict with its dtype, shape, and raw little-endian bytes.
+
+    Raises:
+        ValueError: If the array is an object array that cannot be converted to fixed-width
+            strings or bytes.
+    """
+    data = to_fixed_width(np.asarray(array))
+    if data.dtype.kind == "O":
+        raise ValueError("Object arrays cannot be encoded as bytes.")
+    # no copy is made if the array is already little-endian and C-contiguous
+    data = np.ascontiguousarray(data.astype(data.dtype.newbyteorder("<"), copy=False))
+    return {
+        "encoding": BASE64_ENCODING,
+        "dtype": data.dtype.str,
+        "shape": list(data.shape),
+        "data": data.tobytes(),
+    }
+
+
+def is_encoded_array(value: Any) -> bool:
+    """Return whether the value is a dict representing an encoded array."""
+    return isinstance(value, dict) and value.get("encoding") in ENCODINGS
+
+
+def _decode_base64_into(data: str, out: np.ndarray) -> None:
+    """Decode base64 text into the bytes of a writeable array, one chunk at a time.
+
+    Raises:
+        ValueError: If the text is not valid base64 or does not decode to the size of the array.
+    """
+    if re.search(r"\s", data):
+        data = "".join(data.split())
+    buffer = memoryview(out.reshape(-1).view(np.uint8))
+    position = 0
+    try:
+        for start in range(0, len(data), _BASE64_CHUNK_SIZE):
+            chunk = binascii.a2b_base64(data[start : start + _BASE64_CHUNK_SIZE])  # noqa: E203
+            end = position + len(chunk)
+            buffer[position:end] = chunk
+            position = end
+    except (binascii.Error, ValueError) as e:
+        raise ValueError(f"Array data is not valid base64 of {out.nbytes} bytes.") from e
+    if position != out.nbytes:
+        raise ValueError(f"Array data has {position} bytes, expected {out.nbytes}.")
+
+
+def decode_array(value: dict) -> np.ndarray:
+    """Decode a dict created by encode_array into a NumPy array without building Python lists.
+
+    Raises:
+        ValueError: If the encoding is not supported or the data does not match the dtype and
+            shape.
+    """
+    encoding = value.get("encoding")
+    if encoding != BASE64_ENCODING:
+        raise ValueError(f"Unsupported array encoding {encoding}. Supported are {ENCODINGS}.")
+    dtype = np.dtype(value["dtype"])
+    data: Union[bytes, str] = value["data"]
+    if isinstance(data, str):
+        # decode straight into the array, so that the decoded bytes are not copied again
+        array = np.empty(value["shape"], dtype=dtype)
+        _decode_base64_into(data, array)
+        return array
+    # the bytes of a !!binary scalar are immutable, so they are copied once to make the array
+    # writeable
+    if len(data) != dtype.itemsize * int(np.prod(value["shape"])):
+        raise ValueError(
+            f"Array data has {len(data)} bytes, which do not match its dtype and shape."
+        )
+    return np.frombuffer(data, dtype=dtype).reshape(value["shape"]).copy()
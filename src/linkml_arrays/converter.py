@@ -0,0 +1,97 @@
+"""Function for converting a LinkML model between file formats with bounded memory."""
+
+from pathlib import Path
+from typing import Optional, Type, Union
+
+from linkml_runtime import SchemaView
+from linkml_runtime.utils.yamlutils import YAMLRoot
+from pydantic import BaseModel
+
+from .dumpers import Hdf5Dumper, YamlHdf5Dumper, YamlNumpyDumper, ZarrDirectoryStoreDumper
+from .loaders import Hdf5Loader, YamlArrayFileLoader, ZarrDirectoryStoreLoader
+
+FORMATS = ("hdf5", "zarr", "yaml_numpy", "yaml_hdf5")
+FORMAT_SUFFIXES = {".h5": "hdf5", ".hdf5": "hdf5", ".zarr": "zarr"}
+
+
+def _get_format(path: Union[str, Path], format: Optional[str]) -> str:
+    """Return the format if given, else infer it from the suffix of the path.
+
+    Raises:
+        ValueError: If the format is not supported or cannot be inferred.
+    """
+    if format is None:
+        format = FORMAT_SUFFIXES.get(Path(path).suffix.lower())
+        if format is None:
+            raise ValueError(f"Cannot infer the format of {path}. Supported formats are {FORMATS}.")
+    if format not in FORMATS:
+        raise ValueError(f"Unsupported format {format}. Supported formats are {FORMATS}.")
+    return format
+
+
+def _dump(
+    element: Union[YAMLRoot, BaseModel],
+    schemaview: SchemaView,
+    output: Union[str, Path],
+    output_format: str,
+    **kwargs,
+):
+    """Dump the element to the output in the given format."""
+    if output_format == "hdf5":
+        Hdf5Dumper().dumps(element, schemaview=schemaview, output_file_path=output, **kwargs)
+    elif output_format == "zarr":
+        ZarrDirectoryStoreDumper().dumps(
+            element, schemaview=schemaview, output_file_path=output, **kwargs
+        )
+    else:
+        dumper = YamlNumpyDumper() if output_format == "yaml_numpy" else YamlHdf5Dumper()
+        dumper.dump(element, output, schemaview, **kwargs)
+
+
+def convert(
+    source: Union[str, Path],
+    output: Union[str, Path],
+    target_class: Type[Union[YAMLRoot, BaseModel]],
+    schemaview: SchemaView,
+    source_format: Optional[str] = None,
+    output_format: Optional[str] = None,
+    **kwargs,
+):
+    """Convert a LinkML model from the source file to the output file with bounded memory.
+
+    The formats are one of "hdf5", "zarr", "yaml_numpy" (a YAML file with arrays in NumPy files),
+    and "yaml_hdf5" (a YAML file with arrays in HDF5 files). If a format is not given, it is
+    inferred from the suffix of the path, ".h5" or ".hdf5" for HDF5 and ".zarr" for Zarr.
+
+    The source is loaded lazily, so arrays in HDF5 and Zarr files and in NumPy and HDF5 files
+    referenced by YAML are not read into memory. Instead, the dumper copies each array block by
+    block from the source dataset to the output dataset. Arrays of strings are read into memory
+    whole. Non-array slots are converted to attributes, groups, or YAML
+    as by the dumper of the output format. Because the source is loaded lazily, it is not
+    validated against the pydantic model.
+
+    Additional keyword arguments are passed to the dumper, e.g., storage_options for the HDF5 and
+    Zarr dumpers or output_dir for the YAML dumpers, which defaults to the directory of the
+    output. File paths in YAML are relative to the directory of the YAML file.
+
+    Raises:
+        ValueError: If a format is not supported or cannot be inferred.
+    """
+    source_format = _get_format(source, source_format)
+    output_format = _get_format(output, output_format)
+
+    if source_format == "hdf5":
+        with Hdf5Loader() as loader:
+            element = loader.load(str(source), target_class, schemaview, lazy=True)
+            _dump(element, schemaview, output, output_format, **kwargs)
+    elif source_format == "zarr":
+        element = ZarrDirectoryStoreLoader().load(str(source), target_class, schemaview, lazy=True)
+        _dump(element, schemaview, output, output_format, **kwargs)
+    else:
+        with open(source) as f:
+            yaml_str = f.read()
+        with YamlArrayFileLoader() as loader:
+            element = loader.load(
+                yaml_str, target_class, schemaview, base_dir=Path(source).parent, lazy=True
+            )
+            _dump(element, schemaview, output, output_format, **kwargs)
@@ -0,0 +1,65 @@
+"""Functions for representing array slots as Dask arrays.
+
+Dask is an optional dependency. Loaders create Dask arrays only when asked to, and dumpers
+recognize Dask arrays without importing Dask.
+"""
+
+import sys
+from typing import Any, Optional, Sequence, Tuple
+
+from .lazy_array import LazyArray
+
+
+def _import_dask_array():
+    """Return the dask.array module.
+
+    Raises:
+        ValueError: If Dask is not installed.
+    """
+    try:
+        import dask.array
+    except ImportError as e:
+        raise ValueError("Loading arrays as Dask arrays requires the dask package.") from e
+    return dask.array
+
+
+def is_dask_array(array: Any) -> bool:
+    """Return whether the array is a Dask array, without importing Dask if it is not imported."""
+    dask_array = sys.modules.get("dask.array")
+    return dask_array is not None and isinstance(array, dask_array.Array)
+
+
+def to_dask_array(array: Any) -> Any:
+    """Return a Dask array that reads from a sliceable array-like object, e.g., a dataset.
+
+    The Dask chunks are multiples of the chunk shape of the array in storage, if it is chunked,
+    so that each chunk in storage is read by one task. Dask cannot size chunks of object arrays,
+    e.g., of strings, which are split into the chunks in storage, or not at all. h5py string
+    datasets should be wrapped in a LazyArray of ``dataset.asstr()`` so that their elements are
+    read as str.
+
+    Raises:
+        ValueError: If Dask is not installed.
+    """
+    da = _import_dask_array()
+    chunks: Any = "auto"
+    if array.dtype.hasobject:
+        chunks = getattr(array, "chunks", None) or -1
+    # LazyArray exposes the chunk shape of the array that it wraps, which Dask aligns to
+    return da.from_array(array, chunks=chunks, asarray=isinstance(array, LazyArray))
+
+
+def chunks_aligned(
+    dask_chunks: Tuple[Tuple[int, ...], ...], chunks: Optional[Sequence[int]]
+) -> bool:
+    """Return whether each Dask chunk covers whole chunks of an array in storage.
+
+    If they are aligned, the Dask chunks can be written concurrently without a lock.
+    """
+    if chunks is None:
+        return False
+    for axis_chunks, chunk in zip(dask_chunks, chunks):
+        # the last chunk along an axis may be partial
+        if any(length % chunk != 0 for length in axis_chunks[:-1]):
+            return False
+    return True
@@ -1,15 +1,19 @@
 """Dumper classes for linkml-arrays."""
 
+from .hdf5_append_writer import Hdf5AppendWriter
 from .hdf5_dumper import Hdf5Dumper
 from .yaml_dumper import YamlDumper
 from .yaml_hdf5_dumper import YamlHdf5Dumper
 from .yaml_numpy_dumper import YamlNumpyDumper
+from .zarr_directory_store_append_writer import ZarrDirectoryStoreAppendWriter
 from .zarr_directory_store_dumper import ZarrDirectoryStoreDumper
 
 __all__ = [
+    "Hdf5AppendWriter",
     "Hdf5Dumper",
     "YamlDumper",
     "YamlHdf5Dumper",
     "YamlNumpyDumper",
+    "ZarrDirectoryStoreAppendWriter",
     "ZarrDirectoryStoreDumper",
 ]
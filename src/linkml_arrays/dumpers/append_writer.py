@@ -0,0 +1,97 @@
+"""Base class for writing a LinkML model to a file and then appending to its arrays."""
+
+from abc import ABCMeta, abstractmethod
+from typing import Any, Dict, Optional, Union
+
+import numpy as np
+
+
+class AppendWriter(metaclass=ABCMeta):
+    """Base class for writing a LinkML model to a file and then appending to its arrays.
+
+    Subclasses write the non-array slots of the model and its initial arrays once when the writer
+    is created. Arrays can then be grown in batches along any dimension with ``append``, so that
+    arrays larger than memory can be written with memory bounded by the batch size. Arrays that
+    are empty in the model are created on the first append with the shape and data type of the
+    batch.
+    """
+
+    def __init__(self):
+        """Create a writer with no deferred arrays."""
+        # storage options of empty arrays that are created on the first append, keyed by path
+        self._deferred_arrays: Dict[str, dict] = dict()
+
+    def __enter__(self):
+        """Return the writer for use as a context manager."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Close the writer."""
+        self.close()
+
+    @abstractmethod
+    def _get_array(self, path: str) -> Optional[Any]:
+        """Return the array at the path in the file, or None if there is no array at the path."""
+        raise NotImplementedError("Subclasses must implement this method.")
+
+    @abstractmethod
+    def _create_array(self, path: str, data: np.ndarray, options: dict):
+        """Create a resizable array at the path in the file with the data and storage options."""
+        raise NotImplementedError("Subclasses must implement this method.")
+
+    def _write(self, array: Any, selection: tuple, data: np.ndarray):
+        """Write the data to the selection of the array."""
+        array[selection] = data
+
+    @abstractmethod
+    def flush(self):
+        """Flush buffered data to the file."""
+        raise NotImplementedError("Subclasses must implement this method.")
+
+    @abstractmethod
+    def close(self):
+        """Close the file."""
+        raise NotImplementedError("Subclasses must implement this method.")
+
+    def append(self, path: str, data: Union[list, np.ndarray], axis: int = 0):
+        """Append a batch of data to the array at the path along the given axis.
+
+        The path is the path of the array in the file, e.g.,
+        "temperature_dataset/temperatures_in_K/values". The batch must have the same number of
+        dimensions as the array and the same length as the array along all other axes.
+
+        Raises:
+            KeyError: If there is no array at the path.
+            ValueError: If the shape of the batch does not match the shape of the array.
+        """
+        data = np.asarray(data)
+        path = path.strip("/")
+        if path in self._deferred_arrays:
+            self._create_array(path, data, self._deferred_arrays.pop(path))
+            return
+
+        array = self._get_array(path)
+        if array is None:
+            raise KeyError(f"No array at path {path}.")
+        if data.ndim != len(array.shape):
+            raise ValueError(
+                f"Cannot append data with {data.ndim} dimensions to array {path} with "
+                f"{len(array.shape)} dimensions."
+            )
+        if not -data.ndim <= axis < data.ndim:
+            raise ValueError(f"Axis {axis} is out of bounds for array {path}.")
+        axis = axis % data.ndim
+        for i, (length, data_length) in enumerate(zip(array.shape, data.shape)):
+            if i != axis and length != data_length:
+                raise ValueError(
+                    f"Cannot append data with shape {data.shape} to array {path} with shape "
+                    f"{array.shape} along axis {axis}."
+                )
+
+        new_shape = list(array.shape)
+        start = new_shape[axis]
+        new_shape[axis] += data.shape[axis]
+        array.resize(tuple(new_shape))
+        selection = [slice(None)] * data.ndim
+        selection[axis] = slice(start, new_shape[axis])
+        self._write(array, tuple(selection), data)
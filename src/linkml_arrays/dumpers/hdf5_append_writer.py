@@ -0,0 +1,74 @@
+"""Class for writing a LinkML model to an HDF5 file and then appending to its arrays."""
+
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+import h5py
+import numpy as np
+from linkml_runtime import SchemaView
+from linkml_runtime.utils.yamlutils import YAMLRoot
+from pydantic import BaseModel
+
+from .append_writer import AppendWriter
+from .hdf5_dumper import _create_dataset, _iterate_element, _to_hdf5_data
+from .storage_options import hdf5_dataset_kwargs
+
+
+class Hdf5AppendWriter(AppendWriter):
+    """Writer for LinkML models to HDF5 files with datasets that can be appended to.
+
+    The model is written as by Hdf5Dumper when the writer is created, except that datasets are
+    chunked and resizable along all dimensions. Set the chunk shape with the storage options to
+    match the size of the batches that will be appended. The file stays open until the writer is
+    closed, either by calling ``close`` or by using the writer as a context manager.
+    """
+
+    def __init__(
+        self,
+        element: Union[YAMLRoot, BaseModel],
+        schemaview: SchemaView,
+        output_file_path: Union[str, Path],
+        storage_options: Optional[dict] = None,
+        slot_storage_options: Optional[Dict[str, dict]] = None,
+    ):
+        """Write the element to an HDF5 file with resizable datasets."""
+        super().__init__()
+        self._file = h5py.File(output_file_path, "w")
+        try:
+            _iterate_element(
+                element,
+                schemaview,
+                self._file,
+                storage_options,
+                slot_storage_options,
+                self._deferred_arrays,
+            )
+        except Exception:
+            self._file.close()
+            raise
+
+    def _get_array(self, path: str) -> Optional[h5py.Dataset]:
+        """Return the dataset at the path, or None if there is no dataset at the path."""
+        dataset = self._file.get(path)
+        if isinstance(dataset, h5py.Dataset):
+            return dataset
+        return None
+
+    def _create_array(self, path: str, data: np.ndarray, options: dict):
+        """Create a chunked dataset at the path that is resizable along all dimensions."""
+        kwargs = hdf5_dataset_kwargs(options)
+        kwargs["maxshape"] = (None,) * data.ndim
+        kwargs.setdefault("chunks", True)
+        _create_dataset(self._file, path, data, **kwargs)
+
+    def _write(self, array: h5py.Dataset, selection: tuple, data: np.ndarray):
+        """Write the data to the selection of the dataset."""
+        array[selection] = _to_hdf5_data(data)
+
+    def flush(self):
+        """Flush buffered data to the file."""
+        self._file.flush()
+
+    def close(self):
+        """Close the file."""
+        self._file.close()
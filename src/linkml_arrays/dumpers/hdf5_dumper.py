@@ -1,36 +1,123 @@
 """Class for dumping a LinkML model to an HDF5 file."""
 
+from concurrent.futures import Executor
 from pathlib import Path
-from typing import Union
+from typing import Dict, Optional, Union
 
 import h5py
+import numpy as np
 from linkml_runtime import SchemaView
 from linkml_runtime.dumpers.dumper_root import Dumper
 from linkml_runtime.utils.yamlutils import YAMLRoot
 from pydantic import BaseModel
 
+from .storage_options import hdf5_dataset_kwargs, resolve_storage_options
+from ..inlined_collection import is_collection, iter_collection_items
+from ..schema_plan import get_class_plan
+from ..utils import copy_array_chunked, is_out_of_core, run_in_executor, to_ndarray
+
+
+def _to_hdf5_data(v, range_dtype: Optional[np.dtype] = None):
+    """Return the array as data that h5py can write.
+
+    NumPy arrays and buffers are written without an intermediate copy. Lists are converted with
+    the data type of the slot range in a single call. Lists without a range data type, e.g., of
+    strings, are passed through because h5py converts lists of strings itself. h5py does not
+    support fixed-length unicode, so strings are written as variable-length strings.
+    """
+    if isinstance(v, (list, tuple)) and range_dtype is None:
+        return v
+    data = to_ndarray(v, range_dtype)
+    if data.dtype.kind in "OU":
+        data = data.astype(h5py.string_dtype())
+    return data
+
+
+def _create_dataset(
+    group: h5py.Group, name: str, v, range_dtype: Optional[np.dtype] = None, **kwargs
+) -> h5py.Dataset:
+    """Create a dataset from an array, copying arrays backed by storage block by block.
+
+    Dask arrays are computed chunk by chunk in parallel and written with a lock, because HDF5
+    does not support concurrent writes.
+
+    range_dtype is the data type that lists are converted to, e.g., that of the slot range.
+    """
+    if is_out_of_core(v):
+        dataset = group.create_dataset(name, shape=v.shape, dtype=v.dtype, **kwargs)
+        copy_array_chunked(v, dataset)
+        return dataset
+    return group.create_dataset(name, data=_to_hdf5_data(v, range_dtype), **kwargs)
+
 
 def _iterate_element(
-    element: Union[YAMLRoot, BaseModel], schemaview: SchemaView, group: h5py.Group = None
+    element: Union[YAMLRoot, BaseModel],
+    schemaview: SchemaView,
+    group: h5py.Group = None,
+    storage_options: Optional[dict] = None,
+    slot_storage_options: Optional[Dict[str, dict]] = None,
+    deferred_arrays: Optional[Dict[str, dict]] = None,
 ):
     """Recursively iterate through the elements of a LinkML model and save them.
 
     Write Pydantic BaseModel objects as groups, slots with the "array" element
-    as datasets, and other slots as attributes.
+    as datasets, and other slots as attributes. NumPy arrays are written without an intermediate
+    copy, and lists are converted to arrays of the data type of the slot range. Datasets are
+    created with the storage options resolved for the array slot, e.g., chunking and compression.
+    Arrays backed by storage, e.g., lazily loaded arrays, are copied block by block so that they
+    are never fully in memory.
+
+    If deferred_arrays is not None, datasets are created chunked and resizable along all
+    dimensions so that they can be appended to. Empty arrays are not created. Instead, their
+    storage options are recorded in deferred_arrays, keyed by path, so that they can be created
+    on the first append.
+
+    Collections of objects are written as groups with a group per object. See
+    ``linkml_arrays.inlined_collection``.
     """
-    # get the type of the element
-    element_type = type(element).__name__
+    # get the precomputed schema information for the type of the element
+    class_plan = get_class_plan(schemaview, type(element).__name__)
 
     for k, v in vars(element).items():
-        found_slot = schemaview.induced_slot(k, element_type)
-        if found_slot.array:
+        found_slot = class_plan.get_slot(k)
+        if found_slot.is_array:
+            # path of the array in the file, e.g., "temperature_dataset/temperatures_in_K/values"
+            path = f"{group.name}/{found_slot.name}".lstrip("/")
+            options = resolve_storage_options(
+                class_plan.name,
+                found_slot,
+                path,
+                storage_options,
+                slot_storage_options,
+            )
+            kwargs = hdf5_dataset_kwargs(options)
+            if deferred_arrays is not None:
+                if np.size(v) == 0:
+                    deferred_arrays[path] = options
+                    continue
+                kwargs["maxshape"] = (None,) * np.ndim(v)
+                kwargs.setdefault("chunks", True)
             # save the numpy array to an hdf5 dataset
-            group.create_dataset(found_slot.name, data=v)
+            _create_dataset(group, found_slot.name, v, found_slot.dtype, **kwargs)
         else:
             if isinstance(v, BaseModel):
                 # create a subgroup and recurse
                 subgroup = group.create_group(k)
-                _iterate_element(v, schemaview, subgroup)
+                _iterate_element(
+                    v, schemaview, subgroup, storage_options, slot_storage_options, deferred_arrays
+                )
+            elif is_collection(v):
+                # create a subgroup with a subgroup per object and recurse
+                subgroup = group.create_group(k)
+                for name, item in iter_collection_items(v, class_plan, k):
+                    _iterate_element(
+                        item,
+                        schemaview,
+                        subgroup.create_group(name),
+                        storage_options,
+                        slot_storage_options,
+                        deferred_arrays,
+                    )
             else:
                 # create an attribute on the group
                 group.attrs[k] = v
@@ -45,8 +132,34 @@ class Hdf5Dumper(Dumper):
         element: Union[YAMLRoot, BaseModel],
         schemaview: SchemaView,
         output_file_path: Union[str, Path],
+        storage_options: Optional[dict] = None,
+        slot_storage_options: Optional[Dict[str, dict]] = None,
         **kwargs,
     ):
-        """Dump the element to an HDF5 file."""
+        """Dump the element to an HDF5 file.
+
+        storage_options, e.g., ``{"chunks": [100, 100, 1], "compression": "gzip"}``, apply to
+        all arrays. They are overridden by the "storage" annotation of an array slot in the schema
+        and by slot_storage_options, keyed by class-qualified slot name, e.g.,
+        "TemperaturesInKMatrix.values", or by the path of the array, e.g.,
+        "temperature_dataset/temperatures_in_K/values". See
+        ``linkml_arrays.dumpers.storage_options`` for the supported options.
+        """
         with h5py.File(output_file_path, "w") as f:
-            _iterate_element(element, schemaview, f)
+            _iterate_element(element, schemaview, f, storage_options, slot_storage_options)
+
+    async def adumps(
+        self,
+        element: Union[YAMLRoot, BaseModel],
+        schemaview: SchemaView,
+        executor: Optional[Executor] = None,
+        **kwargs,
+    ):
+        """Dump the element to an HDF5 file.
+
+        This is a coroutine variant of ``dumps`` for use in an asyncio event loop. The dump runs in
+        executor, or in the default executor of the event loop if None. Keyword arguments are
+        passed to ``dumps``. If the coroutine is cancelled, the dump still runs to completion, so
+        that no file is left open or half written.
+        """
+        return await run_in_executor(executor, self.dumps, element, schemaview, **kwargs)
@@ -0,0 +1,188 @@
+"""Options for how arrays are stored by the HDF5 and Zarr dumpers, e.g., chunking and compression.
+
+Storage options are given as a dict with the following keys, all of which are optional:
+
+- ``chunks``: the chunk shape as a list of ints, or True to let the library choose it
+- ``compression``: the name of the compressor, one of "gzip", "lzf" (HDF5 only), "zlib" (Zarr
+  only), "lz4", "zstd", "blosc", or "none" (or None) for no compression
+- ``compression_level``: the compression level, if supported by the compressor
+- ``shuffle``: whether to apply the byte shuffle filter before compression
+
+Options can be given for a whole dump, in the "storage" annotation of an array slot in the
+schema, and for individual arrays in a dump, e.g.::
+
+    attributes:
+      values:
+        range: float
+        array:
+          exact_number_dimensions: 3
+        annotations:
+          storage:
+            value:
+              chunks: [10, 10, 1]
+              compression: gzip
+              compression_level: 4
+"""
+
+from typing import Dict, Optional
+
+import numcodecs
+import numpy as np
+
+from ..schema_plan import SlotPlan
+
+STORAGE_ANNOTATION = "storage"
+STORAGE_OPTION_KEYS = ("chunks", "compression", "compression_level", "shuffle")
+
+
+def _check_storage_options(options: dict, source: str):
+    """Check that the storage options have only supported keys.
+
+    Raises:
+        ValueError: If the storage options have an unsupported key.
+    """
+    for key in options:
+        if key not in STORAGE_OPTION_KEYS:
+            raise ValueError(
+                f"Unsupported storage option {key} in {source}. "
+                f"Supported options are {STORAGE_OPTION_KEYS}."
+            )
+
+
+def resolve_storage_options(
+    class_name: str,
+    slot: SlotPlan,
+    path: str,
+    storage_options: Optional[dict] = None,
+    slot_storage_options: Optional[Dict[str, dict]] = None,
+) -> dict:
+    """Return the storage options for an array slot of an object in a dump.
+
+    The storage options of the dump apply to all arrays. They are overridden by the "storage"
+    annotation of the array slot in the schema, which is overridden by the options in
+    slot_storage_options for the class-qualified slot name, e.g., "TemperaturesInKMatrix.values",
+    which is in turn overridden by the options for the path of the array in the dump, e.g.,
+    "temperature_dataset/temperatures_in_K/values".
+
+    Raises:
+        ValueError: If any of the storage options has an unsupported key.
+    """
+    ret = dict()
+    if storage_options:
+        _check_storage_options(storage_options, "storage_options")
+        ret.update(storage_options)
+
+    annotation = slot.annotations.get(STORAGE_ANNOTATION)
+    if annotation:
+        _check_storage_options(annotation, f"the storage annotation of slot {slot.name}")
+        ret.update(annotation)
+
+    if slot_storage_options:
+        for key in (f"{class_name}.{slot.name}", path):
+            options = slot_storage_options.get(key)
+            if options:
+                _check_storage_options(options, f"slot_storage_options[{key!r}]")
+                ret.update(options)
+
+    return ret
+
+
+def _get_chunks(options: dict):
+    """Return the chunks storage option as a tuple, or True to let the library choose it."""
+    chunks = options["chunks"]
+    if chunks is True:
+        return True
+    return tuple(chunks)
+
+
+def hdf5_dataset_kwargs(options: dict) -> dict:
+    """Convert storage options to keyword arguments for ``h5py.Group.create_dataset``.
+
+    The "lz4", "zstd", and "blosc" compressors require the optional hdf5plugin package.
+
+    Raises:
+        ValueError: If the compressor is not supported or requires hdf5plugin which is not
+            installed.
+    """
+    kwargs = dict()
+    if "chunks" in options:
+        kwargs["chunks"] = _get_chunks(options)
+
+    compression = options.get("compression")
+    level = options.get("compression_level")
+    shuffle = options.get("shuffle")
+    if compression in (None, "none"):
+        pass
+    elif compression == "gzip":
+        kwargs["compression"] = "gzip"
+        if level is not None:
+            kwargs["compression_opts"] = level
+    elif compression == "lzf":
+        kwargs["compression"] = "lzf"
+    elif compression in ("lz4", "zstd", "blosc"):
+        try:
+            import hdf5plugin
+        except ImportError as e:
+            raise ValueError(
+                f"Compression {compression} for HDF5 requires the hdf5plugin package."
+            ) from e
+        if compression == "lz4":
+            kwargs.update(hdf5plugin.LZ4())
+        elif compression == "zstd":
+            kwargs.update(hdf5plugin.Zstd() if level is None else hdf5plugin.Zstd(clevel=level))
+        else:
+            blosc_shuffle = hdf5plugin.Blosc.SHUFFLE if shuffle else hdf5plugin.Blosc.NOSHUFFLE
+            kwargs.update(
+                hdf5plugin.Blosc(
+                    cname="lz4", clevel=5 if level is None else level, shuffle=blosc_shuffle
+                )
+            )
+            # blosc applies the shuffle itself
+            shuffle = None
+    else:
+        raise ValueError(f"Unsupported compression {compression} for HDF5.")
+
+    if shuffle is not None:
+        kwargs["shuffle"] = bool(shuffle)
+    return kwargs
+
+
+def zarr_array_kwargs(options: dict, dtype: np.dtype) -> dict:
+    """Convert storage options to keyword arguments for ``zarr.hierarchy.Group.create_dataset``.
+
+    If no compression is given, the default compressor of zarr is used.
+
+    Raises:
+        ValueError: If the compressor is not supported.
+    """
+    kwargs = dict()
+    if "chunks" in options:
+        kwargs["chunks"] = _get_chunks(options)
+
+    level = options.get("compression_level")
+    shuffle = options.get("shuffle")
+    if "compression" in options:
+        compression = options["compression"]
+        if compression in (None, "none"):
+            kwargs["compressor"] = None
+        elif compression == "gzip":
+            kwargs["compressor"] = numcodecs.GZip() if level is None else numcodecs.GZip(level)
+        elif compression == "zlib":
+            kwargs["compressor"] = numcodecs.Zlib() if level is None else numcodecs.Zlib(level)
+        elif compression == "lz4":
+            kwargs["compressor"] = numcodecs.LZ4()
+        elif compression == "zstd":
+            kwargs["compressor"] = numcodecs.Zstd() if level is None else numcodecs.Zstd(level)
+        elif compression == "blosc":
+            blosc_shuffle = numcodecs.Blosc.SHUFFLE if shuffle else numcodecs.Blosc.NOSHUFFLE
+            kwargs["compressor"] = numcodecs.Blosc(
+                cname="lz4", clevel=5 if level is None else level, shuffle=blosc_shuffle
+            )
+            # blosc applies the shuffle itself
+            shuffle = None
+        else:
+            raise ValueError(f"Unsupported compression {compression} for Zarr.")
+
+    if shuffle and dtype.itemsize > 1:
+        kwargs["filters"] = [numcodecs.Shuffle(elementsize=dtype.itemsize)]
+    return kwargs
@@ -2,52 +2,76 @@
 
 import os
 from abc import ABCMeta, abstractmethod
-from collections.abc import Callable
+from concurrent.futures import Executor
 from pathlib import Path
-from typing import List, Optional, Union
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Union
 
 import numpy as np
-import yaml
 from linkml_runtime import SchemaView
 from linkml_runtime.dumpers.dumper_root import Dumper
 from linkml_runtime.utils.yamlutils import YAMLRoot
 from pydantic import BaseModel
 
+from ..inlined_collection import is_collection, iter_collection_items
+from ..schema_plan import get_class_plan
+from ..utils import map_in_threads, run_in_executor
+from ..yaml_backend import yaml_dump
+
+
+class _PendingWrite(NamedTuple):
+    """An array that is written to file after the element has been walked."""
+
+    array: Any
+    # output file name without the suffix if each array is written to its own file
+    output_file_name: str
+    # source entry whose "file" key, and "path" key for consolidated files, are filled in later
+    source: dict
+    # data type of the slot range
+    range_dtype: Optional[np.dtype]
+    # path of the array in the element, e.g., "temperature_dataset/temperatures_in_K/values"
+    path: str
+
 
 def _iterate_element(
     element: Union[YAMLRoot, BaseModel],
     schemaview: SchemaView,
-    output_dir: Path,
-    write_array: Callable,
     format: str,
+    pending_writes: List[_PendingWrite],
     parent_identifier=None,
     inlined_name=None,
+    path: str = "",
 ):
     """Recursively iterate through the elements of a LinkML model and save them.
 
     Return a dictionary with the same structure as the input element, but where the slots
     with the "array" element are written to an array file and the paths to these
-    files are returned in the dictionary. The paths are relative to the output directory.
+    files are returned in the dictionary.
+
+    Arrays are not written here. Instead, they are appended to pending_writes with their output
+    file name, source entry, range data type, and path in the element, so that the arrays can be
+    written together after the walk. Arrays are not converted here, so that at most one converted
+    copy of a list of lists is held in memory per writer.
+
+    Collections of objects are written as lists, or as dicts keyed by identifier, of the dicts
+    of their objects. The array files of objects without an identifier in a list are named by
+    the index of the object, e.g., "my_survey.batches.0.values".
 
     Raises:
         ValueError: If the class requires an identifier and it is not provided.
     """
-    # get the type of the element
-    element_type = type(element).__name__
+    # get the precomputed schema information for the type of the element
+    class_plan = get_class_plan(schemaview, type(element).__name__)
 
-    # ask schemaview whether it has a class by this name
-    found_class = schemaview.get_class(element_type)
-
-    id_slot = schemaview.get_identifier_slot(found_class.name)
+    id_slot = class_plan.identifier_slot
     if id_slot is not None:
-        id_value = getattr(element, id_slot.name)
+        id_value = getattr(element, id_slot)
     else:
         id_value = None
 
     ret_dict = dict()
     for k, v in vars(element).items():
-        found_slot = schemaview.induced_slot(k, element_type)
-        if found_slot.array:
+        found_slot = class_plan.get_slot(k)
+        if found_slot.is_array:
             if id_slot is None and parent_identifier is None:
                 raise ValueError("The class requires an identifier.")
 
@@ -61,63 +85,230 @@ def _iterate_element(
             else:
                 output_file_name = f"{found_slot.name}"
 
-            # if output_dir is absolute, make it relative to current working directory
-            # and create the directory if it does not exist
-            if output_dir.is_absolute():
-                output_dir = Path(os.path.relpath(output_dir, start=os.getcwd()))
-            output_dir.mkdir(exist_ok=True)
-            output_file_path_no_suffix = output_dir / output_file_name
-
-            # save the numpy array to file and write the file path to the dictionary
-            output_file_path = write_array(v, output_file_path_no_suffix)
-            ret_dict[k] = {
-                "source": [
-                    {
-                        "file": f"./{output_file_path}",
-                        "format": format,
-                    }
-                ]
+            # the file path is filled in once the array has been written to file
+            source = {
+                "file": None,
+                "format": format,
             }
+            pending_writes.append(
+                _PendingWrite(
+                    v,
+                    output_file_name,
+                    source,
+                    found_slot.dtype,
+                    f"{path}/{found_slot.name}".lstrip("/"),
+                )
+            )
+            ret_dict[k] = {"source": [source]}
         else:
             if isinstance(v, BaseModel):
                 v2 = _iterate_element(
                     v,
                     schemaview,
-                    output_dir,
-                    write_array,
                     format,
+                    pending_writes,
                     id_value,
                     inlined_name=found_slot.name,
+                    path=f"{path}/{k}".lstrip("/"),
                 )
                 ret_dict[k] = v2
+            elif is_collection(v):
+                items = {
+                    name: _iterate_element(
+                        item,
+                        schemaview,
+                        format,
+                        pending_writes,
+                        id_value,
+                        inlined_name=f"{found_slot.name}.{name}",
+                        path=f"{path}/{k}/{name}".lstrip("/"),
+                    )
+                    for name, item in iter_collection_items(v, class_plan, k)
+                }
+                ret_dict[k] = items if isinstance(v, dict) else list(items.values())
+            elif isinstance(v, np.generic):
+                # numpy scalars, e.g., read from an HDF5 file, are not representable in safe YAML
+                ret_dict[k] = v.item()
             else:
                 ret_dict[k] = v
     return ret_dict
 
 
+def _check_output_file_names(pending_writes: List[_PendingWrite]):
+    """Check that the output file names of the arrays are unique.
+
+    Raises:
+        ValueError: If two arrays would be written to the same file, e.g., because two objects
+            have the same identifier.
+    """
+    paths_by_name: Dict[str, str] = dict()
+    for write in pending_writes:
+        other_path = paths_by_name.setdefault(write.output_file_name, write.path)
+        if other_path != write.path:
+            raise ValueError(
+                f"Arrays {other_path} and {write.path} would both be written to a file named "
+                f"{write.output_file_name}."
+            )
+
+
 class YamlArrayFileDumper(Dumper, metaclass=ABCMeta):
     """Base dumper class for LinkML models to YAML files with paths to array files."""
 
-    # FORMAT is a class attribute that must be set by subclasses
+    # FORMAT is a class attribute that must be set by subclasses. CONSOLIDATED_FILE_SUFFIX is set
+    # by subclasses that support writing all arrays to a single file
 
     def dumps(
         self,
         element: Union[YAMLRoot, BaseModel],
         schemaview: SchemaView,
         output_dir: Optional[Union[str, Path]] = None,
+        max_workers: Optional[int] = 1,
+        yaml_backend: str = "auto",
+        consolidated: bool = False,
+        manifest_dir: Optional[Union[str, Path]] = None,
         **kwargs,
     ) -> str:
-        """Return element formatted as a YAML string."""
-        if output_dir is None:
-            output_dir = "."
-        input = _iterate_element(
-            element, schemaview, Path(output_dir), self.write_array, self.FORMAT
-        )
+        """Return element formatted as a YAML string.
+
+        The arrays are written to files in output_dir, the current working directory by default,
+        which is created if it does not exist. The file paths in the YAML are relative to
+        manifest_dir, the directory that the YAML will be written to, so that the YAML and the
+        array files can be moved together. By default, they are relative to the current working
+        directory. ``dump`` sets manifest_dir to the directory of the YAML file.
+
+        Array files are written after the element has been walked. If max_workers is not 1, they
+        are written concurrently in a thread pool with that many workers (None for the default of
+        ``concurrent.futures.ThreadPoolExecutor``). The YAML output does not depend on the order
+        in which the writes complete.
+
+        If consolidated is True, all arrays are written to a single file in the output directory,
+        named after the identifier of the element, or its class if it has no identifier, keyed by
+        the path of the array in the element, e.g.,
+        "temperature_dataset/temperatures_in_K/values". The source entry of each array then has a
+        "path" key with that path in addition to the "file" key. This avoids creating a file per
+        array, and max_workers is ignored.
 
-        return yaml.dump(input)
+        The YAML is written with yaml_backend, one of "auto" (the default, which uses the LibYAML
+        C emitter if available), "libyaml", "pyyaml", or "ruamel". See
+        ``linkml_arrays.yaml_backend``.
+
+        Raises:
+            ValueError: If two arrays would be written to the same file, e.g., because two objects
+                have the same identifier.
+        """
+        pending_writes: List[_PendingWrite] = []
+        input = _iterate_element(element, schemaview, self.FORMAT, pending_writes)
+        if not pending_writes:
+            return yaml_dump(input, yaml_backend)
+
+        # resolve the output directory, and its path relative to the manifest, once for all arrays
+        output_dir = Path(os.path.abspath(output_dir if output_dir is not None else "."))
+        output_dir.mkdir(parents=True, exist_ok=True)
+        relative_dir = Path(
+            os.path.relpath(output_dir, os.path.abspath(manifest_dir or "."))
+        ).as_posix()
+        prefix = "./" if relative_dir == "." else f"./{relative_dir}/"
+        if consolidated:
+            output_file_name = self._write_consolidated(
+                element, schemaview, pending_writes, output_dir
+            )
+            for write in pending_writes:
+                write.source["file"] = prefix + output_file_name
+                write.source["path"] = write.path
+        else:
+            _check_output_file_names(pending_writes)
+            output_file_paths = map_in_threads(
+                lambda write: self.write_array(
+                    write.array, output_dir / write.output_file_name, write.range_dtype
+                ),
+                pending_writes,
+                max_workers,
+            )
+            for write, output_file_path in zip(pending_writes, output_file_paths):
+                write.source["file"] = prefix + Path(output_file_path).name
+
+        return yaml_dump(input, yaml_backend)
+
+    def dump(
+        self,
+        element: Union[YAMLRoot, BaseModel],
+        to_file: Union[str, Path],
+        schemaview: SchemaView,
+        **kwargs,
+    ):
+        """Write element as YAML to to_file, with file paths relative to the directory of to_file.
+
+        The arrays are written to files in output_dir, by default the directory of to_file.
+        Other keyword arguments are passed to ``dumps``.
+        """
+        manifest_dir = Path(to_file).parent
+        kwargs.setdefault("output_dir", manifest_dir)
+        yaml_str = self.dumps(element, schemaview, manifest_dir=manifest_dir, **kwargs)
+        with open(to_file, "w", encoding="UTF-8") as f:
+            f.write(yaml_str)
+
+    async def adumps(
+        self,
+        element: Union[YAMLRoot, BaseModel],
+        schemaview: SchemaView,
+        executor: Optional[Executor] = None,
+        **kwargs,
+    ) -> str:
+        """Dump the element as YAML with arrays in files and return the YAML string.
+
+        This is a coroutine variant of ``dumps`` for use in an asyncio event loop. The dump runs in
+        executor, or in the default executor of the event loop if None. Keyword arguments are
+        passed to ``dumps``. If the coroutine is cancelled, the dump still runs to completion, so
+        that no file is left open or half written.
+        """
+        return await run_in_executor(executor, self.dumps, element, schemaview, **kwargs)
+
+    def _write_consolidated(
+        self,
+        element: Union[YAMLRoot, BaseModel],
+        schemaview: SchemaView,
+        pending_writes: List[_PendingWrite],
+        output_dir: Path,
+    ) -> str:
+        """Write all pending arrays to a single file in output_dir and return the file name."""
+        class_plan = get_class_plan(schemaview, type(element).__name__)
+        if class_plan.identifier_slot is not None:
+            file_name = str(getattr(element, class_plan.identifier_slot))
+        else:
+            file_name = class_plan.name
+        output_file_path = self.write_arrays(
+            [(write.array, write.path, write.range_dtype) for write in pending_writes],
+            output_dir / file_name,
+        )
+        return Path(output_file_path).name
 
     @classmethod
     @abstractmethod
-    def write_array(cls, array: Union[List, np.ndarray], output_file_path: Union[str, Path]):
-        """Write an array to a file."""
+    def write_array(
+        cls,
+        array: Union[List, np.ndarray],
+        output_file_path: Union[str, Path],
+        range_dtype: Optional[np.dtype] = None,
+    ):
+        """Write an array to a file.
+
+        NumPy arrays should be written without an intermediate copy. Lists should be converted to
+        arrays of range_dtype, the data type of the slot range, if it is given.
+        """
         raise NotImplementedError("Subclasses must implement this method.")
+
+    @classmethod
+    def write_arrays(
+        cls,
+        arrays: List[Tuple[Union[List, np.ndarray], str, Optional[np.dtype]]],
+        output_file_path_no_suffix: Union[str, Path],
+    ) -> Path:
+        """Write arrays to a single file, keyed by their paths, and return the file path.
+
+        Each entry of arrays is the array, its path in the element, and the data type of the slot
+        range.
+
+        Raises:
+            NotImplementedError: If the format does not support writing arrays to a single file.
+        """
+        raise NotImplementedError(f"{cls.__name__} does not support consolidated files.")
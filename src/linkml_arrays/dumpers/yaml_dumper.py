@@ -1,49 +1,73 @@
 """Class for dumping a LinkML model to YAML."""
 
-from typing import Union
+from typing import Optional, Union
 
-import yaml
 from linkml_runtime import SchemaView
 from linkml_runtime.dumpers.dumper_root import Dumper
 from linkml_runtime.utils.yamlutils import YAMLRoot
 from pydantic import BaseModel
 
+from ..binary_array import ENCODINGS, encode_array
+from ..inlined_collection import is_collection
+from ..schema_plan import get_class_plan
+from ..utils import to_ndarray
+from ..yaml_backend import yaml_dump
+
 
 def _iterate_element(
-    element: Union[YAMLRoot, BaseModel], schemaview: SchemaView, parent_identifier=None
+    element: Union[YAMLRoot, BaseModel],
+    schemaview: SchemaView,
+    parent_identifier=None,
+    array_encoding: Optional[str] = None,
 ):
     """Recursively iterate through the elements of a LinkML model and save them.
 
     Returns a dictionary with the same structure as the input element, but where the slots
-    with the "array" element are written as lists of lists in YAML.
+    with the "array" element, e.g., lists of lists or NumPy arrays, are written as lists of lists
+    in YAML, or as dicts with the dtype, shape, and encoded bytes of the array if array_encoding
+    is given.
+
+    Collections of objects are written as lists, or as dicts keyed by identifier, of the dicts
+    of their objects.
 
     Raises:
         ValueError: If the class requires an identifier and it is not provided.
     """
-    # get the type of the element
-    element_type = type(element).__name__
+    # get the precomputed schema information for the type of the element
+    class_plan = get_class_plan(schemaview, type(element).__name__)
 
-    # ask schemaview whether it has a class by this name
-    found_class = schemaview.get_class(element_type)
-
-    id_slot = schemaview.get_identifier_slot(found_class.name)
+    id_slot = class_plan.identifier_slot
     if id_slot is not None:
-        id_value = getattr(element, id_slot.name)
+        id_value = getattr(element, id_slot)
     else:
         id_value = None
 
     ret_dict = dict()
     for k, v in vars(element).items():
-        found_slot = schemaview.induced_slot(k, element_type)
-        if found_slot.array:
+        found_slot = class_plan.get_slot(k)
+        if found_slot.is_array:
             if id_slot is None and parent_identifier is None:
                 raise ValueError("The class requires an identifier.")
-            assert isinstance(v, list)
-            ret_dict[k] = v
+            if array_encoding is not None:
+                ret_dict[k] = encode_array(v)
+            elif isinstance(v, list):
+                ret_dict[k] = v
+            else:
+                # e.g., a NumPy array of a model with NumPy array slots
+                ret_dict[k] = to_ndarray(v, found_slot.dtype).tolist()
         else:
             if isinstance(v, BaseModel):
-                v2 = _iterate_element(v, schemaview, id_value)
+                v2 = _iterate_element(v, schemaview, id_value, array_encoding)
                 ret_dict[k] = v2
+            elif is_collection(v) and isinstance(v, dict):
+                ret_dict[k] = {
+                    key: _iterate_element(item, schemaview, id_value, array_encoding)
+                    for key, item in v.items()
+                }
+            elif is_collection(v):
+                ret_dict[k] = [
+                    _iterate_element(item, schemaview, id_value, array_encoding) for item in v
+                ]
             else:
                 ret_dict[k] = v
     return ret_dict
@@ -52,8 +76,32 @@ def _iterate_element(
 class YamlDumper(Dumper):
     """Dumper class for LinkML models to YAML files."""
 
-    def dumps(self, element: Union[YAMLRoot, BaseModel], schemaview: SchemaView, **kwargs) -> str:
-        """Return element formatted as a YAML string."""
-        input = _iterate_element(element, schemaview)
+    def dumps(
+        self,
+        element: Union[YAMLRoot, BaseModel],
+        schemaview: SchemaView,
+        array_encoding: Optional[str] = None,
+        yaml_backend: str = "auto",
+        **kwargs,
+    ) -> str:
+        """Return element formatted as a YAML string.
+
+        By default, arrays are written as lists of lists. If array_encoding is "base64", arrays are
+        written as the base64 of their raw little-endian bytes together with their dtype and shape,
+        which is much faster to write and read and much smaller for large arrays. YamlLoader
+        decodes these arrays directly into NumPy arrays.
+
+        The YAML is written with yaml_backend, one of "auto" (the default, which uses the LibYAML
+        C emitter if available), "libyaml", "pyyaml", or "ruamel". See
+        ``linkml_arrays.yaml_backend``.
+
+        Raises:
+            ValueError: If the array encoding is not supported.
+        """
+        if array_encoding is not None and array_encoding not in ENCODINGS:
+            raise ValueError(
+                f"Unsupported array encoding {array_encoding}. Supported are {ENCODINGS}."
+            )
+        input = _iterate_element(element, schemaview, array_encoding=array_encoding)
 
-        return yaml.dump(input)
+        return yaml_dump(input, yaml_backend)
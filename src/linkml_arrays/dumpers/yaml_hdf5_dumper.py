@@ -1,29 +1,39 @@
 """Class for dumping a LinkML model to YAML with paths to HDF5 files."""
 
 from pathlib import Path
-from typing import List, Union
+from typing import List, Optional, Tuple, Union
 
 import h5py
 import numpy as np
 
+from .hdf5_dumper import _create_dataset
 from .yaml_array_file_dumper import YamlArrayFileDumper
 
 
 class YamlHdf5Dumper(YamlArrayFileDumper):
     """Dumper class for LinkML models to YAML with paths to HDF5 files, one per array.
 
-    Each array is written to an HDF5 dataset at path "/data" in a new HDF5 file.
+    Each array is written to an HDF5 dataset at path "/data" in a new HDF5 file. In consolidated
+    mode, all arrays are written to a single HDF5 file, each at its path in the element.
     """
 
     FILE_SUFFIX = ".h5"  # used in parent class
+    CONSOLIDATED_FILE_SUFFIX = ".h5"
     FORMAT = "hdf5"
 
     @classmethod
     def write_array(
-        cls, array: Union[List, np.ndarray], output_file_path_no_suffix: Union[str, Path]
+        cls,
+        array: Union[List, np.ndarray],
+        output_file_path_no_suffix: Union[str, Path],
+        range_dtype: Optional[np.dtype] = None,
     ):
-        """Write an array to an HDF5 file."""
-        # TODO do not assume that there is only one by this name
+        """Write an array to an HDF5 file.
+
+        NumPy arrays are written without an intermediate copy, and lists are converted to arrays of
+        range_dtype in a single call. Arrays backed by storage, e.g., lazily loaded arrays, are
+        copied block by block.
+        """
         # add suffix to the file name
         if isinstance(output_file_path_no_suffix, str):
             output_file_path_no_suffix = Path(output_file_path_no_suffix)
@@ -31,5 +41,24 @@ class YamlHdf5Dumper(YamlArrayFileDumper):
             output_file_path_no_suffix.name + cls.FILE_SUFFIX
         )
         with h5py.File(output_file_path, "w") as f:
-            f.create_dataset("data", data=array)
+            _create_dataset(f, "data", array, range_dtype)
+        return output_file_path
+
+    @classmethod
+    def write_arrays(
+        cls,
+        arrays: List[Tuple[Union[List, np.ndarray], str, Optional[np.dtype]]],
+        output_file_path_no_suffix: Union[str, Path],
+    ) -> Path:
+        """Write arrays to datasets at their paths in a single HDF5 file.
+
+        Intermediate groups are created for paths with more than one part.
+        """
+        output_file_path_no_suffix = Path(output_file_path_no_suffix)
+        output_file_path = output_file_path_no_suffix.parent / (
+            output_file_path_no_suffix.name + cls.CONSOLIDATED_FILE_SUFFIX
+        )
+        with h5py.File(output_file_path, "w") as f:
+            for array, path, range_dtype in arrays:
+                _create_dataset(f, path, array, range_dtype)
         return output_file_path
@@ -1,27 +1,67 @@
 """Class for dumping a LinkML model to YAML with paths to NumPy files."""
 
+import zipfile
 from pathlib import Path
-from typing import List, Union
+from typing import List, Optional, Tuple, Union
 
 import numpy as np
 
 from .yaml_array_file_dumper import YamlArrayFileDumper
+from ..utils import (
+    DEFAULT_MAX_BLOCK_BYTES,
+    copy_array_chunked,
+    is_out_of_core,
+    to_fixed_width,
+    to_ndarray,
+)
+
+
+def _write_npy_chunked(f, array, max_block_bytes: int = DEFAULT_MAX_BLOCK_BYTES):
+    """Write an array backed by storage in NumPy format to a file object, block by block.
+
+    The blocks are runs of whole rows along the first dimension, so that they are contiguous in
+    C order in the file.
+    """
+    header = {
+        "descr": np.lib.format.dtype_to_descr(array.dtype),
+        "fortran_order": False,
+        "shape": tuple(array.shape),
+    }
+    np.lib.format.write_array_header_2_0(f, header)
+    if len(array.shape) == 0:
+        f.write(np.asarray(array[()]).tobytes())
+        return
+    row_bytes = array.dtype.itemsize * int(np.prod(array.shape[1:]))
+    rows = max(1, max_block_bytes // max(1, row_bytes))
+    for start in range(0, array.shape[0], rows):
+        f.write(np.ascontiguousarray(array[start : start + rows]).tobytes())  # noqa: E203
 
 
 class YamlNumpyDumper(YamlArrayFileDumper):
     """Dumper class for LinkML models to YAML with paths to .npy files, one per array.
 
-    Each array is written to an HDF5 dataset at path "/data" in a new HDF5 file.
+    Each array is written to a new .npy file. In consolidated mode, all arrays are written to a
+    single uncompressed .npz file, keyed by their paths in the element, so that they can still be
+    memory-mapped.
     """
 
     FILE_SUFFIX = ".npy"  # used in parent class
+    CONSOLIDATED_FILE_SUFFIX = ".npz"
     FORMAT = "numpy"
 
     @classmethod
     def write_array(
-        cls, array: Union[List, np.ndarray], output_file_path_no_suffix: Union[str, Path]
+        cls,
+        array: Union[List, np.ndarray],
+        output_file_path_no_suffix: Union[str, Path],
+        range_dtype: Optional[np.dtype] = None,
     ):
-        """Write an array to a NumPy file."""
+        """Write an array to a NumPy file.
+
+        NumPy arrays and buffers are written without an intermediate copy, and lists are converted
+        to arrays of range_dtype in a single call. Arrays backed by storage, e.g., lazily loaded
+        arrays, and Dask arrays are copied block by block into a memory-mapped NumPy file.
+        """
         # TODO do not assume that there is only one by this name
         # add suffix to the file name
         if isinstance(output_file_path_no_suffix, str):
@@ -29,6 +69,40 @@ class YamlNumpyDumper(YamlArrayFileDumper):
         output_file_path = output_file_path_no_suffix.parent / (
             output_file_path_no_suffix.name + cls.FILE_SUFFIX
         )
-        arr = np.array(array)
-        np.save(output_file_path, arr)
+        if is_out_of_core(array):
+            out = np.lib.format.open_memmap(
+                output_file_path, mode="w+", dtype=array.dtype, shape=array.shape
+            )
+            # concurrent writes of Dask chunks to disjoint parts of the file need no lock
+            copy_array_chunked(array, out, lock=False)
+            out.flush()
+            del out
+        else:
+            arr = to_fixed_width(to_ndarray(array, range_dtype))
+            np.save(output_file_path, arr)
+        return output_file_path
+
+    @classmethod
+    def write_arrays(
+        cls,
+        arrays: List[Tuple[Union[List, np.ndarray], str, Optional[np.dtype]]],
+        output_file_path_no_suffix: Union[str, Path],
+    ) -> Path:
+        """Write arrays to a single uncompressed .npz file, keyed by their paths.
+
+        The file is written like ``np.savez``, but one array at a time, so that lists are converted
+        one at a time and arrays backed by storage are copied block by block.
+        """
+        output_file_path_no_suffix = Path(output_file_path_no_suffix)
+        output_file_path = output_file_path_no_suffix.parent / (
+            output_file_path_no_suffix.name + cls.CONSOLIDATED_FILE_SUFFIX
+        )
+        with zipfile.ZipFile(output_file_path, mode="w", compression=zipfile.ZIP_STORED) as zf:
+            for array, path, range_dtype in arrays:
+                with zf.open(f"{path}.npy", mode="w", force_zip64=True) as f:
+                    if is_out_of_core(array):
+                        _write_npy_chunked(f, array)
+                    else:
+                        arr = to_fixed_width(to_ndarray(array, range_dtype))
+                        np.lib.format.write_array(f, arr, allow_pickle=False)
         return output_file_path
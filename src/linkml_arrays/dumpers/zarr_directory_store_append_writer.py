@@ -0,0 +1,61 @@
+"""Class for writing a LinkML model to a Zarr directory store and then appending to its arrays."""
+
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+import numpy as np
+import zarr
+from linkml_runtime import SchemaView
+from linkml_runtime.utils.yamlutils import YAMLRoot
+from pydantic import BaseModel
+
+from .append_writer import AppendWriter
+from .zarr_directory_store_dumper import _create_array, _iterate_element
+
+
+class ZarrDirectoryStoreAppendWriter(AppendWriter):
+    """Writer for LinkML models to Zarr directory stores with arrays that can be appended to.
+
+    The model is written as by ZarrDirectoryStoreDumper when the writer is created. Set the chunk
+    shape with the storage options to match the size of the batches that will be appended,
+    because the default chunk shape of zarr is chosen from the initial shape of the array.
+    """
+
+    def __init__(
+        self,
+        element: Union[YAMLRoot, BaseModel],
+        schemaview: SchemaView,
+        output_file_path: Union[str, Path],
+        storage_options: Optional[dict] = None,
+        slot_storage_options: Optional[Dict[str, dict]] = None,
+    ):
+        """Write the element to a Zarr directory store."""
+        super().__init__()
+        self._store = zarr.DirectoryStore(output_file_path)
+        self._root = zarr.group(store=self._store, overwrite=True)
+        _iterate_element(
+            element,
+            schemaview,
+            self._root,
+            storage_options,
+            slot_storage_options,
+            self._deferred_arrays,
+        )
+
+    def _get_array(self, path: str) -> Optional[zarr.Array]:
+        """Return the array at the path in the store, or None if there is no array at the path."""
+        array = self._root.get(path)
+        if isinstance(array, zarr.Array):
+            return array
+        return None
+
+    def _create_array(self, path: str, data: np.ndarray, options: dict):
+        """Create an array at the path with the data and storage options."""
+        _create_array(self._root, path, data, options)
+
+    def flush(self):
+        """Flush buffered data to the store. Zarr directory stores write through on assignment."""
+
+    def close(self):
+        """Close the store."""
+        self._store.close()
@@ -1,38 +1,211 @@
 """Class for dumping a LinkML model to a Zarr directory store."""
 
+import os
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
 from pathlib import Path
-from typing import Union
+from typing import Any, Dict, Optional, Set, Tuple, Union
 
+import numpy as np
 import zarr
 from linkml_runtime import SchemaView
 from linkml_runtime.dumpers.dumper_root import Dumper
 from linkml_runtime.utils.yamlutils import YAMLRoot
 from pydantic import BaseModel
 
+from .storage_options import resolve_storage_options, zarr_array_kwargs
+from ..dask_array import chunks_aligned, is_dask_array
+from ..inlined_collection import is_collection, iter_collection_items
+from ..schema_plan import get_class_plan
+from ..utils import (
+    copy_array_chunked,
+    get_block_shape,
+    is_out_of_core,
+    iter_blocks,
+    run_in_executor,
+    to_fixed_width,
+    to_ndarray,
+)
+
+# supported pools for concurrent writes of the regions of arrays
+POOLS = ("thread", "process")
+# default maximum number of bytes of a region of an array that is written by one task
+DEFAULT_REGION_BYTES = 8 * 1024 * 1024
+
+
+def _write_region(array: zarr.core.Array, region: Tuple[slice, ...], data: np.ndarray):
+    """Compress and write the data to a region of whole chunks of the array.
+
+    This runs in a worker of the pool. Zarr arrays are pickled with their store and path, so a
+    worker process opens the array in the same directory store.
+    """
+    array[region] = data
+
+
+class _RegionWriter:
+    """Writer of arrays region by region in a thread or process pool.
+
+    Each region spans whole chunks of the array, except at its end, so no two regions write to
+    the same chunk, including partial chunks at the edges, and the regions are written without a
+    lock. The regions are read from the source in the calling thread, and at most two regions per
+    worker are in flight, so that out-of-core arrays are never fully in memory.
+    """
+
+    def __init__(self, executor: Executor, max_workers: int, region_bytes: int):
+        """Create a writer that submits the regions to the executor."""
+        self.executor = executor
+        self.max_in_flight = 2 * max_workers
+        self.region_bytes = region_bytes
+        self._pending: Set[Future] = set()
+
+    def get_region_shape(self, array: zarr.core.Array) -> Tuple[int, ...]:
+        """Return the shape of the regions of the array, in whole chunks."""
+        block_shape = get_block_shape(
+            array.shape, array.dtype.itemsize, array.chunks, self.region_bytes
+        )
+        return tuple(-(-block // chunk) * chunk for block, chunk in zip(block_shape, array.chunks))
+
+    def write(self, array: zarr.core.Array, source: Any):
+        """Submit the writes of the regions of the source to the array."""
+        for region in iter_blocks(array.shape, self.get_region_shape(array)):
+            if len(self._pending) >= self.max_in_flight:
+                done, self._pending = wait(self._pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    future.result()
+            data = np.asarray(source[region])
+            self._pending.add(self.executor.submit(_write_region, array, region, data))
+
+    def wait(self):
+        """Wait until all submitted regions are written.
+
+        Raises:
+            Exception: The first exception raised by a write.
+        """
+        pending, self._pending = self._pending, set()
+        for future in pending:
+            future.result()
+
+
+def _create_array(
+    group: zarr.hierarchy.Group,
+    name: str,
+    v,
+    options: dict,
+    range_dtype: Optional[np.dtype] = None,
+    writer: Optional[_RegionWriter] = None,
+) -> zarr.core.Array:
+    """Create an array from an array-like, copying arrays backed by storage block by block.
+
+    NumPy arrays and buffers are written without an intermediate copy. Lists are converted with
+    range_dtype, e.g., the data type of the slot range, in a single call. Dask arrays are written
+    chunk by chunk in parallel, with Zarr chunks that match the Dask chunks unless the storage
+    options set the chunks.
+
+    If writer is given, other arrays are created empty, and their regions are submitted to the
+    writer to be compressed and written concurrently. The caller must wait for the writer.
+    """
+    if is_dask_array(v) and is_out_of_core(v):
+        kwargs = zarr_array_kwargs(options, v.dtype)
+        # write each Dask chunk to whole Zarr chunks, so that they can be written concurrently
+        kwargs.setdefault("chunks", v.chunksize)
+        array = group.create_dataset(name, shape=v.shape, dtype=v.dtype, **kwargs)
+        copy_array_chunked(v, array, lock=not chunks_aligned(v.chunks, array.chunks))
+        return array
+    if not is_out_of_core(v):
+        v = to_fixed_width(to_ndarray(v, range_dtype))
+        if writer is None:
+            return group.create_dataset(name, data=v, **zarr_array_kwargs(options, v.dtype))
+    kwargs = zarr_array_kwargs(options, v.dtype)
+    array = group.create_dataset(name, shape=v.shape, dtype=v.dtype, **kwargs)
+    if writer is not None and array.ndim > 0:
+        writer.write(array, v)
+    else:
+        copy_array_chunked(v, array)
+    return array
+
 
 def _iterate_element(
-    element: Union[YAMLRoot, BaseModel], schemaview: SchemaView, group: zarr.hierarchy.Group = None
+    element: Union[YAMLRoot, BaseModel],
+    schemaview: SchemaView,
+    group: zarr.hierarchy.Group = None,
+    storage_options: Optional[dict] = None,
+    slot_storage_options: Optional[Dict[str, dict]] = None,
+    deferred_arrays: Optional[Dict[str, dict]] = None,
+    writer: Optional[_RegionWriter] = None,
 ):
     """Recursively iterate through the elements of a LinkML model and save them.
 
     Write Pydantic BaseModel objects as groups, slots with the "array" element
-    as arrays, and other slots as attributes.
+    as arrays, and other slots as attributes. Arrays are created with the storage options
+    resolved for the array slot, e.g., chunking and compression. Arrays backed by storage, e.g.,
+    lazily loaded arrays, are copied block by block so that they are never fully in memory.
+
+    If deferred_arrays is not None, empty arrays are not created. Instead, their storage options
+    are recorded in deferred_arrays, keyed by path, so that they can be created on the first
+    append. Zarr arrays are always resizable.
+
+    If writer is given, the regions of arrays are written concurrently by the writer.
+
+    Collections of objects are written as groups with a group per object. See
+    ``linkml_arrays.inlined_collection``.
     """
-    # get the type of the element
-    element_type = type(element).__name__
+    # get the precomputed schema information for the type of the element
+    class_plan = get_class_plan(schemaview, type(element).__name__)
 
     for k, v in vars(element).items():
-        found_slot = schemaview.induced_slot(k, element_type)
-        if found_slot.array:
+        found_slot = class_plan.get_slot(k)
+        if found_slot.is_array:
+            # path of the array in the file, e.g., "temperature_dataset/temperatures_in_K/values"
+            path = f"{group.name}/{found_slot.name}".lstrip("/")
+            options = resolve_storage_options(
+                class_plan.name,
+                found_slot,
+                path,
+                storage_options,
+                slot_storage_options,
+            )
+            if deferred_arrays is not None and np.size(v) == 0:
+                deferred_arrays[path] = options
+                continue
             # save the numpy array to a zarr array
-            group.create_dataset(found_slot.name, data=v)
+            _create_array(group, found_slot.name, v, options, found_slot.dtype, writer)
         else:
             if isinstance(v, BaseModel):
                 # create a subgroup and recurse
                 subgroup = group.create_group(k)
-                _iterate_element(v, schemaview, subgroup)
+                _iterate_element(
+                    v,
+                    schemaview,
+                    subgroup,
+                    storage_options,
+                    slot_storage_options,
+                    deferred_arrays,
+                    writer,
+                )
+            elif is_collection(v):
+                # create a subgroup with a subgroup per object and recurse
+                subgroup = group.create_group(k)
+                for name, item in iter_collection_items(v, class_plan, k):
+                    _iterate_element(
+                        item,
+                        schemaview,
+                        subgroup.create_group(name),
+                        storage_options,
+                        slot_storage_options,
+                        deferred_arrays,
+                        writer,
+                    )
             else:
-                # create an attribute on the group
+                # create an attribute on the group. zarr attributes are stored as JSON, so
+                # numpy scalars, e.g., read from an HDF5 file, are converted to Python scalars
+                if isinstance(v, np.generic):
+                    v = v.item()
                 group.attrs[k] = v
 
 
@@ -45,9 +218,61 @@ class ZarrDirectoryStoreDumper(Dumper):
         element: Union[YAMLRoot, BaseModel],
         schemaview: SchemaView,
         output_file_path: Union[str, Path],
+        storage_options: Optional[dict] = None,
+        slot_storage_options: Optional[Dict[str, dict]] = None,
+        max_workers: Optional[int] = 1,
+        pool: str = "thread",
+        region_bytes: int = DEFAULT_REGION_BYTES,
         **kwargs,
     ):
-        """Dump the element to a Zarr directory store."""
+        """Dump the element to a Zarr directory store.
+
+        storage_options, e.g., ``{"chunks": [100, 100, 1], "compression": "gzip"}``, apply to
+        all arrays. They are overridden by the "storage" annotation of an array slot in the schema
+        and by slot_storage_options, keyed by class-qualified slot name, e.g.,
+        "TemperaturesInKMatrix.values", or by the path of the array, e.g.,
+        "temperature_dataset/temperatures_in_K/values". See
+        ``linkml_arrays.dumpers.storage_options`` for the supported options.
+
+        If max_workers is not 1, each array is split into regions of whole chunks of at most about
+        region_bytes, which are compressed and written concurrently by max_workers workers (None
+        for the number of CPUs) of a pool, either "thread" or "process". Compressors that release
+        the GIL, e.g., Blosc and Zstd, scale with threads, while others need processes, to which
+        each region is sent by pickling. Because no two regions share a chunk, the output does
+        not depend on the pool.
+
+        Raises:
+            ValueError: If the pool is not supported.
+        """
+        if pool not in POOLS:
+            raise ValueError(f"Unsupported pool {pool}. Supported pools are {POOLS}.")
         store = zarr.DirectoryStore(output_file_path)
         root = zarr.group(store=store, overwrite=True)
-        _iterate_element(element, schemaview, root)
+        if max_workers == 1:
+            _iterate_element(element, schemaview, root, storage_options, slot_storage_options)
+            return
+
+        max_workers = max_workers or os.cpu_count() or 1
+        executor_class = ThreadPoolExecutor if pool == "thread" else ProcessPoolExecutor
+        with executor_class(max_workers=max_workers) as executor:
+            writer = _RegionWriter(executor, max_workers, region_bytes)
+            _iterate_element(
+                element, schemaview, root, storage_options, slot_storage_options, None, writer
+            )
+            writer.wait()
+
+    async def adumps(
+        self,
+        element: Union[YAMLRoot, BaseModel],
+        schemaview: SchemaView,
+        executor: Optional[Executor] = None,
+        **kwargs,
+    ):
+        """Dump the element to a Zarr directory store.
+
+        This is a coroutine variant of ``dumps`` for use in an asyncio event loop. The dump runs in
+        executor, or in the default executor of the event loop if None. Keyword arguments are
+        passed to ``dumps``. If the coroutine is cancelled, the dump still runs to completion, so
+        that no file is left open or half written.
+        """
+        return await run_in_executor(executor, self.dumps, element, schemaview, **kwargs)
@@ -0,0 +1,85 @@
+"""Functions for collections, i.e., multivalued slots whose range is a class of inlined objects.
+
+As in the models generated by gen-pydantic, the objects of a collection are a dict keyed by
+identifier if their class has an identifier slot and the slot is not ``inlined_as_list``, and a
+list otherwise. In YAML, a collection is written as a list or a mapping of objects. In HDF5 files
+and Zarr stores, a collection is a group with one subgroup per object, named by the identifier of
+the object in a keyed collection and by the index of the object in a list.
+
+A collection is addressed by the slot path from the root object, with parts separated by "/" or
+".", e.g., "batches" or "experiment/samples". All slots on the way to the collection must be
+single-valued objects.
+"""
+
+from typing import Any, Iterable, Iterator, List, Tuple
+
+from linkml_runtime.utils.yamlutils import YAMLRoot
+from pydantic import BaseModel
+
+from .schema_plan import ClassPlan
+
+
+def is_collection(v: Any) -> bool:
+    """Return whether the value is a non-empty list or dict of objects."""
+    if not isinstance(v, (list, dict)) or len(v) == 0:
+        return False
+    items = v.values() if isinstance(v, dict) else v
+    return all(isinstance(item, (BaseModel, YAMLRoot)) for item in items)
+
+
+def is_keyed(class_plan: ClassPlan, slot_name: str) -> bool:
+    """Return whether the objects of the collection slot are keyed by their identifier."""
+    slot = class_plan.get_slot(slot_name)
+    if slot.definition.inlined_as_list:
+        return False
+    return class_plan.get_range_plan(slot_name).identifier_slot is not None
+
+
+def iter_collection_items(
+    v: Any, class_plan: ClassPlan, slot_name: str
+) -> Iterator[Tuple[str, Any]]:
+    """Iterate over the objects of a collection with the names of their groups in storage."""
+    if isinstance(v, dict):
+        yield from ((str(key), item) for key, item in v.items())
+        return
+    if is_keyed(class_plan, slot_name):
+        id_slot = class_plan.get_range_plan(slot_name).identifier_slot
+        yield from ((str(getattr(item, id_slot)), item) for item in v)
+        return
+    yield from ((str(i), item) for i, item in enumerate(v))
+
+
+def sort_item_names(names: Iterable[str], keyed: bool) -> List[str]:
+    """Return the names of the groups of the objects of a collection in the order of the objects.
+
+    The groups of a list are named by index, which storage does not keep in numeric order.
+    """
+    if keyed:
+        return list(names)
+    return sorted(names, key=int)
+
+
+def resolve_collection(class_plan: ClassPlan, path: str) -> Tuple[Tuple[str, ...], ClassPlan, bool]:
+    """Resolve the slot path of a collection.
+
+    Return the parts of the path, the plan of the class of the objects of the collection, and
+    whether they are keyed by identifier.
+
+    Raises:
+        ValueError: If the path is empty, a slot on the way to the collection is not a
+            single-valued object, or the slot at the path is not a collection.
+    """
+    parts = tuple(part for part in path.replace(".", "/").split("/") if part)
+    if not parts:
+        raise ValueError("The path of a collection must not be empty.")
+    for i, part in enumerate(parts):
+        slot = class_plan.get_slot(part)
+        is_last = i == len(parts) - 1
+        if slot.is_array or bool(slot.multivalued) != is_last:
+            kind = "multivalued slot of objects" if is_last else "single-valued slot of an object"
+            raise ValueError(f"Slot {part} of class {class_plan.name} is not a {kind}.")
+        if slot.range is None or class_plan.schemaview.get_class(slot.range) is None:
+            raise ValueError(f"The range of slot {part} of class {class_plan.name} is not a class.")
+        keyed = is_keyed(class_plan, part)
+        class_plan = class_plan.get_range_plan(part)
+    return parts, class_plan, keyed
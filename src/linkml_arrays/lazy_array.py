@@ -0,0 +1,74 @@
+"""Class for lazily accessing arrays that are stored in a file."""
+
+from typing import Any, Iterator, Optional, Tuple
+
+import numpy as np
+
+
+class LazyArray:
+    """A read-only, NumPy-compatible proxy for an array stored in a file.
+
+    The proxy wraps a sliceable array-like object, such as an ``h5py.Dataset``, that reads from
+    storage on indexing. Indexing the proxy reads only the selected elements and returns a NumPy
+    array. Converting the proxy with ``np.asarray`` reads the whole array.
+    """
+
+    def __init__(self, array: Any):
+        """Create a proxy for a sliceable array-like object."""
+        self._array = array
+
+    @property
+    def array(self) -> Any:
+        """Return the wrapped array-like object."""
+        return self._array
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        """Return the shape of the array."""
+        return tuple(self._array.shape)
+
+    @property
+    def dtype(self) -> np.dtype:
+        """Return the data type of the array."""
+        return self._array.dtype
+
+    @property
+    def ndim(self) -> int:
+        """Return the number of dimensions of the array."""
+        return len(self.shape)
+
+    @property
+    def size(self) -> int:
+        """Return the number of elements in the array."""
+        return int(np.prod(self.shape))
+
+    @property
+    def chunks(self) -> Optional[Tuple[int, ...]]:
+        """Return the chunk shape of the array in storage, or None if it is not chunked."""
+        return getattr(self._array, "chunks", None)
+
+    def __getitem__(self, key) -> np.ndarray:
+        """Read the selected elements from storage."""
+        return self._array[key]
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        """Read the whole array from storage."""
+        arr = np.asarray(self._array[()])
+        if dtype is not None:
+            arr = arr.astype(dtype, copy=False)
+        return arr
+
+    def __len__(self) -> int:
+        """Return the length of the first dimension of the array."""
+        if self.ndim == 0:
+            raise TypeError("len() of unsized object")
+        return self.shape[0]
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        """Iterate over the first dimension of the array, reading one entry at a time."""
+        for i in range(len(self)):
+            yield self[i]
+
+    def __repr__(self) -> str:
+        """Return a string representation of the proxy."""
+        return f"<{type(self).__name__} shape={self.shape} dtype={self.dtype}>"
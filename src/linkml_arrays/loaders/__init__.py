@@ -1,11 +1,13 @@
 """Dumper classes for linkml-arrays."""
 
+from .file_handle_pool import FileHandlePool
 from .hdf5_loader import Hdf5Loader
 from .yaml_array_file_loader import YamlArrayFileLoader
 from .yaml_loader import YamlLoader
 from .zarr_directory_store_loader import ZarrDirectoryStoreLoader
 
 __all__ = [
+    "FileHandlePool",
     "Hdf5Loader",
     "YamlArrayFileLoader",
     "YamlLoader",
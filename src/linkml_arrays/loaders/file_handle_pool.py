@@ -0,0 +1,175 @@
+"""Class for sharing open array files between the sources of one or more loads."""
+
+import os
+import threading
+import weakref
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Iterator, List, Optional, Tuple
+
+import h5py
+import numpy as np
+
+# supported formats of the files in a pool
+POOL_FORMATS = ("hdf5", "numpy")
+
+
+def _open_file(file: str, format: str) -> Any:
+    """Open an array file in the format for reading."""
+    if format == "hdf5":
+        return h5py.File(file, "r")
+    return np.load(file, allow_pickle=False)
+
+
+def _close_files(files: "OrderedDict[Tuple[str, str], list]", detached: List[list]):
+    """Close all files in the pool entries, e.g., when the pool is garbage collected."""
+    for entry in [*files.values(), *detached]:
+        entry[0].close()
+    files.clear()
+    detached.clear()
+
+
+class FileHandlePool:
+    """Pool of open HDF5 and .npz files keyed by resolved path, so that each file is opened once.
+
+    Opening an HDF5 file reads its superblock and metadata, so sources that refer to arrays in
+    the same file share a handle. A handle is reopened if the file was modified since it was
+    opened. The stale handle is closed, or, if it is in use, detached from the pool and closed
+    once it is no longer in use.
+
+    Arrays that read from an open file after it is yielded by ``open``, e.g., Dask arrays, keep
+    the file in use while they are alive if they are registered with ``keep_open``.
+
+    If max_size is set, at most that many files are kept open. When another file is opened, the
+    least recently used files that are not in use are closed. Files in use are never closed, so
+    the pool may briefly hold more files when more are in use at once, e.g., by reader threads.
+
+    The files are closed when the pool is closed, either by calling ``close`` or by using the pool
+    as a context manager, or when the pool is garbage collected. Files that are in use when the
+    pool is closed, e.g., by a read in another thread of a cancelled load, are closed when they
+    are no longer in use. The pool can be used again after it is closed.
+    """
+
+    def __init__(self, max_size: Optional[int] = None):
+        """Create an empty pool that keeps at most max_size files open, or all if None.
+
+        Raises:
+            ValueError: If max_size is less than 1.
+        """
+        if max_size is not None and max_size < 1:
+            raise ValueError(
+                f"The maximum number of open files must be at least 1, not {max_size}."
+            )
+        self.max_size = max_size
+        # entries of [handle, modification time, number of users, whether to close the handle
+        # when it is no longer in use, number of arrays that read from the handle], keyed by
+        # resolved path and format, from least to most recently used
+        self._files: "OrderedDict[Tuple[str, str], list]" = OrderedDict()
+        # entries of files that were modified since they were opened and are still in use
+        self._detached: List[list] = []
+        self._lock = threading.Lock()
+        self._finalizer = weakref.finalize(self, _close_files, self._files, self._detached)
+
+    def __enter__(self):
+        """Return the pool for use as a context manager."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Close all files in the pool."""
+        self.close()
+
+    def __len__(self) -> int:
+        """Return the number of open files in the pool, not counting detached stale handles."""
+        return len(self._files)
+
+    @contextmanager
+    def open(self, file: str, format: str) -> Iterator[Any]:
+        """Return a context manager that yields the open file, opening it if it is not open yet.
+
+        The file is not closed by the pool while the context manager is active.
+
+        Raises:
+            ValueError: If the format is not supported.
+        """
+        if format not in POOL_FORMATS:
+            raise ValueError(f"Unsupported format {format}. Supported are {POOL_FORMATS}.")
+        key = (os.path.realpath(file), format)
+        modified = os.stat(key[0]).st_mtime_ns
+        with self._lock:
+            entry = self._files.get(key)
+            if entry is not None and entry[1] != modified:
+                # the file was rewritten since it was opened
+                del self._files[key]
+                entry[3] = True
+                self._detached.append(entry)
+                self._close_if_released(entry)
+                entry = None
+            if entry is None:
+                entry = [_open_file(key[0], format), modified, 0, False, 0]
+                self._files[key] = entry
+            self._files.move_to_end(key)
+            entry[2] += 1
+            self._evict()
+        try:
+            yield entry[0]
+        finally:
+            with self._lock:
+                entry[2] -= 1
+                self._close_if_released(entry)
+                self._evict()
+
+    def keep_open(self, handle: Any, array: Any):
+        """Keep an open file of the pool in use while an array that reads from it is alive.
+
+        The file is not closed by eviction or when it is modified until the array is garbage
+        collected, but it is closed when the pool is closed.
+
+        Raises:
+            ValueError: If the file is not open in the pool.
+        """
+        with self._lock:
+            entry = next(
+                (e for e in [*self._files.values(), *self._detached] if e[0] is handle), None
+            )
+            if entry is None:
+                raise ValueError(f"File {handle} is not open in the pool.")
+            entry[4] += 1
+        weakref.finalize(array, self._release_array, entry)
+
+    def _release_array(self, entry: list):
+        """Release the file of an array that was garbage collected."""
+        with self._lock:
+            entry[4] -= 1
+            self._close_if_released(entry)
+            self._evict()
+
+    def _close_if_released(self, entry: list):
+        """Close the file of an entry marked to be closed once it is no longer in use."""
+        if entry[3] and entry[2] == 0 and entry[4] == 0:
+            # the pool was closed or the file was modified while the file was in use
+            entry[0].close()
+            self._detached[:] = [e for e in self._detached if e is not entry]
+
+    def _evict(self):
+        """Close the least recently used files not in use until at most max_size are open."""
+        if self.max_size is None or len(self._files) <= self.max_size:
+            return
+        excess = len(self._files) - self.max_size
+        unused = [key for key, entry in self._files.items() if entry[2] == 0 and entry[4] == 0]
+        for key in unused[:excess]:
+            self._files.pop(key)[0].close()
+
+    def close(self):
+        """Close all files in the pool, or once they are no longer in use if they are in use.
+
+        Files that are only kept open by arrays are closed, so that the arrays can no longer be
+        read.
+        """
+        with self._lock:
+            for entry in [*self._files.values(), *self._detached]:
+                if entry[2] == 0:
+                    entry[0].close()
+                else:
+                    entry[3] = True
+            self._files.clear()
+            self._detached.clear()
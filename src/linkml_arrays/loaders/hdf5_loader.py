@@ -1,36 +1,94 @@
 """Class for loading a LinkML model from an HDF5 file."""
 
-from typing import Type, Union
+import asyncio
+import functools
+from concurrent.futures import Executor
+from typing import Any, Dict, Iterator, List, Optional, Type, Union
 
 import h5py
 from linkml_runtime import SchemaView
-from linkml_runtime.linkml_model import ClassDefinition
 from linkml_runtime.loaders.loader_root import Loader
 from linkml_runtime.utils.yamlutils import YAMLRoot
 from pydantic import BaseModel
 
+from ..array_selection import read_selection, resolve_selection
+from ..dask_array import to_dask_array
+from ..inlined_collection import is_keyed, resolve_collection, sort_item_names
+from ..lazy_array import LazyArray
+from ..schema_plan import ClassPlan, get_class_plan
+from ..slot_selector import SlotSelector
+from ..utils import construct_model, get_module_class
+
 
 def _iterate_element(
-    group: h5py.Group, element_type: ClassDefinition, schemaview: SchemaView
+    group: h5py.Group,
+    class_plan: ClassPlan,
+    lazy: bool = False,
+    selector: Optional[SlotSelector] = None,
+    selections: Optional[Dict[str, Any]] = None,
+    as_dask: bool = False,
 ) -> dict:
     """Recursively iterate through the elements of a LinkML model and load them into a dict.
 
-    Datasets are read into memory.
+    Datasets are read into memory unless lazy is True, in which case they are wrapped in a
+    LazyArray that reads from the dataset on indexing. Strings are read as str, not bytes.
+
+    If selector is given, only the attributes, datasets, and subgroups at selected slot paths are
+    loaded. Datasets and subgroups that are not selected are never opened.
+
+    Datasets with a selection in selections are read in part, even if lazy is True. See
+    ``linkml_arrays.array_selection``.
+
+    If as_dask is True, datasets are wrapped in Dask arrays instead, with chunks aligned to the
+    chunks in storage.
+
+    Groups of collections are loaded as lists, or dicts keyed by identifier, of the dicts of their
+    objects. See ``linkml_arrays.inlined_collection``.
     """
+    # path of the group in the file, e.g., "temperature_dataset"
+    group_path = group.name.strip("/")
     ret_dict = dict()
-    for k, v in group.attrs.items():
-        ret_dict[k] = v
+    for k in group.attrs.keys():
+        if selector is None or selector.is_selected(f"{group_path}/{k}"):
+            ret_dict[k] = group.attrs[k]
 
-    for k, v in group.items():
-        found_slot = schemaview.induced_slot(
-            k, element_type.name
-        )  # assumes the slot name has been written as the name which is OK for now.
-        if found_slot.array:
+    for k in group.keys():
+        # assumes the slot name has been written as the name which is OK for now.
+        found_slot = class_plan.get_slot(k)
+        path = f"{group_path}/{k}".lstrip("/")
+        if selector is not None:
+            if not (
+                selector.is_selected(path) if found_slot.is_array else selector.is_visited(path)
+            ):
+                continue
+        v = group[k]
+        if found_slot.is_array:
             assert isinstance(v, h5py.Dataset)
-            v = v[()]  # read all the values into memory TODO: support lazy loading
+            selection = resolve_selection(selections, class_plan.name, k, path)
+            if selection is not None:
+                v = read_selection(v, selection)
+            elif lazy or as_dask:
+                if h5py.check_string_dtype(v.dtype) is not None:
+                    v = v.asstr()
+                v = to_dask_array(LazyArray(v)) if as_dask else LazyArray(v)
+            else:
+                if h5py.check_string_dtype(v.dtype) is not None:
+                    v = v.asstr()
+                v = v[()]  # read all the values into memory
+        elif isinstance(v, h5py.Group) and found_slot.multivalued:
+            # it's a collection with a subgroup per object
+            keyed = is_keyed(class_plan, k)
+            items = {
+                name: _iterate_element(
+                    v[name], class_plan.get_range_plan(k), lazy, selector, selections, as_dask
+                )
+                for name in sort_item_names(v.keys(), keyed)
+            }
+            v = items if keyed else list(items.values())
         elif isinstance(v, h5py.Group):  # it's a subgroup
-            found_slot_range = schemaview.get_class(found_slot.range)
-            v = _iterate_element(v, found_slot_range, schemaview)
+            v = _iterate_element(
+                v, class_plan.get_range_plan(k), lazy, selector, selections, as_dask
+            )
         # else: do not transform v
         ret_dict[k] = v
 
@@ -38,7 +96,28 @@ def _iterate_element(
 
 
 class Hdf5Loader(Loader):
-    """Class for loading a LinkML model from an HDF5 file."""
+    """Class for loading a LinkML model from an HDF5 file.
+
+    When loading lazily or as Dask arrays, the HDF5 file stays open until the loader is closed,
+    either by calling ``close`` or by using the loader as a context manager.
+    """
+
+    def __init__(self):
+        """Create a loader with no open files."""
+        self._open_files: List[h5py.File] = []
+
+    def __enter__(self):
+        """Return the loader for use as a context manager."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Close all files opened by lazy loads."""
+        self.close()
+
+    def close(self):
+        """Close all files opened by lazy loads."""
+        while self._open_files:
+            self._open_files.pop().close()
 
     def load_any(self, source: str, **kwargs):
         """Create an instance of the target class from an HDF5 file."""
@@ -53,12 +132,142 @@ class Hdf5Loader(Loader):
         source: str,
         target_class: Type[Union[YAMLRoot, BaseModel]],
         schemaview: SchemaView,
+        lazy: bool = False,
+        include: Optional[List[str]] = None,
+        exclude: Optional[List[str]] = None,
+        selections: Optional[Dict[str, Any]] = None,
+        as_dask: bool = False,
+        validate: bool = True,
         **kwargs,
     ):
-        """Create an instance of the target class from an HDF5 file."""
-        element_type = schemaview.get_class(target_class.__name__)
+        """Create an instance of the target class from an HDF5 file.
+
+        If lazy is True, array slots are populated with LazyArray proxies that read only the
+        requested elements from the file. The file is kept open until the loader is closed. Because
+        pydantic validation would read the proxies into lists, the object is constructed without
+        validation.
+
+        If include or exclude are given, only the slots at the slot paths matched by an include
+        pattern, and not by an exclude pattern, are loaded, e.g.,
+        ``include=["temperature_dataset/temperatures_in_K", "*/name"]``. See
+        ``linkml_arrays.slot_selector`` for the patterns. Groups and datasets that are not
+        selected are never opened. Because the object may lack required slots, it is constructed
+        without validation. Slots that are not loaded have their default values, and the
+        ``model_fields_set`` of each object lists the slots that were loaded.
+
+        selections selects the elements to read of array slots, keyed by class-qualified slot name
+        or path, e.g., ``{"DaysInDSinceSeries.values": slice(-30, None)}``. Only the selected
+        elements are read from storage. See ``linkml_arrays.array_selection`` for the selections.
+
+        If as_dask is True, array slots are populated with Dask arrays whose chunks are multiples
+        of the chunks of the datasets, for parallel and out-of-core computation. As with lazy
+        loading, the file is kept open until the loader is closed and the object is constructed
+        without validation. This requires the optional dask package.
+
+        If validate is False, the object is constructed without pydantic validation, e.g., for
+        trusted files written by a dumper. Array slots then keep the NumPy arrays that were read
+        instead of being converted to the lists of lists of list-typed models, so that loading
+        large arrays is dominated by reading them.
+        """
+        class_plan = get_class_plan(schemaview, target_class.__name__)
+        selector = None
+        if include is not None or exclude is not None:
+            selector = SlotSelector(include, exclude)
+        if lazy or as_dask:
+            f = h5py.File(source, "r")
+            self._open_files.append(f)
+            element = _iterate_element(f, class_plan, True, selector, selections, as_dask)
+            return construct_model(target_class, element)
+
         with h5py.File(source, "r") as f:
-            element = _iterate_element(f, element_type, schemaview)
+            element = _iterate_element(f, class_plan, False, selector, selections)
+        if selector is not None or not validate:
+            return construct_model(target_class, element)
         obj = target_class(**element)
 
         return obj
+
+    def iter_load(
+        self,
+        source: str,
+        target_class: Type[Union[YAMLRoot, BaseModel]],
+        schemaview: SchemaView,
+        path: str,
+        lazy: bool = False,
+        selections: Optional[Dict[str, Any]] = None,
+        as_dask: bool = False,
+        validate: bool = True,
+        **kwargs,
+    ) -> Iterator[Union[YAMLRoot, BaseModel]]:
+        """Yield the objects of the collection at the slot path of an HDF5 file one at a time.
+
+        The collection is a multivalued slot of inlined objects, e.g., ``path="batches"``, which
+        is stored as a group with a subgroup per object. See ``linkml_arrays.inlined_collection``.
+        Each object is read from its subgroup only when it is reached and is created as an
+        instance of the class of its range in the module of target_class, e.g., as generated by
+        gen-pydantic, so that only one object is in memory at a time.
+
+        lazy, selections, and as_dask apply to the array slots of each object as in ``load``. If
+        lazy or as_dask is True, the file is kept open until the loader is closed and the objects
+        are constructed without validation. Otherwise, the file is closed when the iteration ends
+        or the iterator is closed.
+
+        If validate is False, the objects are constructed without pydantic validation, as in
+        ``load``.
+
+        Raises:
+            ValueError: If the slot at the path is not a collection.
+        """
+        class_plan = get_class_plan(schemaview, target_class.__name__)
+        parts, item_plan, keyed = resolve_collection(class_plan, path)
+        item_class = get_module_class(target_class, item_plan.name)
+        f = h5py.File(source, "r")
+        if lazy or as_dask:
+            self._open_files.append(f)
+        try:
+            group = f.get("/".join(parts))
+            if group is None:
+                return
+            for name in sort_item_names(group.keys(), keyed):
+                element = _iterate_element(group[name], item_plan, lazy, None, selections, as_dask)
+                if lazy or as_dask or not validate:
+                    yield construct_model(item_class, element)
+                else:
+                    yield item_class(**element)
+        finally:
+            if not (lazy or as_dask):
+                f.close()
+
+    async def aload(
+        self,
+        source: str,
+        target_class: Type[Union[YAMLRoot, BaseModel]],
+        schemaview: SchemaView,
+        executor: Optional[Executor] = None,
+        **kwargs,
+    ):
+        """Create an instance of the target class from an HDF5 file.
+
+        This is a coroutine variant of ``load`` for use in an asyncio event loop. The load runs in
+        executor, or in the default executor of the event loop if None. Keyword arguments are
+        passed to ``load``.
+
+        If the coroutine is cancelled, the load still runs to completion, because h5py reads
+        cannot be interrupted, and then the file that it opened is closed.
+        """
+        # load with a separate loader, so that the file of a cancelled lazy load can be closed
+        loader = Hdf5Loader()
+        future = asyncio.get_running_loop().run_in_executor(
+            executor, functools.partial(loader.load, source, target_class, schemaview, **kwargs)
+        )
+        try:
+            obj = await asyncio.shield(future)
+        except asyncio.CancelledError:
+            future.add_done_callback(lambda _: loader.close())
+            raise
+        except Exception:
+            loader.close()
+            raise
+        # the file of a lazy load stays open until this loader is closed
+        self._open_files.extend(loader._open_files)
+        return obj
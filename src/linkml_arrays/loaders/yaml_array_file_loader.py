@@ -1,68 +1,277 @@
 """Class for loading a LinkML model from a YAML file with arrays at supported file paths."""
 
-from typing import Type, Union
+import asyncio
+import os
+import struct
+import zipfile
+from concurrent.futures import Executor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Type, Union
 
 import h5py
 import numpy as np
-import yaml
 from linkml_runtime import SchemaView
-from linkml_runtime.linkml_model import ClassDefinition
 from linkml_runtime.loaders.loader_root import Loader
 from linkml_runtime.utils.yamlutils import YAMLRoot
 from pydantic import BaseModel
 
+from .file_handle_pool import FileHandlePool
+from ..array_selection import read_selection, resolve_selection
+from ..dask_array import to_dask_array
+from ..lazy_array import LazyArray
+from ..schema_plan import ClassPlan, get_class_plan
+from ..utils import construct_model, map_in_threads
+from ..yaml_backend import yaml_load
+
+# modes for np.load that do not modify the file on disk
+MMAP_MODES = ("r", "c")
+
+
+def _contains_memmap(element: Union[dict, list]) -> bool:
+    """Return whether any value in the nested dicts and lists is a memory-mapped array."""
+    for v in element.values() if isinstance(element, dict) else element:
+        if isinstance(v, np.memmap):
+            return True
+        if isinstance(v, (dict, list)) and _contains_memmap(v):
+            return True
+    return False
+
+
+def _memmap_npz_member(npz: Any, file: str, key: str, mmap_mode: str) -> np.memmap:
+    """Memory-map the array with the key in an uncompressed .npz file.
+
+    Raises:
+        ValueError: If the array is compressed or cannot be memory-mapped, e.g., an object array.
+    """
+    info = npz.zip.getinfo(f"{key}.npy")
+    if info.compress_type != zipfile.ZIP_STORED:
+        raise ValueError(f"Cannot memory-map compressed array {key} in {file}.")
+    with open(file, "rb") as f:
+        # skip the local file header of the zip member, whose name and extra field lengths are
+        # the last fields of its fixed 30 bytes
+        f.seek(info.header_offset)
+        name_length, extra_length = struct.unpack("<HH", f.read(30)[26:])
+        f.seek(info.header_offset + 30 + name_length + extra_length)
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+        offset = f.tell()
+    if dtype.hasobject:
+        raise ValueError(f"Cannot memory-map object array {key} in {file}.")
+    return np.memmap(
+        file,
+        dtype=dtype,
+        mode=mmap_mode,
+        shape=shape,
+        order="F" if fortran_order else "C",
+        offset=offset,
+    )
+
+
+def _read_array(
+    k: str,
+    v: dict,
+    file_pool: FileHandlePool,
+    mmap_mode: Optional[str] = None,
+    selection: Optional[Any] = None,
+    as_dask: bool = False,
+    base_dir: Optional[Union[str, Path]] = None,
+    lazy: bool = False,
+) -> Any:
+    """Read the array of an array slot from the files listed in its sources.
+
+    Datasets are read into memory, except NumPy files which are memory-mapped if mmap_mode is set
+    for the call or for the source entry. A source entry with a "path" key refers to the array at
+    that path in a file that holds many arrays, i.e., the dataset in an HDF5 file or the key in
+    an .npz file. HDF5 and .npz files are opened through file_pool, so that sources in the same
+    file share a handle.
+
+    If selection is given, only the selected elements are read into memory, from the HDF5
+    dataset or from the memory-mapped NumPy file. Arrays in compressed .npz files are read in
+    full and then selected.
+
+    If as_dask is True, arrays without a selection are wrapped in Dask arrays that read from the
+    HDF5 dataset, which is kept open in file_pool while the Dask array is alive, or from the
+    memory-mapped NumPy file. If lazy is True, arrays without a selection are LazyArray proxies of
+    the HDF5 dataset, kept open in the same way, or memory-mapped NumPy arrays.
+
+    Relative file paths are relative to base_dir if it is given, else to the current working
+    directory.
+
+    Raises:
+        ValueError: If the array slot has no source or format, or if the mmap_mode is not supported.
+    """
+    sources = v.get("source", None)
+    if sources is None:
+        raise ValueError(f"Array slot {k} has no source.")
+    for source in sources:
+        format = source.get("format", None)
+        if format is None:
+            raise ValueError(f"Array slot {k}, source {source} has no format.")
+        if format == "hdf5":
+            file = source.get("file", None)
+            if file is None:
+                raise ValueError(f"Array slot {k}, source {source}, format {format} has no file.")
+            array_file_path = file if base_dir is None else os.path.join(base_dir, file)
+            with file_pool.open(array_file_path, format) as f:
+                dataset = f[source.get("path", "data")]
+                if selection is not None:
+                    v = read_selection(dataset, selection)
+                elif as_dask or lazy:
+                    if h5py.check_string_dtype(dataset.dtype) is not None:
+                        dataset = dataset.asstr()
+                    lazy_array = LazyArray(dataset)
+                    # the array reads from the file after the load, while it is alive
+                    file_pool.keep_open(f, lazy_array)
+                    v = to_dask_array(lazy_array) if as_dask else lazy_array
+                else:
+                    if h5py.check_string_dtype(dataset.dtype) is not None:
+                        dataset = dataset.asstr()
+                    v = dataset[()]  # read all the values into memory
+        elif format == "numpy":
+            file = source.get("file", None)
+            if file is None:
+                raise ValueError(f"Array slot {k}, source {source}, format {format} has no file.")
+            array_file_path = file if base_dir is None else os.path.join(base_dir, file)
+            source_mmap_mode = source.get("mmap_mode", mmap_mode)
+            if (as_dask or lazy) and source_mmap_mode is None:
+                # Dask and lazy loads read the elements that they need from the memory-mapped file
+                source_mmap_mode = "r"
+            if source_mmap_mode is not None and source_mmap_mode not in MMAP_MODES:
+                raise ValueError(
+                    f"Array slot {k}, source {source} has unsupported mmap_mode "
+                    f"{source_mmap_mode}. Supported modes are {MMAP_MODES}."
+                )
+            path = source.get("path", None)
+            if path is not None:
+                with file_pool.open(array_file_path, format) as npz:
+                    if source_mmap_mode is not None or selection is not None:
+                        try:
+                            v = _memmap_npz_member(
+                                npz, array_file_path, path, source_mmap_mode or "r"
+                            )
+                        except ValueError:
+                            if source_mmap_mode is not None:
+                                raise
+                            v = npz[path]
+                    else:
+                        v = npz[path]
+            elif selection is not None:
+                v = np.load(array_file_path, mmap_mode="r")
+            else:
+                # read all the values into memory unless the file is memory-mapped
+                v = np.load(array_file_path, mmap_mode=source_mmap_mode)
+            if selection is not None:
+                v = read_selection(v, selection)
+            elif as_dask:
+                v = to_dask_array(v)
+    return v
+
 
 def _iterate_element(
-    input_dict: dict, element_type: ClassDefinition, schemaview: SchemaView
+    input_dict: dict,
+    class_plan: ClassPlan,
+    pending_reads: List[Tuple[dict, str, dict, Optional[Any]]],
+    selections: Optional[Dict[str, Any]] = None,
+    path: str = "",
 ) -> dict:
     """Recursively iterate through the elements of a LinkML model and load them into a dict.
 
-    Datasets are read into memory.
+    Array slots are not read here. Instead, the dict that will hold the array, the slot name, the
+    array slot value with its sources, and the selection of the array in selections are appended
+    to pending_reads so that the arrays can be read together after the walk.
 
-    Raises:
-        ValueError: If the array slot has no source or format, or if the format is not supported.
+    The objects of collections, i.e., lists of objects or dicts of objects keyed by identifier,
+    are iterated one by one.
     """
     ret_dict = dict()
     for k, v in input_dict.items():
-        found_slot = schemaview.induced_slot(k, element_type.name)
-        if found_slot.array:
-            sources = v.get("source", None)
-            if sources is None:
-                raise ValueError(f"Array slot {k} has no source.")
-            for source in sources:
-                format = source.get("format", None)
-                if format is None:
-                    raise ValueError(f"Array slot {k}, source {source} has no format.")
-                if format == "hdf5":
-                    file = source.get("file", None)
-                    if file is None:
-                        raise ValueError(
-                            f"Array slot {k}, source {source}, format {format} has no file."
-                        )
-                    array_file_path = file
-                    with h5py.File(array_file_path, "r") as f:
-                        # read all the values into memory TODO: support lazy loading
-                        v = f["data"][()]
-                elif format == "numpy":
-                    file = source.get("file", None)
-                    if file is None:
-                        raise ValueError(
-                            f"Array slot {k}, source {source}, format {format} has no file."
-                        )
-                    array_file_path = file
-                    # read all the values into memory TODO: support lazy loading
-                    v = np.load(array_file_path)
+        found_slot = class_plan.get_slot(k)
+        slot_path = f"{path}/{k}".lstrip("/")
+        if found_slot.is_array:
+            selection = resolve_selection(selections, class_plan.name, k, slot_path)
+            pending_reads.append((ret_dict, k, v, selection))
+        elif found_slot.multivalued and isinstance(v, (dict, list)):
+            # a collection of objects, or a list of values that are not transformed
+            items = v.items() if isinstance(v, dict) else enumerate(v)
+            walked = {
+                key: (
+                    _iterate_element(
+                        item,
+                        class_plan.get_range_plan(k),
+                        pending_reads,
+                        selections,
+                        f"{slot_path}/{key}",
+                    )
+                    if isinstance(item, dict)
+                    else item
+                )
+                for key, item in items
+            }
+            v = walked if isinstance(v, dict) else list(walked.values())
         elif isinstance(v, dict):
-            found_slot_range = schemaview.get_class(found_slot.range)
-            v = _iterate_element(v, found_slot_range, schemaview)
+            v = _iterate_element(
+                v, class_plan.get_range_plan(k), pending_reads, selections, slot_path
+            )
         # else: do not transform v
         ret_dict[k] = v
 
     return ret_dict
 
 
+def _construct(
+    target_class: Type[Union[YAMLRoot, BaseModel]],
+    element: dict,
+    pending_reads: List[Tuple[dict, str, dict, Optional[Any]]],
+    arrays: List[Any],
+    in_storage: bool,
+    validate: bool = True,
+) -> Union[YAMLRoot, BaseModel]:
+    """Set the arrays read for the pending reads and create an instance of the target class.
+
+    The instance is constructed without validation if validate is False, if in_storage is True,
+    i.e., arrays are Dask arrays or LazyArray proxies, or if it has memory-mapped arrays.
+    """
+    for (ret_dict, k, _, _), array in zip(pending_reads, arrays):
+        ret_dict[k] = array
+    if not validate or in_storage or _contains_memmap(element):
+        return construct_model(target_class, element)
+    return target_class(**element)
+
+
 class YamlArrayFileLoader(Loader):
-    """Class for loading a model from a YAML file with arrays at supported file paths."""
+    """Class for loading a model from a YAML file with arrays at supported file paths.
+
+    Each load opens the HDF5 and .npz files that it reads from once, through a pool of file
+    handles that is closed at the end of the load. If a file_pool is given, it is used by all
+    loads instead, so that files are opened once across loads, e.g., for many manifests that refer
+    to the same files. Its files are kept open, up to its maximum size, until the loader or the
+    pool is closed, either by calling ``close`` or by using it as a context manager.
+
+    HDF5 files of arrays loaded lazily or as Dask arrays are kept open in a separate pool, which
+    has no maximum size, while the arrays are alive or until the loader is closed.
+    """
+
+    def __init__(self, file_pool: Optional[FileHandlePool] = None):
+        """Create a loader that opens files per load, or through the given pool across loads."""
+        self.file_pool = file_pool
+        self._lazy_file_pool = FileHandlePool()
+
+    def __enter__(self):
+        """Return the loader for use as a context manager."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Close the files in the pool shared across loads."""
+        self.close()
+
+    def close(self):
+        """Close the files in the pool shared across loads and the files of lazy and Dask arrays."""
+        if self.file_pool is not None:
+            self.file_pool.close()
+        self._lazy_file_pool.close()
 
     def load_any(self, source: str, **kwargs):
         """Create an instance of the target class from a YAML file with arrays in files."""
@@ -77,13 +286,141 @@ class YamlArrayFileLoader(Loader):
         source: str,
         target_class: Type[Union[YAMLRoot, BaseModel]],
         schemaview: SchemaView,
+        mmap_mode: Optional[str] = None,
+        max_workers: Optional[int] = 1,
+        yaml_backend: str = "auto",
+        selections: Optional[Dict[str, Any]] = None,
+        as_dask: bool = False,
+        base_dir: Optional[Union[str, Path]] = None,
+        validate: bool = True,
+        lazy: bool = False,
         **kwargs,
     ):
-        """Create an instance of the target class from a YAML file with arrays in files."""
-        input_dict = yaml.safe_load(source)
+        """Create an instance of the target class from a YAML file with arrays in files.
+
+        If mmap_mode is "r" (read-only) or "c" (copy-on-write), NumPy files are memory-mapped
+        instead of read into memory. A source entry may set its own "mmap_mode" key, which
+        overrides the mmap_mode of the call, e.g., ``mmap_mode: null`` to read a small file.
+        If any array is memory-mapped, the object is constructed without pydantic validation,
+        which would otherwise read the arrays into lists.
+
+        Array files are read after the YAML tree has been walked. If max_workers is not 1, they
+        are read concurrently in a thread pool with that many workers (None for the default of
+        ``concurrent.futures.ThreadPoolExecutor``). The result does not depend on the order in
+        which the reads complete. HDF5 and .npz files, e.g., written by a dumper in consolidated
+        mode, are opened once per load, or once across loads if the loader has a file_pool.
+        Arrays in uncompressed .npz files can be memory-mapped like those in .npy files.
+
+        selections selects the elements to read of array slots, keyed by class-qualified slot name
+        or path, e.g., ``{"DaysInDSinceSeries.values": slice(-30, None)}``. Only the selected
+        elements are read from HDF5 datasets and NumPy files, which are memory-mapped for the
+        read. Selected arrays are always read into memory. See ``linkml_arrays.array_selection``
+        for the selections.
+
+        If as_dask is True, array slots are populated with Dask arrays, for parallel and
+        out-of-core computation. NumPy files are memory-mapped read-only, unless a source entry
+        sets another mmap_mode, and HDF5 files stay open until the loader is closed. Their chunks
+        are aligned to the chunks of the HDF5 datasets. The object is constructed without
+        validation. This requires the optional dask package.
+
+        If lazy is True, array slots are populated with LazyArray proxies of HDF5 datasets, which
+        read only the requested elements, and with memory-mapped arrays of NumPy files, as for
+        as_dask. HDF5 files stay open while the proxies are alive or until the loader is closed.
+        The object is constructed without validation.
+
+        Relative file paths in the sources are relative to base_dir, e.g., the directory of the
+        YAML file if it was written by a dumper's ``dump``, or to the current working directory if
+        base_dir is None.
+
+        The YAML is parsed with yaml_backend, one of "auto" (the default, which uses the LibYAML
+        C parser if available), "libyaml", "pyyaml", or "ruamel". See
+        ``linkml_arrays.yaml_backend``.
+
+        If validate is False, the object is constructed without pydantic validation, e.g., for
+        trusted files written by a dumper. Array slots then keep the NumPy arrays that were read
+        instead of being converted to the lists of lists of list-typed models, so that loading
+        large arrays is dominated by reading them.
+        """
+        input_dict = yaml_load(source, yaml_backend)
+
+        class_plan = get_class_plan(schemaview, target_class.__name__)
+        pending_reads: List[Tuple[dict, str, dict, Optional[Any]]] = []
+        element = _iterate_element(input_dict, class_plan, pending_reads, selections)
+        file_pool = self._get_file_pool(as_dask or lazy)
+        try:
+            arrays = map_in_threads(
+                lambda read: _read_array(
+                    read[1], read[2], file_pool, mmap_mode, read[3], as_dask, base_dir, lazy
+                ),
+                pending_reads,
+                max_workers,
+            )
+        finally:
+            self._release_file_pool(file_pool)
+        return _construct(target_class, element, pending_reads, arrays, as_dask or lazy, validate)
+
+    async def aload(
+        self,
+        source: str,
+        target_class: Type[Union[YAMLRoot, BaseModel]],
+        schemaview: SchemaView,
+        mmap_mode: Optional[str] = None,
+        yaml_backend: str = "auto",
+        selections: Optional[Dict[str, Any]] = None,
+        as_dask: bool = False,
+        base_dir: Optional[Union[str, Path]] = None,
+        validate: bool = True,
+        executor: Optional[Executor] = None,
+        lazy: bool = False,
+        **kwargs,
+    ):
+        """Create an instance of the target class from a YAML file with arrays in files.
+
+        This is a coroutine variant of ``load`` for use in an asyncio event loop. The YAML is
+        parsed, and each array source is read, in executor, or in the default executor of the
+        event loop if None, and the arrays are read concurrently with ``asyncio.gather``.
+
+        If the coroutine is cancelled, reads that have not started are cancelled, and the files
+        opened for the load are closed, each once the reads in progress from it have finished.
+        """
+        loop = asyncio.get_running_loop()
+        input_dict = await loop.run_in_executor(executor, yaml_load, source, yaml_backend)
+
+        class_plan = get_class_plan(schemaview, target_class.__name__)
+        pending_reads: List[Tuple[dict, str, dict, Optional[Any]]] = []
+        element = _iterate_element(input_dict, class_plan, pending_reads, selections)
+        file_pool = self._get_file_pool(as_dask or lazy)
+        try:
+            arrays = await asyncio.gather(
+                *(
+                    loop.run_in_executor(
+                        executor,
+                        _read_array,
+                        k,
+                        v,
+                        file_pool,
+                        mmap_mode,
+                        selection,
+                        as_dask,
+                        base_dir,
+                        lazy,
+                    )
+                    for _, k, v, selection in pending_reads
+                )
+            )
+        finally:
+            self._release_file_pool(file_pool)
+        return _construct(target_class, element, pending_reads, arrays, as_dask or lazy, validate)
 
-        element_type = schemaview.get_class(target_class.__name__)
-        element = _iterate_element(input_dict, element_type, schemaview)
-        obj = target_class(**element)
+    def _get_file_pool(self, in_storage: bool) -> FileHandlePool:
+        """Return the pool to open the files of a load with, whose arrays may read from them."""
+        if in_storage:
+            return self._lazy_file_pool
+        if self.file_pool is not None:
+            return self.file_pool
+        return FileHandlePool()
 
-        return obj
+    def _release_file_pool(self, file_pool: FileHandlePool):
+        """Close the pool of a load if it is not kept open across loads."""
+        if file_pool is not self.file_pool and file_pool is not self._lazy_file_pool:
+            file_pool.close()
@@ -1,31 +1,49 @@
 """Class for loading a LinkML model from a YAML file."""
 
-from typing import Type, Union
+from typing import IO, Any, Iterator, Type, Union
 
-import yaml
 from linkml_runtime import SchemaView
-from linkml_runtime.linkml_model import ClassDefinition
 from linkml_runtime.loaders.loader_root import Loader
 from linkml_runtime.utils.yamlutils import YAMLRoot
 from pydantic import BaseModel
 
+from ..binary_array import decode_array, is_encoded_array
+from ..inlined_collection import resolve_collection
+from ..schema_plan import ClassPlan, get_class_plan
+from ..utils import construct_model, get_module_class
+from ..yaml_backend import iter_yaml_collection, yaml_load
 
-def _iterate_element(
-    input_dict: dict, element_type: ClassDefinition, schemaview: SchemaView
-) -> dict:
-    """Recursively iterate through the elements of a LinkML model and load them into a dict."""
+
+def _iterate_element(input_dict: dict, class_plan: ClassPlan) -> dict:
+    """Recursively iterate through the elements of a LinkML model and load them into a dict.
+
+    Arrays that were encoded as bytes by YamlDumper are decoded into NumPy arrays, also in the
+    objects of collections.
+    """
     ret_dict = dict()
     for k, v in input_dict.items():
-        found_slot = schemaview.induced_slot(k, element_type.name)
-        if isinstance(v, dict):
-            found_slot_range = schemaview.get_class(found_slot.range)
-            v = _iterate_element(v, found_slot_range, schemaview)
+        found_slot = class_plan.get_slot(k)
+        if is_encoded_array(v) and found_slot.is_array:
+            v = decode_array(v)
+        elif found_slot.multivalued and isinstance(v, list):
+            v = [_iterate_item(item, class_plan, k) for item in v]
+        elif found_slot.multivalued and isinstance(v, dict):
+            v = {key: _iterate_item(item, class_plan, k) for key, item in v.items()}
+        elif isinstance(v, dict):
+            v = _iterate_element(v, class_plan.get_range_plan(k))
         # else: do not transform v
         ret_dict[k] = v
 
     return ret_dict
 
 
+def _iterate_item(item: Any, class_plan: ClassPlan, slot_name: str) -> Any:
+    """Load an object of a collection into a dict, and keep other values, e.g., references."""
+    if isinstance(item, dict):
+        return _iterate_element(item, class_plan.get_range_plan(slot_name))
+    return item
+
+
 class YamlLoader(Loader):
     """Class for loading a LinkML model from a YAML file."""
 
@@ -42,13 +60,65 @@ class YamlLoader(Loader):
         source: str,
         target_class: Type[Union[YAMLRoot, BaseModel]],
         schemaview: SchemaView,
+        yaml_backend: str = "auto",
+        validate: bool = True,
         **kwargs,
     ):
-        """Create an instance of the target class from a YAML file."""
-        input_dict = yaml.safe_load(source)
+        """Create an instance of the target class from a YAML file.
+
+        The YAML is parsed with yaml_backend, one of "auto" (the default, which uses the LibYAML
+        C parser if available), "libyaml", "pyyaml", or "ruamel". See
+        ``linkml_arrays.yaml_backend``.
 
-        element_type = schemaview.get_class(target_class.__name__)
-        element = _iterate_element(input_dict, element_type, schemaview)
+        If validate is False, the object is constructed without pydantic validation, e.g., for
+        trusted files written by a dumper. Arrays encoded by YamlDumper then stay NumPy arrays
+        instead of being converted to the lists of lists of list-typed models.
+        """
+        input_dict = yaml_load(source, yaml_backend)
+
+        class_plan = get_class_plan(schemaview, target_class.__name__)
+        element = _iterate_element(input_dict, class_plan)
+        if not validate:
+            return construct_model(target_class, element)
         obj = target_class(**element)
 
         return obj
+
+    def iter_load(
+        self,
+        source: Union[str, IO],
+        target_class: Type[Union[YAMLRoot, BaseModel]],
+        schemaview: SchemaView,
+        path: str,
+        yaml_backend: str = "auto",
+        validate: bool = True,
+        **kwargs,
+    ) -> Iterator[Union[YAMLRoot, BaseModel]]:
+        """Yield the objects of the collection at the slot path of a YAML file one at a time.
+
+        The collection is a multivalued slot of inlined objects, e.g., ``path="batches"``. See
+        ``linkml_arrays.inlined_collection``. Each object is created as an instance of the class
+        of its range in the module of target_class, e.g., as generated by gen-pydantic. The
+        objects of a collection keyed by identifier get their key as identifier if they do not
+        have one.
+
+        The source is a YAML string or a file opened for reading. The YAML is parsed as a stream
+        of events, so that only one object is in memory at a time, unless yaml_backend is
+        "ruamel", which parses the whole file first. See ``linkml_arrays.yaml_backend``.
+
+        If validate is False, the objects are constructed without pydantic validation, as in
+        ``load``.
+
+        Raises:
+            ValueError: If the slot at the path is not a collection.
+        """
+        class_plan = get_class_plan(schemaview, target_class.__name__)
+        parts, item_plan, _ = resolve_collection(class_plan, path)
+        item_class = get_module_class(target_class, item_plan.name)
+        for key, item in iter_yaml_collection(source, parts, yaml_backend):
+            if item is None:
+                item = dict()
+            if key is not None and item_plan.identifier_slot is not None:
+                item.setdefault(item_plan.identifier_slot, key)
+            element = _iterate_element(item, item_plan)
+            yield item_class(**element) if validate else construct_model(item_class, element)
@@ -0,0 +1,159 @@
+"""Pydantic types for array slots whose values are NumPy arrays.
+
+Models generated by gen-pydantic type array slots as nested lists, e.g., ``List[List[float]]``,
+so that validation converts every array into a Python object per element. Array slots annotated
+with an NDArraySpec are NumPy arrays instead, whose data type and number of dimensions are
+validated, e.g.::
+
+    class TemperaturesInKMatrix(BaseModel):
+        conversion_factor: Optional[float] = None
+        values: Annotated[np.ndarray, NDArraySpec("float64", ndim=3)]
+
+The spec of an array slot can also be derived from its range and ``array`` expression in the
+schema with ``ndarray_type(schemaview, "TemperaturesInKMatrix", "values")``.
+
+NumPy arrays, including memory-mapped arrays, of the data type of the spec are validated without
+copying them, so that arrays read by a loader stay contiguous buffers through validation. Arrays
+backed by storage, i.e., LazyArray proxies and Dask arrays, are validated without reading them.
+Lists of lists are converted to arrays in a single call, and object arrays, e.g., of strings read
+from an HDF5 file, to fixed-width arrays. Dumpers accept both NumPy arrays and lists of lists,
+and the JSON serialization of an array is its list of lists.
+"""
+
+from typing import Annotated, Any, Optional, Union
+
+import numpy as np
+from linkml_runtime import SchemaView
+from pydantic_core import core_schema
+
+from .dask_array import is_dask_array
+from .lazy_array import LazyArray
+from .schema_plan import SlotPlan, get_class_plan
+from .utils import to_fixed_width, to_ndarray
+
+
+def _to_list(array: Any) -> Any:
+    """Return the array as a list of lists, reading it if it is backed by storage."""
+    return np.asarray(array).tolist()
+
+
+class NDArraySpec:
+    """Data type and number of dimensions of a NumPy array slot, for validation with pydantic.
+
+    If dtype is None, e.g., for arrays of strings, arrays of any data type are valid. Arrays of
+    another data type of the same kind, e.g., float32 for float64, are valid as they are. Arrays of
+    data types that can be cast safely to dtype, e.g., int64 to float64, are cast to dtype. Lists
+    are checked by the data type that NumPy infers for them, like arrays, and converted to dtype.
+    """
+
+    def __init__(
+        self,
+        dtype: Optional[Union[str, np.dtype]] = None,
+        ndim: Optional[int] = None,
+        min_ndim: Optional[int] = None,
+        max_ndim: Optional[int] = None,
+    ):
+        """Create a spec with a data type and an exact, minimum, or maximum number of dimensions."""
+        self.dtype = None if dtype is None else np.dtype(dtype)
+        self.min_ndim = ndim if ndim is not None else min_ndim
+        self.max_ndim = ndim if ndim is not None else max_ndim
+
+    @classmethod
+    def from_slot(cls, slot: SlotPlan) -> "NDArraySpec":
+        """Create the spec of an array slot from its range and ``array`` expression.
+
+        The number of dimensions is bounded by ``exact_number_dimensions``, or by
+        ``minimum_number_dimensions`` and ``maximum_number_dimensions``. If there are
+        ``dimensions`` and no maximum, there are at least and at most as many dimensions, unless
+        the maximum is ``false``, i.e., unbounded.
+
+        Raises:
+            ValueError: If the slot is not an array slot.
+        """
+        array = slot.definition.array
+        if array is None:
+            raise ValueError(f"Slot {slot.name} is not an array slot.")
+        if array.exact_number_dimensions is not None:
+            return cls(slot.dtype, ndim=int(array.exact_number_dimensions))
+        n_dimensions = len(array.dimensions) if array.dimensions else None
+        min_ndim = array.minimum_number_dimensions
+        if min_ndim is None:
+            min_ndim = n_dimensions
+        max_ndim = array.maximum_number_dimensions
+        if max_ndim is None:
+            max_ndim = n_dimensions
+        elif max_ndim is False or max_ndim is True:
+            max_ndim = None
+        return cls(
+            slot.dtype,
+            min_ndim=None if min_ndim is None else int(min_ndim),
+            max_ndim=None if max_ndim is None else int(max_ndim),
+        )
+
+    def __repr__(self) -> str:
+        """Return the spec as it would be created."""
+        dtype = None if self.dtype is None else str(self.dtype)
+        return f"NDArraySpec({dtype!r}, min_ndim={self.min_ndim}, max_ndim={self.max_ndim})"
+
+    def __eq__(self, other: Any) -> bool:
+        """Return whether the other spec has the same data type and number of dimensions."""
+        if not isinstance(other, NDArraySpec):
+            return NotImplemented
+        return (self.dtype, self.min_ndim, self.max_ndim) == (
+            other.dtype,
+            other.min_ndim,
+            other.max_ndim,
+        )
+
+    def __hash__(self) -> int:
+        """Return the hash of the data type and number of dimensions."""
+        return hash((self.dtype, self.min_ndim, self.max_ndim))
+
+    def validate(self, v: Any) -> Any:
+        """Return the value as a NumPy array, or as it is if it is backed by storage.
+
+        Raises:
+            ValueError: If the array does not have a valid data type or number of dimensions.
+        """
+        in_storage = isinstance(v, LazyArray) or is_dask_array(v)
+        # lists are converted with the data type that NumPy infers, so that they are validated
+        # like arrays, e.g., a list of floats is not truncated to ints
+        is_list = isinstance(v, (list, tuple))
+        array = v if in_storage else to_fixed_width(to_ndarray(v))
+        if self.min_ndim is not None and array.ndim < self.min_ndim:
+            raise ValueError(
+                f"Array has {array.ndim} dimensions, fewer than the minimum of {self.min_ndim}."
+            )
+        if self.max_ndim is not None and array.ndim > self.max_ndim:
+            raise ValueError(
+                f"Array has {array.ndim} dimensions, more than the maximum of {self.max_ndim}."
+            )
+        if self.dtype is None:
+            return array
+        dtype = np.dtype(array.dtype)
+        # the data type of an empty list is not meaningful
+        if dtype.kind != self.dtype.kind and not (is_list and array.size == 0):
+            if not np.can_cast(dtype, self.dtype, "safe"):
+                raise ValueError(f"Array of data type {dtype} cannot be cast to {self.dtype}.")
+        elif not is_list:
+            return array
+        return array if in_storage else array.astype(self.dtype, copy=False)
+
+    def __get_pydantic_core_schema__(self, source_type: Any, handler: Any) -> Any:
+        """Return the pydantic core schema that validates and serializes the array slot."""
+        return core_schema.no_info_plain_validator_function(
+            self.validate,
+            serialization=core_schema.plain_serializer_function_ser_schema(
+                _to_list, when_used="json"
+            ),
+        )
+
+
+def ndarray_type(schemaview: SchemaView, class_name: str, slot_name: str) -> Any:
+    """Return the annotation of a NumPy array slot of a class, with the spec from the schema.
+
+    Raises:
+        ValueError: If the class is not in the schema or the slot is not an array slot.
+    """
+    slot = get_class_plan(schemaview, class_name).get_slot(slot_name)
+    return Annotated[np.ndarray, NDArraySpec.from_slot(slot)]
@@ -0,0 +1,169 @@
+"""Precomputed schema lookups shared by the dumpers and loaders.
+
+Dumpers and loaders need, for every object they visit, the induced slots of the object's class,
+whether each slot is an array, the range of each slot and its NumPy data type, and the identifier
+slot of the class.
+These lookups are expensive in SchemaView, so they are computed once per SchemaView and class and
+cached in a ClassPlan. The cache of a SchemaView is invalidated when the schema is modified.
+"""
+
+import weakref
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+from jsonasobj2 import JsonObj, as_dict, items
+from linkml_runtime import SchemaView
+from linkml_runtime.linkml_model import SlotDefinition
+
+# NumPy data types of the built-in LinkML types that have a fixed-width numeric representation.
+# Arrays of other types, e.g., strings, are converted with the data type inferred by NumPy.
+RANGE_DTYPES = {
+    "integer": np.dtype(np.int64),
+    "float": np.dtype(np.float64),
+    "double": np.dtype(np.float64),
+    "boolean": np.dtype(np.bool_),
+}
+
+
+def get_range_dtype(
+    range: Optional[str], schemaview: Optional[SchemaView] = None
+) -> Optional[np.dtype]:
+    """Return the NumPy data type of a slot range, or None if it has no fixed data type.
+
+    Types that are derived from a built-in type, e.g., with ``typeof: float``, have the data type
+    of the built-in type if the SchemaView is given.
+    """
+    if range is None:
+        return None
+    if range in RANGE_DTYPES or schemaview is None or schemaview.get_type(range) is None:
+        return RANGE_DTYPES.get(range)
+    for ancestor in schemaview.type_ancestors(range):
+        if ancestor in RANGE_DTYPES:
+            return RANGE_DTYPES[ancestor]
+    return None
+
+
+@dataclass(frozen=True)
+class SlotPlan:
+    """Precomputed information about an induced slot of a class."""
+
+    name: str
+    definition: SlotDefinition
+    is_array: bool
+    range: Optional[str]
+    inlined: Optional[bool]
+    multivalued: Optional[bool]
+    annotations: Dict[str, Any] = field(default_factory=dict)
+    # NumPy data type of the range, used to convert lists of lists to arrays in a single call
+    dtype: Optional[np.dtype] = None
+
+    @classmethod
+    def from_slot(cls, slot: SlotDefinition, schemaview: Optional[SchemaView] = None) -> "SlotPlan":
+        """Create a slot plan from an induced slot definition."""
+        return cls(
+            name=slot.name,
+            definition=slot,
+            is_array=bool(slot.array),
+            range=slot.range,
+            inlined=slot.inlined,
+            multivalued=slot.multivalued,
+            annotations={
+                tag: (
+                    as_dict(annotation.value)
+                    if isinstance(annotation.value, JsonObj)
+                    else annotation.value
+                )
+                for tag, annotation in items(slot.annotations)
+            },
+            dtype=get_range_dtype(slot.range, schemaview),
+        )
+
+
+@dataclass
+class ClassPlan:
+    """Precomputed information about a class and its induced slots."""
+
+    name: str
+    # weak reference so that cached plans do not keep the SchemaView alive
+    schemaview_ref: weakref.ref = field(repr=False)
+    identifier_slot: Optional[str] = None
+    slots: Dict[str, SlotPlan] = field(default_factory=dict)
+
+    @property
+    def schemaview(self) -> SchemaView:
+        """Return the SchemaView that the plan was created from."""
+        schemaview = self.schemaview_ref()
+        if schemaview is None:
+            raise ReferenceError(f"The SchemaView of the plan for class {self.name} was deleted.")
+        return schemaview
+
+    def get_slot(self, slot_name: str) -> SlotPlan:
+        """Return the plan of the induced slot with the given name.
+
+        Slots that were not found when the plan was created, e.g., slots that are only induced
+        through a slot_usage or an alias, are looked up once in the SchemaView and then cached.
+        """
+        slot = self.slots.get(slot_name)
+        if slot is None:
+            schemaview = self.schemaview
+            slot = SlotPlan.from_slot(schemaview.induced_slot(slot_name, self.name), schemaview)
+            self.slots[slot_name] = slot
+        return slot
+
+    def get_range_plan(self, slot_name: str) -> "ClassPlan":
+        """Return the plan of the class that is the range of the slot with the given name."""
+        return get_class_plan(self.schemaview, self.get_slot(slot_name).range)
+
+
+# cache of class plans keyed by id of the SchemaView. each entry holds a weak reference to the
+# SchemaView, the number of modifications of the SchemaView when the entry was created, and the
+# class plans keyed by class name
+_PLAN_CACHE: Dict[int, Tuple[weakref.ref, int, Dict[str, ClassPlan]]] = dict()
+
+
+def _get_schemaview_plans(schemaview: SchemaView) -> Dict[str, ClassPlan]:
+    """Return the cached class plans of the SchemaView, resetting them if the schema changed."""
+    key = id(schemaview)
+    modifications = getattr(schemaview, "modifications", 0)
+    entry = _PLAN_CACHE.get(key)
+    if entry is not None and entry[0]() is schemaview and entry[1] == modifications:
+        return entry[2]
+
+    plans: Dict[str, ClassPlan] = dict()
+    ref = weakref.ref(schemaview, lambda _: _PLAN_CACHE.pop(key, None))
+    _PLAN_CACHE[key] = (ref, modifications, plans)
+    return plans
+
+
+def get_class_plan(schemaview: SchemaView, class_name: str) -> ClassPlan:
+    """Return the plan for the class with the given name, creating it on first use.
+
+    Raises:
+        ValueError: If the schema has no class with the given name.
+    """
+    plans = _get_schemaview_plans(schemaview)
+    plan = plans.get(class_name)
+    if plan is not None:
+        return plan
+
+    found_class = schemaview.get_class(class_name)
+    if found_class is None:
+        raise ValueError(f"Class {class_name} not found in the schema.")
+    id_slot = schemaview.get_identifier_slot(found_class.name)
+    plan = ClassPlan(
+        name=found_class.name,
+        schemaview_ref=weakref.ref(schemaview),
+        identifier_slot=id_slot.name if id_slot is not None else None,
+        slots={
+            slot.name: SlotPlan.from_slot(slot, schemaview)
+            for slot in schemaview.class_induced_slots(found_class.name)
+        },
+    )
+    plans[class_name] = plan
+    return plan
+
+
+def clear_plan_cache():
+    """Clear the cached class plans of all SchemaViews."""
+    _PLAN_CACHE.clear()
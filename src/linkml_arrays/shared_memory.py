@@ -0,0 +1,203 @@
+"""Class for sharing the arrays of a LinkML model with worker processes without copying them.
+
+A SharedContainer copies the array slots of an object, e.g., a container loaded by a loader,
+once into a block of shared memory. The SharedContainer is a small handle that can be pickled,
+e.g., as an argument of a task of a ``multiprocessing.Pool`` or a ``ProcessPoolExecutor``. In
+each worker, ``load`` reconstructs the object with read-only NumPy arrays that are views of the
+shared memory, so that all workers share one copy of the arrays::
+
+    with SharedContainer.create(container, schemaview) as shared:
+        with ProcessPoolExecutor() as executor:
+            results = list(executor.map(analyze, [shared] * n_tasks))
+
+    def analyze(shared):
+        container = shared.load()
+        ...
+"""
+
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Type, Union
+
+import numpy as np
+from linkml_runtime import SchemaView
+from linkml_runtime.utils.yamlutils import YAMLRoot
+from pydantic import BaseModel
+
+from .schema_plan import get_class_plan
+from .utils import (
+    construct_model,
+    copy_array_chunked,
+    is_out_of_core,
+    to_fixed_width,
+    to_ndarray,
+)
+
+# alignment in bytes of the arrays in shared memory, e.g., for SIMD loads
+ALIGNMENT = 64
+
+
+class _SharedArray(NamedTuple):
+    """Location of an array in the shared memory block."""
+
+    offset: int
+    shape: Tuple[int, ...]
+    dtype: str
+
+
+def _iterate_element(
+    element: Union[YAMLRoot, BaseModel],
+    schemaview: SchemaView,
+    arrays: List[Tuple[Any, _SharedArray]],
+    size: int = 0,
+) -> Tuple[dict, int]:
+    """Recursively iterate through the elements of a LinkML model and plan their arrays.
+
+    Return a dict with the same structure as the element in which array slots are replaced by
+    their location in the shared memory block, and the size of the block so far. The arrays and
+    their locations are appended to arrays, to be copied once the block has been created.
+
+    Arrays backed by storage, e.g., lazily loaded arrays, are not read here. Other arrays are
+    converted to NumPy arrays with the data type of the slot range.
+    """
+    # get the precomputed schema information for the type of the element
+    class_plan = get_class_plan(schemaview, type(element).__name__)
+
+    ret_dict = dict()
+    for k, v in vars(element).items():
+        found_slot = class_plan.get_slot(k)
+        if found_slot.is_array and v is not None:
+            if not is_out_of_core(v):
+                v = to_fixed_width(to_ndarray(v, found_slot.dtype))
+            offset = -(-size // ALIGNMENT) * ALIGNMENT
+            shared_array = _SharedArray(offset, tuple(v.shape), v.dtype.str)
+            arrays.append((v, shared_array))
+            size = offset + int(np.prod(v.shape)) * v.dtype.itemsize
+            ret_dict[k] = shared_array
+        elif isinstance(v, BaseModel):
+            ret_dict[k], size = _iterate_element(v, schemaview, arrays, size)
+        else:
+            ret_dict[k] = v
+    return ret_dict, size
+
+
+def _get_view(buffer: memoryview, shared_array: _SharedArray) -> np.ndarray:
+    """Return a NumPy array that is a view of the array in the shared memory buffer.
+
+    The view holds an export of the buffer, so that the shared memory cannot be closed, and
+    unmapped, while the view exists.
+    """
+    count = int(np.prod(shared_array.shape))
+    return np.frombuffer(
+        buffer, dtype=np.dtype(shared_array.dtype), count=count, offset=shared_array.offset
+    ).reshape(shared_array.shape)
+
+
+def _replace_arrays(element: dict, buffer: memoryview) -> dict:
+    """Return a copy of the planned dict with read-only views in place of the array locations."""
+    ret_dict = dict()
+    for k, v in element.items():
+        if isinstance(v, _SharedArray):
+            v = _get_view(buffer, v)
+            v.flags.writeable = False
+        elif isinstance(v, dict):
+            v = _replace_arrays(v, buffer)
+        ret_dict[k] = v
+    return ret_dict
+
+
+class SharedContainer:
+    """Handle to an object whose arrays are in shared memory, for passing to worker processes.
+
+    The process that creates the SharedContainer owns the shared memory. It must keep the
+    SharedContainer open while workers use it and then release the memory by calling ``unlink``,
+    or by using the SharedContainer as a context manager. Workers attach to the shared memory in
+    ``load`` and detach when their SharedContainer is closed or garbage collected. The arrays of
+    loaded objects hold the shared memory, so it cannot be closed while they exist.
+    """
+
+    def __init__(self, target_class: Type[Union[YAMLRoot, BaseModel]], element: dict, name: str):
+        """Create a handle to the shared memory block with the given name.
+
+        Use ``create`` to copy the arrays of an object into shared memory.
+        """
+        self.target_class = target_class
+        self.name = name
+        self._element = element
+        self._shm: Optional[SharedMemory] = None
+
+    @classmethod
+    def create(
+        cls, element: Union[YAMLRoot, BaseModel], schemaview: SchemaView
+    ) -> "SharedContainer":
+        """Copy the arrays of the object into a new block of shared memory.
+
+        Arrays backed by storage, e.g., loaded with ``lazy=True`` or memory-mapped, are copied
+        block by block, so that they are never fully in memory outside of the shared memory.
+        Lists of lists are converted to NumPy arrays with the data type of the slot range.
+        Arrays of strings are stored as fixed-width strings.
+        """
+        arrays: List[Tuple[Any, _SharedArray]] = []
+        planned, size = _iterate_element(element, schemaview, arrays)
+        # shared memory blocks cannot be empty
+        shm = SharedMemory(create=True, size=max(size, 1))
+        try:
+            for array, shared_array in arrays:
+                view = _get_view(shm.buf, shared_array)
+                if isinstance(array, np.ndarray) and not is_out_of_core(array):
+                    view[...] = array
+                else:
+                    copy_array_chunked(array, view)
+                del view
+        except BaseException:
+            shm.close()
+            shm.unlink()
+            raise
+        shared = cls(type(element), planned, shm.name)
+        shared._shm = shm
+        return shared
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """Return the state to pickle, without the attached shared memory."""
+        state = self.__dict__.copy()
+        state["_shm"] = None
+        return state
+
+    def __enter__(self):
+        """Return the handle for use as a context manager."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Release the shared memory."""
+        self.unlink()
+
+    def load(self) -> Union[YAMLRoot, BaseModel]:
+        """Return the object with read-only array views of the shared memory.
+
+        The object is constructed without pydantic validation, which would otherwise copy the
+        arrays into lists.
+        """
+        if self._shm is None:
+            self._shm = SharedMemory(name=self.name)
+        return construct_model(self.target_class, _replace_arrays(self._element, self._shm.buf))
+
+    def close(self):
+        """Detach from the shared memory.
+
+        Raises:
+            BufferError: If arrays loaded from the shared memory still exist.
+        """
+        if self._shm is not None:
+            self._shm.close()
+            self._shm = None
+
+    def unlink(self):
+        """Release the shared memory, which is freed once all processes have detached from it.
+
+        Raises:
+            BufferError: If arrays loaded from the shared memory in this process still exist, in
+                which case the memory is released but this process stays attached.
+        """
+        if self._shm is None:
+            self._shm = SharedMemory(name=self.name)
+        self._shm.unlink()
+        self.close()
@@ -0,0 +1,74 @@
+"""Class for selecting the slots of a LinkML model to load by slot path.
+
+A slot path is the path of a slot from the root object, with parts separated by "/" or ".",
+e.g., "temperature_dataset/temperatures_in_K/values" or "temperature_dataset.name". Each part of
+a pattern can be a glob pattern, e.g., "*/values" or "temperature_dataset/day_in_*", that
+matches a single part of a path. A pattern selects the slots at the paths it matches and all
+slots below them.
+"""
+
+from fnmatch import fnmatchcase
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+
+def _split_path(path: str) -> Tuple[str, ...]:
+    """Split a slot path or pattern into its parts."""
+    return tuple(part for part in path.replace(".", "/").split("/") if part)
+
+
+def _matches_prefix(parts: Sequence[str], pattern: Sequence[str]) -> bool:
+    """Return whether the first parts of the path match all parts of the pattern."""
+    return len(parts) >= len(pattern) and all(
+        fnmatchcase(part, pattern_part) for part, pattern_part in zip(parts, pattern)
+    )
+
+
+def _is_prefix_of_match(parts: Sequence[str], pattern: Sequence[str]) -> bool:
+    """Return whether the path is above a path that the pattern can match."""
+    return len(parts) < len(pattern) and all(
+        fnmatchcase(part, pattern_part) for part, pattern_part in zip(parts, pattern)
+    )
+
+
+class SlotSelector:
+    """Selection of the slots of a model to load, by include and exclude slot path patterns.
+
+    If include is given, only the slots matched by an include pattern, the slots below them, and
+    the objects on the way to them are loaded. Slots matched by an exclude pattern, and the slots
+    below them, are not loaded, even if they are included.
+    """
+
+    def __init__(
+        self, include: Optional[Iterable[str]] = None, exclude: Optional[Iterable[str]] = None
+    ):
+        """Create a selector from include and exclude slot path patterns."""
+        self.include: Optional[List[Tuple[str, ...]]] = (
+            None if include is None else [_split_path(pattern) for pattern in include]
+        )
+        self.exclude: List[Tuple[str, ...]] = [_split_path(pattern) for pattern in exclude or ()]
+
+    def is_excluded(self, path: str) -> bool:
+        """Return whether the slot at the path or an object above it is excluded."""
+        parts = _split_path(path)
+        return any(_matches_prefix(parts, pattern) for pattern in self.exclude)
+
+    def is_selected(self, path: str) -> bool:
+        """Return whether the slot at the path is loaded in full."""
+        parts = _split_path(path)
+        if any(_matches_prefix(parts, pattern) for pattern in self.exclude):
+            return False
+        return self.include is None or any(
+            _matches_prefix(parts, pattern) for pattern in self.include
+        )
+
+    def is_visited(self, path: str) -> bool:
+        """Return whether the object at the path is loaded, in full or only on the way to slots.
+
+        An object that is not selected is visited if it is above a slot that may be selected.
+        """
+        if self.is_selected(path):
+            return True
+        if self.include is None or self.is_excluded(path):
+            return False
+        parts = _split_path(path)
+        return any(_is_prefix_of_match(parts, pattern) for pattern in self.include)
@@ -0,0 +1,218 @@
+"""Utility functions for linkml-arrays."""
+
+import asyncio
+import functools
+import itertools
+import sys
+import typing
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Sequence, Tuple, Type, Union
+
+import numpy as np
+from linkml_runtime.utils.yamlutils import YAMLRoot
+from pydantic import BaseModel
+
+from .dask_array import is_dask_array
+from .lazy_array import LazyArray
+
+# default maximum number of bytes of an array that is read into memory at once by chunked copies
+DEFAULT_MAX_BLOCK_BYTES = 64 * 1024 * 1024
+
+
+def _get_model_class(annotation) -> Optional[Type[BaseModel]]:
+    """Return the pydantic model class in a field annotation, unwrapping Optional and Union."""
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    for arg in typing.get_args(annotation):
+        model_class = _get_model_class(arg)
+        if model_class is not None:
+            return model_class
+    return None
+
+
+def _is_dict_annotation(annotation) -> bool:
+    """Return whether a field annotation is a dict, unwrapping Optional and Union."""
+    if typing.get_origin(annotation) is dict:
+        return True
+    return any(_is_dict_annotation(arg) for arg in typing.get_args(annotation))
+
+
+def construct_model(
+    target_class: Type[Union[YAMLRoot, BaseModel]], element: dict
+) -> Union[YAMLRoot, BaseModel]:
+    """Create an instance of the target class from a dict without running pydantic validation.
+
+    Nested dicts are recursively constructed as instances of the pydantic model class of the
+    corresponding field, as are the dicts in lists and in dicts keyed by identifier of
+    collections. Values are set as-is, so array slots keep their type, e.g., a lazy proxy is not
+    read into a list of lists.
+    """
+    if not (isinstance(target_class, type) and issubclass(target_class, BaseModel)):
+        return target_class(**element)
+
+    values = dict()
+    for k, v in element.items():
+        field = target_class.model_fields.get(k)
+        model_class = None if field is None else _get_model_class(field.annotation)
+        if model_class is not None:
+            if isinstance(v, list):
+                # a collection of objects
+                v = [_construct_item(model_class, item) for item in v]
+            elif isinstance(v, dict) and _is_dict_annotation(field.annotation):
+                # a collection of objects keyed by identifier
+                v = {key: _construct_item(model_class, item) for key, item in v.items()}
+            elif isinstance(v, dict):
+                v = construct_model(model_class, v)
+        values[k] = v
+    return target_class.model_construct(**values)
+
+
+def _construct_item(model_class: Type[BaseModel], item: Any) -> Any:
+    """Construct an item of a collection if it is a dict, else return it, e.g., a reference."""
+    return construct_model(model_class, item) if isinstance(item, dict) else item
+
+
+def get_module_class(target_class: Type, class_name: str) -> Type:
+    """Return the class with the given name in the module of the target class.
+
+    Raises:
+        ValueError: If the module has no class with the name.
+    """
+    model_class = getattr(sys.modules[target_class.__module__], class_name, None)
+    if model_class is None:
+        raise ValueError(f"Class {class_name} not found in module {target_class.__module__}.")
+    return model_class
+
+
+def map_in_threads(
+    func: Callable[[Any], Any], items: Iterable[Any], max_workers: Optional[int] = 1
+) -> List[Any]:
+    """Apply func to each item and return the results in the order of the items.
+
+    If max_workers is 1, the items are processed sequentially in the calling thread. Otherwise,
+    they are processed concurrently in a thread pool with max_workers threads (None for the default
+    of ``concurrent.futures.ThreadPoolExecutor``).
+    """
+    if max_workers == 1:
+        return [func(item) for item in items]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(func, items))
+
+
+async def run_in_executor(
+    executor: Optional[Executor], func: Callable[..., Any], *args, **kwargs
+) -> Any:
+    """Run func with the arguments in the executor and return its result.
+
+    If executor is None, the default executor of the running event loop is used. If the awaiting
+    coroutine is cancelled, func still runs to completion, because threads cannot be interrupted.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, functools.partial(func, *args, **kwargs))
+
+
+def is_out_of_core(array: Any) -> bool:
+    """Return whether the array is backed by storage and can be copied block by block.
+
+    Dask arrays are also copied block by block, so that they are never computed in full.
+
+    Arrays of strings and other objects are not copied block by block, because their storage
+    differs between formats, e.g., variable-length strings in HDF5 and fixed-length strings in Zarr.
+    """
+    return (
+        isinstance(array, (LazyArray, np.memmap)) or is_dask_array(array)
+    ) and array.dtype.kind not in "OU"
+
+
+def to_ndarray(array: Any, dtype: Optional[np.dtype] = None) -> np.ndarray:
+    """Return the array as a NumPy array, without copying it where possible.
+
+    NumPy arrays, including memory-mapped arrays, are returned as-is, whatever their memory layout,
+    and objects that support the buffer protocol, e.g., memoryview, are wrapped without copying.
+    Nested lists and tuples are converted in a single call to NumPy with the given data type, e.g.,
+    that of the slot range, instead of letting NumPy infer it element by element.
+    """
+    if isinstance(array, np.ndarray):
+        return array
+    if isinstance(array, (list, tuple)):
+        return np.array(array, dtype=dtype)
+    try:
+        return np.asarray(memoryview(array))
+    except TypeError:
+        return np.asarray(array)
+
+
+def to_fixed_width(data: np.ndarray) -> np.ndarray:
+    """Convert an object array of strings or bytes to a fixed-width string or bytes array.
+
+    Formats such as Zarr and NumPy files cannot store object arrays without pickling, so strings
+    read as objects, e.g., variable-length strings from an HDF5 file, are converted.
+    """
+    if data.dtype.kind == "O":
+        return np.array(data.tolist())
+    return data
+
+
+def get_block_shape(
+    shape: Sequence[int],
+    itemsize: int,
+    chunks: Optional[Sequence[int]] = None,
+    max_block_bytes: int = DEFAULT_MAX_BLOCK_BYTES,
+) -> Tuple[int, ...]:
+    """Return the shape of the blocks to copy an array in, with at most max_block_bytes each.
+
+    Blocks span the trailing dimensions of the array in full where possible. The leading dimensions
+    are split, aligned to the chunk shape of the array in storage if it is given, so that each
+    chunk is read once.
+    """
+    block = list(shape)
+    for axis in range(len(block)):
+        inner_bytes = itemsize * int(np.prod(block[axis + 1 :]))  # noqa: E203
+        if inner_bytes * block[axis] <= max_block_bytes:
+            break
+        length = max(1, max_block_bytes // inner_bytes)
+        if chunks is not None and length >= chunks[axis]:
+            length -= length % chunks[axis]
+        block[axis] = min(length, block[axis])
+        if length > 1:
+            break
+    return tuple(block)
+
+
+def iter_blocks(shape: Sequence[int], block_shape: Sequence[int]) -> Iterator[Tuple[slice, ...]]:
+    """Yield the selections of the blocks of the given shape that tile an array."""
+    ranges = [range(0, length, block) for length, block in zip(shape, block_shape)]
+    for starts in itertools.product(*ranges):
+        yield tuple(
+            slice(start, min(start + block, length))
+            for start, block, length in zip(starts, block_shape, shape)
+        )
+
+
+def copy_array_chunked(
+    source: Any,
+    destination: Any,
+    max_block_bytes: int = DEFAULT_MAX_BLOCK_BYTES,
+    lock: bool = True,
+):
+    """Copy a sliceable source array to a destination array of the same shape block by block.
+
+    At most max_block_bytes of the source array are held in memory at once. Blocks are aligned to
+    the chunk shape of the source array if it is chunked, else to that of the destination array.
+
+    Dask arrays are instead computed and written chunk by chunk, in parallel, with
+    ``dask.array.store``. The writes are serialized with a lock unless lock is False, which is
+    safe only if the destination supports concurrent writes to the Dask chunks, e.g., a Zarr
+    array whose chunks are aligned to them or a memory-mapped array.
+    """
+    if is_dask_array(source):
+        source.store(destination, lock=lock)
+        return
+    shape = tuple(source.shape)
+    if len(shape) == 0:
+        destination[()] = source[()]
+        return
+    chunks = getattr(source, "chunks", None) or getattr(destination, "chunks", None)
+    block_shape = get_block_shape(shape, source.dtype.itemsize, chunks, max_block_bytes)
+    for selection in iter_blocks(shape, block_shape):
+        destination[selection] = source[selection]
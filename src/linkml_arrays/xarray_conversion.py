@@ -0,0 +1,260 @@
+"""Functions for converting LinkML DataArray objects to and from xarray Datasets.
+
+A DataArray class, e.g., ``TemperatureDataset``, has slots whose ranges are classes with one
+array slot, e.g., ``TemperaturesInKMatrix``. The slots with a ``labeled_by`` annotation are the
+data variables of the Dataset, with the dimension names given by the ``dimensions`` of the array
+slot of their range. Each entry of the annotation maps a labeling slot, e.g., ``latitude_in_deg``,
+to a coordinate with the entry's alias as name, e.g., "lat", over the labeled dimensions of the
+data variable. The other slots of the range objects, e.g., ``conversion_factor`` or
+``reference_date``, are the attributes of their variables, and the other slots of the DataArray
+object, e.g., ``name``, are the attributes of the Dataset.
+
+Arrays are not copied. NumPy arrays, memory-mapped arrays, and Dask arrays are used as the data
+of the variables as they are. Arrays that are stored in a file, i.e., LazyArray proxies, HDF5
+datasets, and Zarr arrays, e.g., loaded with ``lazy=True``, are wrapped in lazily indexed xarray
+arrays, so that selecting from a variable reads only the selected elements from the file. Arrays
+given as lists are converted to NumPy arrays with the data type of the range.
+"""
+
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Type, Union
+
+import h5py
+import numpy as np
+import xarray as xr
+import zarr
+from linkml_runtime import SchemaView
+from linkml_runtime.utils.yamlutils import YAMLRoot
+from pydantic import BaseModel
+from xarray.backends import BackendArray
+from xarray.core import indexing
+
+from .array_selection import read_selection
+from .dask_array import is_dask_array
+from .lazy_array import LazyArray
+from .schema_plan import ClassPlan, SlotPlan, get_class_plan
+from .utils import construct_model, get_module_class, to_ndarray
+
+# annotation of the slots of a DataArray class that are data variables
+LABELED_BY = "labeled_by"
+
+
+class _StoredArray(BackendArray):
+    """Array stored in a file that xarray indexes lazily, reading only the selected elements."""
+
+    def __init__(self, array: Any):
+        """Wrap an HDF5 dataset, a Zarr array, or a LazyArray proxy of one."""
+        self.array = array
+        self.shape = tuple(array.shape)
+        self.dtype = np.dtype(array.dtype)
+
+    def __getitem__(self, key: indexing.ExplicitIndexer) -> np.ndarray:
+        """Read the selected elements, with ints, slices, and index arrays per axis."""
+        return indexing.explicit_indexing_adapter(
+            key, self.shape, indexing.IndexingSupport.OUTER, self._read
+        )
+
+    def _read(self, key: Tuple[Any, ...]) -> np.ndarray:
+        """Read the elements selected by an orthogonal selection."""
+        return read_selection(self.array, key)
+
+
+def _to_variable_data(array: Any, slot: SlotPlan) -> Any:
+    """Return the array as data of an xarray variable, without copying or reading it."""
+    if isinstance(array, (h5py.Dataset, zarr.Array, LazyArray)):
+        return indexing.LazilyIndexedArray(_StoredArray(array))
+    if is_dask_array(array):
+        return array
+    return to_ndarray(array, slot.dtype)
+
+
+def _get_array_slot(class_plan: ClassPlan) -> SlotPlan:
+    """Return the array slot of a class whose objects hold one array.
+
+    Raises:
+        ValueError: If the class does not have exactly one array slot.
+    """
+    array_slots = [slot for slot in class_plan.slots.values() if slot.is_array]
+    if len(array_slots) != 1:
+        raise ValueError(
+            f"Class {class_plan.name} must have exactly one array slot, not {len(array_slots)}."
+        )
+    return array_slots[0]
+
+
+def _get_dims(slot: SlotPlan, ndim: int) -> Tuple[str, ...]:
+    """Return the dimension names of an array slot, from the aliases of its dimensions."""
+    dimensions = slot.definition.array.dimensions or []
+    return tuple(
+        (dimensions[i].alias if i < len(dimensions) else None) or f"{slot.name}_dim_{i}"
+        for i in range(ndim)
+    )
+
+
+def _get_attrs(element: Any, class_plan: ClassPlan) -> Dict[str, Any]:
+    """Return the values of the slots of an object that are not arrays, omitting unset slots."""
+    attrs = dict()
+    for slot in class_plan.slots.values():
+        v = getattr(element, slot.name, None)
+        if not slot.is_array and v is not None:
+            attrs[slot.name] = v
+    return attrs
+
+
+def _get_labeling_slots(class_plan: ClassPlan) -> Dict[str, str]:
+    """Return the labeling slots of the data variables of a DataArray class, keyed by alias."""
+    labeling_slots = dict()
+    for slot in class_plan.slots.values():
+        for entry in slot.annotations.get(LABELED_BY, []):
+            labeling_slots[entry["alias"]] = entry["labeling_slot"]
+    return labeling_slots
+
+
+def _iterate_objects(element: Any) -> Iterator[Any]:
+    """Iterate over an object and the objects in its slots, recursively."""
+    yield element
+    values = (
+        [getattr(element, k) for k in type(element).model_fields]
+        if isinstance(element, BaseModel)
+        else list(vars(element).values())
+    )
+    for v in values:
+        for item in v if isinstance(v, list) else [v]:
+            if isinstance(item, (BaseModel, YAMLRoot)):
+                yield from _iterate_objects(item)
+
+
+def _resolve_reference(
+    identifier: str, class_plan: ClassPlan, root: Optional[Union[YAMLRoot, BaseModel]]
+) -> Any:
+    """Return the object of the class with the identifier in the tree of objects under root.
+
+    Raises:
+        ValueError: If root is not given or has no such object.
+    """
+    if root is not None:
+        for element in _iterate_objects(root):
+            if type(element).__name__ != class_plan.name:
+                continue
+            if getattr(element, class_plan.identifier_slot, None) == identifier:
+                return element
+    raise ValueError(f"Cannot resolve reference {identifier} to a {class_plan.name} object.")
+
+
+def to_xarray(
+    element: Union[YAMLRoot, BaseModel],
+    schemaview: SchemaView,
+    root: Optional[Union[YAMLRoot, BaseModel]] = None,
+) -> xr.Dataset:
+    """Convert an object of a DataArray class to an xarray Dataset, sharing its arrays.
+
+    Labeling slots that are not inlined, e.g., ``latitude_in_deg``, refer to an object by its
+    identifier. The referenced objects are looked up in the tree of objects under root, e.g., the
+    Container that holds both the DataArray object and the ``LatitudeInDegSeries``.
+
+    Raises:
+        ValueError: If a referenced object is not found or a range class does not have exactly
+            one array slot.
+    """
+    class_plan = get_class_plan(schemaview, type(element).__name__)
+    labeling_slots = _get_labeling_slots(class_plan)
+    data_vars: Dict[str, xr.Variable] = dict()
+    coords: Dict[str, xr.Variable] = dict()
+    attrs = dict()
+    for slot in class_plan.slots.values():
+        labeled_by = slot.annotations.get(LABELED_BY)
+        v = getattr(element, slot.name, None)
+        if labeled_by is None:
+            if slot.name not in labeling_slots.values() and v is not None:
+                attrs[slot.name] = v
+            continue
+        if v is None:
+            continue
+
+        range_plan = class_plan.get_range_plan(slot.name)
+        array_slot = _get_array_slot(range_plan)
+        data = _to_variable_data(getattr(v, array_slot.name), array_slot)
+        dims = _get_dims(array_slot, data.ndim)
+        data_vars[slot.name] = xr.Variable(dims, data, attrs=_get_attrs(v, range_plan))
+
+        for entry in labeled_by:
+            labels = getattr(element, entry["labeling_slot"], None)
+            if labels is None or entry["alias"] in coords:
+                continue
+            labels_plan = class_plan.get_range_plan(entry["labeling_slot"])
+            if isinstance(labels, str):
+                labels = _resolve_reference(labels, labels_plan, root)
+            labels_array_slot = _get_array_slot(labels_plan)
+            coords[entry["alias"]] = xr.Variable(
+                tuple(dims[i] for i in entry["labeled_dimensions"]),
+                _to_variable_data(getattr(labels, labels_array_slot.name), labels_array_slot),
+                attrs=_get_attrs(labels, labels_plan),
+            )
+
+    return xr.Dataset(data_vars, coords=coords, attrs=attrs)
+
+
+def _from_variable(variable: xr.DataArray, class_plan: ClassPlan) -> Dict[str, Any]:
+    """Return the slot values of the object of a variable, with its data as the array slot."""
+    element = {k: v for k, v in variable.attrs.items() if k in class_plan.slots}
+    element[_get_array_slot(class_plan).name] = variable.data
+    return element
+
+
+def from_xarray(
+    dataset: xr.Dataset,
+    target_class: Type[Union[YAMLRoot, BaseModel]],
+    schemaview: SchemaView,
+    references: Optional[Dict[str, Any]] = None,
+) -> Union[YAMLRoot, BaseModel]:
+    """Convert an xarray Dataset to an object of a DataArray class, sharing its arrays.
+
+    This is the inverse of ``to_xarray``. The data of each variable, e.g., a NumPy or Dask array,
+    becomes the array slot of its object as it is, so the object is constructed without pydantic
+    validation, which would otherwise convert the arrays to lists. Variables of lazily indexed
+    arrays, e.g., from ``xarray.open_dataset``, are read into memory.
+
+    Labeling slots that are not inlined are set to the identifier of their object, which is
+    taken from the attributes of the coordinate. If references is given, the referenced objects
+    are constructed as instances of the classes with the names of their ranges in the module of
+    target_class, e.g., as generated by gen-pydantic, and added to references keyed by identifier.
+
+    Raises:
+        ValueError: If a data variable of a required slot is missing, a range class does not have
+            exactly one array slot, or a referenced class is not found.
+    """
+    class_plan = get_class_plan(schemaview, target_class.__name__)
+    labeling_slots = _get_labeling_slots(class_plan)
+    element: Dict[str, Any] = {
+        k: v
+        for k, v in dataset.attrs.items()
+        if k in class_plan.slots and k not in labeling_slots.values()
+    }
+    references_to_add: List[Tuple[str, str, Dict[str, Any]]] = []
+    for slot in class_plan.slots.values():
+        if slot.annotations.get(LABELED_BY) is None:
+            continue
+        if slot.name not in dataset.data_vars:
+            if slot.definition.required:
+                raise ValueError(f"Dataset has no data variable {slot.name}.")
+            continue
+        element[slot.name] = _from_variable(
+            dataset[slot.name], class_plan.get_range_plan(slot.name)
+        )
+
+    for alias, labeling_slot in labeling_slots.items():
+        if alias not in dataset.coords:
+            continue
+        labels_plan = class_plan.get_range_plan(labeling_slot)
+        labels = _from_variable(dataset.coords[alias], labels_plan)
+        if class_plan.get_slot(labeling_slot).inlined or labels_plan.identifier_slot is None:
+            element[labeling_slot] = labels
+            continue
+        identifier = labels[labels_plan.identifier_slot]
+        element[labeling_slot] = identifier
+        references_to_add.append((identifier, labels_plan.name, labels))
+
+    if references is not None:
+        for identifier, class_name, labels in references_to_add:
+            model_class = get_module_class(target_class, class_name)
+            references[identifier] = construct_model(model_class, labels)
+    return construct_model(target_class, element)
@@ -0,0 +1,181 @@
+"""Functions for reading and writing YAML with a configurable, C-accelerated backend.
+
+The supported backends are:
+
+- "libyaml": PyYAML with the LibYAML C emitter and parser, ``yaml.CSafeDumper`` and
+  ``yaml.CSafeLoader``. This requires PyYAML to be built with LibYAML.
+- "pyyaml": PyYAML with the pure-Python emitter and parser, ``yaml.SafeDumper`` and
+  ``yaml.SafeLoader``
+- "ruamel": ruamel.yaml with the "safe" type, which uses the C emitter and parser of
+  ruamel.yaml.clib if it is installed
+- "auto": "libyaml" if it is available, else "pyyaml"
+
+The "libyaml" and "pyyaml" backends produce the same YAML.
+"""
+
+import functools
+import io
+from typing import IO, Any, Iterator, Optional, Sequence, Tuple, Union
+
+import yaml
+from ruamel.yaml import YAML
+from yaml.composer import Composer
+
+YAML_BACKENDS = ("auto", "libyaml", "pyyaml", "ruamel")
+
+
+def has_libyaml() -> bool:
+    """Return whether PyYAML was built with the LibYAML C emitter and parser."""
+    return bool(getattr(yaml, "__with_libyaml__", False))
+
+
+def resolve_yaml_backend(backend: str = "auto") -> str:
+    """Return the name of the backend to use for the requested backend.
+
+    Raises:
+        ValueError: If the backend is not supported, or if "libyaml" is requested but PyYAML was
+            not built with LibYAML.
+    """
+    if backend not in YAML_BACKENDS:
+        raise ValueError(f"Unsupported YAML backend {backend}. Supported are {YAML_BACKENDS}.")
+    if backend == "auto":
+        return "libyaml" if has_libyaml() else "pyyaml"
+    if backend == "libyaml" and not has_libyaml():
+        raise ValueError("The libyaml YAML backend requires PyYAML to be built with LibYAML.")
+    return backend
+
+
+def yaml_dump(data: Any, backend: str = "auto") -> str:
+    """Return the data formatted as a YAML string with the given backend.
+
+    Only standard YAML tags are emitted, as with ``yaml.safe_dump``, so that ``yaml_load`` reads
+    the string back.
+    """
+    backend = resolve_yaml_backend(backend)
+    if backend == "ruamel":
+        stream = io.StringIO()
+        YAML(typ="safe").dump(data, stream)
+        return stream.getvalue()
+    dumper = yaml.CSafeDumper if backend == "libyaml" else yaml.SafeDumper
+    return yaml.dump(data, Dumper=dumper)
+
+
+def yaml_load(source: str, backend: str = "auto") -> Any:
+    """Return the data in the YAML string parsed with the given backend.
+
+    Only standard YAML tags are constructed, as with ``yaml.safe_load``.
+    """
+    backend = resolve_yaml_backend(backend)
+    if backend == "ruamel":
+        return YAML(typ="safe").load(source)
+    loader = yaml.CSafeLoader if backend == "libyaml" else yaml.SafeLoader
+    return yaml.load(source, Loader=loader)  # noqa: S506
+
+
+@functools.lru_cache(maxsize=None)
+def _get_composing_loader_class() -> type:
+    """Return a LibYAML loader class that can compose a node from the next events.
+
+    The LibYAML parser only composes whole documents, so the composer methods of PyYAML are used
+    to compose nodes within a document. The class is created on first use, because
+    ``yaml.CSafeLoader`` only exists if PyYAML was built with LibYAML.
+    """
+
+    class _CSafeComposingLoader(yaml.CSafeLoader):
+        compose_node = Composer.compose_node
+        compose_scalar_node = Composer.compose_scalar_node
+        compose_sequence_node = Composer.compose_sequence_node
+        compose_mapping_node = Composer.compose_mapping_node
+
+        def __init__(self, stream):
+            super().__init__(stream)
+            self.anchors = {}
+
+    return _CSafeComposingLoader
+
+
+def _skip_node(loader: Any):
+    """Consume the events of the next node without composing it."""
+    depth = 0
+    while True:
+        event = loader.get_event()
+        if isinstance(event, (yaml.MappingStartEvent, yaml.SequenceStartEvent)):
+            depth += 1
+        elif isinstance(event, (yaml.MappingEndEvent, yaml.SequenceEndEvent)):
+            depth -= 1
+        if depth == 0:
+            return
+
+
+def _find_key(loader: Any, key: str) -> bool:
+    """Consume the events up to the value of the key in the next node, if it is a mapping.
+
+    Return whether the key was found. If not, the events of the node are consumed.
+    """
+    if not loader.check_event(yaml.MappingStartEvent):
+        _skip_node(loader)
+        return False
+    loader.get_event()
+    while not loader.check_event(yaml.MappingEndEvent):
+        event = loader.get_event()
+        if isinstance(event, yaml.ScalarEvent) and event.value == key:
+            return True
+        _skip_node(loader)
+    loader.get_event()
+    return False
+
+
+def _iter_loaded_collection(data: Any, path: Sequence[str]) -> Iterator[Tuple[Optional[str], Any]]:
+    """Iterate over the items of the list or dict at the path in parsed data."""
+    for part in path:
+        if not isinstance(data, dict):
+            return
+        data = data.get(part)
+    if isinstance(data, dict):
+        yield from data.items()
+    elif isinstance(data, list):
+        yield from ((None, item) for item in data)
+
+
+def iter_yaml_collection(
+    source: Union[str, IO], path: Sequence[str], backend: str = "auto"
+) -> Iterator[Tuple[Optional[str], Any]]:
+    """Iterate over the items of the sequence or mapping at the path of keys in a YAML document.
+
+    Yield the key and value of each item of a mapping, and None and the value of each item of a
+    sequence. The source is a YAML string or a file opened for reading. With the "libyaml" and
+    "pyyaml" backends, the document is parsed as a stream of events, and each item is
+    constructed when it is reached and not kept, so that memory is bounded by the size of an item
+    rather than of the document. Aliases must refer to anchors within the same item. The
+    "ruamel" backend parses the whole document first. Nothing is yielded if there is no sequence
+    or mapping at the path.
+    """
+    backend = resolve_yaml_backend(backend)
+    if backend == "ruamel":
+        yield from _iter_loaded_collection(YAML(typ="safe").load(source), path)
+        return
+    if backend == "libyaml":
+        loader = _get_composing_loader_class()(source)
+    else:
+        loader = yaml.SafeLoader(source)
+    try:
+        loader.get_event()  # StreamStartEvent
+        if loader.check_event(yaml.StreamEndEvent):
+            return
+        loader.get_event()  # DocumentStartEvent
+        for part in path:
+            if not _find_key(loader, part):
+                return
+        is_mapping = loader.check_event(yaml.MappingStartEvent)
+        if not (is_mapping or loader.check_event(yaml.SequenceStartEvent)):
+            return
+        loader.get_event()
+        end_event = yaml.MappingEndEvent if is_mapping else yaml.SequenceEndEvent
+        while not loader.check_event(end_event):
+            key = loader.construct_document(loader.compose_node(None, None)) if is_mapping else None
+            value = loader.construct_document(loader.compose_node(None, None))
+            # forget the anchors of the item, so that they do not accumulate
+            loader.anchors = {}
+            yield key, value
+    finally:
+        loader.dispose()
@@ -0,0 +1,79 @@
+"""Pydantic models of temperature_schema.yaml whose array slots are NumPy arrays.
+
+These are the models of ``array_classes_lol.py`` with the array slots annotated with the
+NDArraySpec of their range and ``array`` expression instead of as nested lists.
+"""
+
+from typing import Annotated, Optional
+
+import numpy as np
+from pydantic import BaseModel, ConfigDict
+
+from linkml_arrays.ndarray_type import NDArraySpec
+
+
+class ConfiguredBaseModel(BaseModel):
+    """Base model configured like the generated models."""
+
+    model_config = ConfigDict(
+        validate_assignment=True,
+        validate_default=True,
+        extra="forbid",
+        arbitrary_types_allowed=True,
+        use_enum_values=True,
+        strict=False,
+    )
+
+
+class LatitudeInDegSeries(ConfiguredBaseModel):
+    """A 2D array whose values represent latitude."""
+
+    name: str
+    values: Annotated[np.ndarray, NDArraySpec("float64", ndim=2)]
+
+
+class LongitudeInDegSeries(ConfiguredBaseModel):
+    """A 2D array whose values represent longitude."""
+
+    name: str
+    values: Annotated[np.ndarray, NDArraySpec("float64", ndim=2)]
+
+
+class DateSeries(ConfiguredBaseModel):
+    """A 1D series of dates."""
+
+    values: Annotated[np.ndarray, NDArraySpec(ndim=1)]
+
+
+class DaysInDSinceSeries(ConfiguredBaseModel):
+    """A 1D series whose values represent the number of days since a reference date."""
+
+    values: Annotated[np.ndarray, NDArraySpec("int64", ndim=1)]
+    reference_date: str
+
+
+class TemperaturesInKMatrix(ConfiguredBaseModel):
+    """A 3D array of temperatures."""
+
+    conversion_factor: Optional[float] = None
+    values: Annotated[np.ndarray, NDArraySpec("float64", ndim=3)]
+
+
+class TemperatureDataset(ConfiguredBaseModel):
+    """A dataset of temperatures labeled by latitude, longitude, and date."""
+
+    name: str
+    latitude_in_deg: str
+    longitude_in_deg: str
+    date: DateSeries
+    day_in_d: Optional[DaysInDSinceSeries] = None
+    temperatures_in_K: TemperaturesInKMatrix
+
+
+class Container(ConfiguredBaseModel):
+    """A container for a temperature dataset."""
+
+    name: str
+    temperature_dataset: TemperatureDataset
+    latitude_series: LatitudeInDegSeries
+    longitude_series: LongitudeInDegSeries
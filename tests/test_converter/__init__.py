@@ -0,0 +1 @@
+"""Tests for the converter of linkml-arrays."""
@@ -0,0 +1,107 @@
+"""Test converting LinkML models between file formats with bounded memory."""
+
+from pathlib import Path
+
+import h5py
+import numpy as np
+import pytest
+from linkml_runtime import SchemaView
+
+from linkml_arrays.converter import convert
+from linkml_arrays.dumpers import YamlHdf5Dumper
+from linkml_arrays.lazy_array import LazyArray
+from linkml_arrays.loaders import Hdf5Loader, YamlArrayFileLoader, ZarrDirectoryStoreLoader
+from linkml_arrays.utils import copy_array_chunked, get_block_shape
+from tests.array_classes_lol import Container
+from tests.test_dumpers.test_dumpers import _create_container
+from tests.test_loaders.test_loaders import _check_container
+
+INPUT_DIR = Path(__file__).parent.parent / "input"
+
+
+def test_convert_hdf5_to_zarr_to_hdf5(tmp_path):
+    """Test converting an HDF5 file to a Zarr directory store and back."""
+    schemaview = SchemaView(INPUT_DIR / "temperature_schema.yaml")
+    zarr_path = tmp_path / "my_container.zarr"
+    convert(INPUT_DIR / "my_container.h5", zarr_path, Container, schemaview)
+    container = ZarrDirectoryStoreLoader().loads(
+        str(zarr_path), target_class=Container, schemaview=schemaview
+    )
+    _check_container(container)
+
+    hdf5_path = tmp_path / "my_container.h5"
+    convert(zarr_path, hdf5_path, Container, schemaview, storage_options={"compression": "gzip"})
+    container = Hdf5Loader().loads(str(hdf5_path), target_class=Container, schemaview=schemaview)
+    _check_container(container)
+    with h5py.File(hdf5_path, "r") as f:
+        assert f["temperature_dataset/temperatures_in_K/values"].compression == "gzip"
+
+
+def test_convert_hdf5_to_yaml_numpy(tmp_path):
+    """Test converting an HDF5 file to a YAML file with arrays in NumPy files."""
+    schemaview = SchemaView(INPUT_DIR / "temperature_schema.yaml")
+    yaml_path = tmp_path / "my_container.yaml"
+    convert(
+        INPUT_DIR / "my_container.h5",
+        yaml_path,
+        Container,
+        schemaview,
+        output_format="yaml_numpy",
+        output_dir=tmp_path / "arrays",
+    )
+    container = YamlArrayFileLoader().loads(
+        yaml_path.read_text(), target_class=Container, schemaview=schemaview, base_dir=tmp_path
+    )
+    _check_container(container)
+
+    with pytest.raises(ValueError, match="Cannot infer the format"):
+        convert(yaml_path, tmp_path / "out.h5", Container, schemaview)
+
+
+def test_convert_yaml_hdf5_to_zarr(tmp_path, monkeypatch):
+    """Test that arrays in HDF5 files referenced by YAML are copied without reading them whole."""
+    schemaview = SchemaView(INPUT_DIR / "temperature_schema.yaml")
+    yaml_path = tmp_path / "my_container.yaml"
+    YamlHdf5Dumper().dump(
+        _create_container(), yaml_path, schemaview, output_dir=tmp_path, consolidated=True
+    )
+
+    read_kinds = set()
+    materialized_kinds = set()
+    getitem, to_array = LazyArray.__getitem__, LazyArray.__array__
+
+    def record_getitem(self, key):
+        read_kinds.add(self.dtype.kind)
+        return getitem(self, key)
+
+    def record_array(self, *args, **kwargs):
+        materialized_kinds.add(self.dtype.kind)
+        return to_array(self, *args, **kwargs)
+
+    monkeypatch.setattr(LazyArray, "__getitem__", record_getitem)
+    monkeypatch.setattr(LazyArray, "__array__", record_array)
+    zarr_path = tmp_path / "my_container.zarr"
+    convert(yaml_path, zarr_path, Container, schemaview, source_format="yaml_hdf5")
+    # numeric arrays are read block by block from the HDF5 datasets, and only strings whole
+    assert {"f", "i"} <= read_kinds
+    assert materialized_kinds <= set("OSU")
+
+    container = ZarrDirectoryStoreLoader().loads(
+        str(zarr_path), target_class=Container, schemaview=schemaview
+    )
+    _check_container(container)
+
+
+def test_copy_array_chunked(tmp_path):
+    """Test copying an array block by block with a small maximum block size."""
+    data = np.arange(5 * 6 * 7, dtype=np.int64).reshape((5, 6, 7))
+    with h5py.File(tmp_path / "data.h5", "w") as f:
+        source = LazyArray(f.create_dataset("data", data=data, chunks=(2, 3, 7)))
+        destination = np.zeros_like(data)
+        copy_array_chunked(source, destination, max_block_bytes=2 * 7 * 8)
+        np.testing.assert_array_equal(destination, data)
+
+    # blocks span whole rows where possible and are aligned to the chunks
+    assert get_block_shape((5, 6, 7), 8, (2, 3, 7), max_block_bytes=6 * 7 * 8 * 3) == (2, 6, 7)
+    assert get_block_shape((5, 6, 7), 8, None, max_block_bytes=2 * 7 * 8) == (1, 2, 7)
+    assert get_block_shape((5, 6, 7), 8, None, max_block_bytes=10**9) == (5, 6, 7)
@@ -1,21 +1,29 @@
 """Test dumping LinkML pydantic models with arrays as lists-of-lists to various file formats."""
 
+import asyncio
 import os
 from pathlib import Path
 
 import h5py
+import numcodecs
 import numpy as np
+import pytest
 import zarr
 from linkml_runtime import SchemaView
+from linkml_runtime.linkml_model.meta import Annotation
 from ruamel.yaml import YAML
+from yaml.representer import RepresenterError
 
 from linkml_arrays.dumpers import (
+    Hdf5AppendWriter,
     Hdf5Dumper,
     YamlDumper,
     YamlHdf5Dumper,
     YamlNumpyDumper,
+    ZarrDirectoryStoreAppendWriter,
     ZarrDirectoryStoreDumper,
 )
+from linkml_arrays.yaml_backend import has_libyaml, yaml_dump, yaml_load
 from tests.array_classes_lol import (
     Container,
     DateSeries,
@@ -73,6 +81,55 @@ def test_yaml_dumper():
         assert actual == expected
 
 
+@pytest.mark.parametrize("yaml_backend", ["libyaml", "pyyaml", "ruamel"])
+def test_yaml_dumper_backends(yaml_backend):
+    """Test YamlDumper dumping to a YAML file with each YAML backend."""
+    if yaml_backend == "libyaml" and not has_libyaml():
+        pytest.skip("PyYAML was not built with LibYAML")
+    container = _create_container()
+
+    schemaview = SchemaView(INPUT_DIR / "temperature_schema.yaml")
+    ret = YamlDumper().dumps(container, schemaview=schemaview, yaml_backend=yaml_backend)
+
+    expected_yaml_file = INPUT_DIR / "container_yaml.yaml"
+    yaml = YAML(typ="safe")
+    with open(expected_yaml_file) as f:
+        expected = yaml.load(f)  # load yaml into dictionary
+        actual = yaml.load(ret)
+        assert actual == expected
+
+
+@pytest.mark.parametrize("yaml_backend", ["libyaml", "pyyaml"])
+def test_yaml_dump_safe(yaml_backend):
+    """Test that the PyYAML backends emit only standard tags, which the safe loaders read."""
+    if yaml_backend == "libyaml" and not has_libyaml():
+        pytest.skip("PyYAML was not built with LibYAML")
+    ret = yaml_dump({"shape": (2, 3)}, yaml_backend)
+    assert "!!python" not in ret
+    assert yaml_load(ret, yaml_backend) == {"shape": [2, 3]}
+    with pytest.raises(RepresenterError):
+        yaml_dump({"value": object()}, yaml_backend)
+
+
+def test_yaml_dumper_base64():
+    """Test YamlDumper dumping to a YAML file with arrays encoded as base64 bytes."""
+    container = _create_container()
+
+    schemaview = SchemaView(INPUT_DIR / "temperature_schema.yaml")
+    ret = YamlDumper().dumps(container, schemaview=schemaview, array_encoding="base64")
+
+    # read and compare with the expected YAML file ignoring order of keys
+    expected_yaml_file = INPUT_DIR / "container_yaml_base64.yaml"
+    yaml = YAML(typ="safe")
+    with open(expected_yaml_file) as f:
+        expected = yaml.load(f)  # load yaml into dictionary
+        actual = yaml.load(ret)
+        assert actual == expected
+
+    with pytest.raises(ValueError, match="Unsupported array encoding"):
+        YamlDumper().dumps(container, schemaview=schemaview, array_encoding="hex")
+
+
 def test_yaml_numpy_dumper():
     """Test YamlNumpyDumper dumping to a YAML file and NumPy .npy files in a directory."""
     container = _create_container()
@@ -89,6 +146,20 @@ def test_yaml_numpy_dumper():
         assert actual == expected
 
 
+def test_yaml_numpy_dumper_parallel(tmp_path):
+    """Test YamlNumpyDumper writing the NumPy files concurrently gives the same YAML and files."""
+    container = _create_container()
+
+    schemaview = SchemaView(INPUT_DIR / "temperature_schema.yaml")
+    expected = YamlNumpyDumper().dumps(container, schemaview=schemaview, output_dir=tmp_path)
+    expected_files = {path.name: path.read_bytes() for path in tmp_path.iterdir()}
+    actual = YamlNumpyDumper().dumps(
+        container, schemaview=schemaview, output_dir=tmp_path, max_workers=4
+    )
+    assert actual == expected
+    assert {path.name: path.read_bytes() for path in tmp_path.iterdir()} == expected_files
+
+
 def test_yaml_hdf5_dumper():
     """Test YamlNumpyDumper dumping to a YAML file and HDF5 datasets in a directory."""
     container = _create_container()
@@ -105,6 +176,83 @@ def test_yaml_hdf5_dumper():
         assert actual == expected
 
 
+@pytest.mark.parametrize("dumper_class", [YamlNumpyDumper, YamlHdf5Dumper])
+def test_yaml_array_file_dumper_consolidated(tmp_path, dumper_class):
+    """Test dumping all arrays to a single file keyed by the paths of the arrays."""
+    container = _create_container()
+
+    schemaview = SchemaView(INPUT_DIR / "temperature_schema.yaml")
+    ret = dumper_class().dumps(
+        container, schemaview=schemaview, output_dir=tmp_path, consolidated=True
+    )
+
+    assert [path.name for path in tmp_path.iterdir()] == [
+        "my_container" + dumper_class.CONSOLIDATED_FILE_SUFFIX
+    ]
+    actual = YAML(typ="safe").load(ret)
+    source = actual["temperature_dataset"]["temperatures_in_K"]["values"]["source"][0]
+    assert source["path"] == "temperature_dataset/temperatures_in_K/values"
+    assert source["format"] == dumper_class.FORMAT
+    assert os.path.samefile(
+        source["file"], tmp_path / ("my_container" + dumper_class.CONSOLIDATED_FILE_SUFFIX)
+    )
+    assert actual["latitude_series"]["values"]["source"][0]["file"] == source["file"]
+
+
+@pytest.mark.parametrize("dumper_class", [YamlNumpyDumper, YamlHdf5Dumper])
+def test_yaml_array_file_dumper_dump(tmp_path, dumper_class):
+    """Test dumping to a YAML file with array file paths relative to the YAML file."""
+    container = _create_container()
+    schemaview = SchemaView(INPUT_DIR / "temperature_schema.yaml")
+    yaml_path = tmp_path / "manifest" / "my_container.yaml"
+    yaml_path.parent.mkdir()
+    dumper_class().dump(container, yaml_path, schemaview, output_dir=tmp_path / "arrays")
+
+    actual = YAML(typ="safe").load(yaml_path.read_text())
+    source = actual["latitude_series"]["values"]["source"][0]
+    assert source["file"] == f"./../arrays/my_latitude.values{dumper_class.FILE_SUFFIX}"
+    assert (yaml_path.parent / source["file"]).exists()
+
+    # the arrays are written next to the YAML file by default
+    dumper_class().dump(container, yaml_path, schemaview)
+    actual = YAML(typ="safe").load(yaml_path.read_text())
+    source = actual["latitude_series"]["values"]["source"][0]
+    assert source["file"] == f"./my_latitude.values{dumper_class.FILE_SUFFIX}"
+
+
+def test_yaml_array_file_dumper_name_collision(tmp_path):
+    """Test that arrays that would be written to the same file are rejected."""
+    container = _create_container()
+    container.longitude_series.name = "my_latitude"
+    schemaview = SchemaView(INPUT_DIR / "temperature_schema.yaml")
+    with pytest.raises(ValueError, match="would both be written to a file named"):
+        YamlNumpyDumper().dumps(container, schemaview=schemaview, output_dir=tmp_path)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_dumpers_adumps(tmp_path):
+    """Test dumping in an executor from an asyncio event loop."""
+    container = _create_container()
+    schemaview = SchemaView(INPUT_DIR / "temperature_schema.yaml")
+
+    async def dump_all():
+        return await asyncio.gather(
+            Hdf5Dumper().adumps(container, schemaview, output_file_path=tmp_path / "c.h5"),
+            ZarrDirectoryStoreDumper().adumps(
+                container, schemaview, output_file_path=tmp_path / "c.zarr"
+            ),
+            YamlNumpyDumper().adumps(container, schemaview, output_dir=tmp_path / "npy"),
+        )
+
+    _, _, yaml_str = asyncio.run(dump_all())
+    with h5py.File(tmp_path / "c.h5", "r") as f:
+        np.testing.assert_array_equal(f["latitude_series/values"][:], [[1, 2], [3, 4]])
+    root = zarr.open(str(tmp_path / "c.zarr"), mode="r")
+    np.testing.assert_array_equal(root["latitude_series/values"][:], [[1, 2], [3, 4]])
+    source = YAML(typ="safe").load(yaml_str)["latitude_series"]["values"]["source"][0]
+    np.testing.assert_array_equal(np.load(source["file"]), [[1, 2], [3, 4]])
+
+
 def test_hdf5_dumper(tmp_path):
     """Test Hdf5Dumper dumping to an HDF5 file."""
     container = _create_container()
@@ -135,6 +283,141 @@ def test_hdf5_dumper(tmp_path):
         )
 
 
+def test_hdf5_dumper_storage_options(tmp_path):
+    """Test Hdf5Dumper creating chunked and compressed datasets."""
+    container = _create_container()
+
+    schemaview = SchemaView(INPUT_DIR / "temperature_schema.yaml")
+    output_file_path = tmp_path / "my_container.h5"
+    Hdf5Dumper().dumps(
+        container,
+        schemaview=schemaview,
+        output_file_path=output_file_path,
+        storage_options={"compression": "gzip", "compression_level": 6},
+        slot_storage_options={
+            "TemperaturesInKMatrix.values": {"chunks": [2, 2, 1], "shuffle": True},
+            "latitude_series/values": {"compression": "lzf"},
+        },
+    )
+
+    with h5py.File(output_file_path, "r") as f:
+        temperatures = f["temperature_dataset/temperatures_in_K/values"]
+        assert temperatures.chunks == (2, 2, 1)
+        assert temperatures.compression == "gzip"
+        assert temperatures.compression_opts == 6
+        assert temperatures.shuffle
+        np.testing.assert_array_equal(temperatures[:], [[[0, 1], [2, 3]], [[4, 5], [6, 7]]])
+        assert f["latitude_series/values"].compression == "lzf"
+        assert f["longitude_series/values"].compression == "gzip"
+
+
+def test_hdf5_dumper_storage_annotation(tmp_path):
+    """Test Hdf5Dumper reading storage options from the storage annotation of an array slot."""
+    container = _create_container()
+
+    schemaview = SchemaView(INPUT_DIR / "temperature_schema.yaml")
+    values_slot = schemaview.get_class("TemperaturesInKMatrix").attributes["values"]
+    values_slot.annotations["storage"] = Annotation(
+        tag="storage", value={"chunks": [1, 2, 2], "compression": "gzip"}
+    )
+    schemaview.set_modified()
+
+    output_file_path = tmp_path / "my_container.h5"
+    Hdf5Dumper().dumps(container, schemaview=schemaview, output_file_path=output_file_path)
+
+    with h5py.File(output_file_path, "r") as f:
+        temperatures = f["temperature_dataset/temperatures_in_K/values"]
+        assert temperatures.chunks == (1, 2, 2)
+        assert temperatures.compression == "gzip"
+        assert f["latitude_series/values"].compression is None
+
+    with pytest.raises(ValueError, match="Unsupported storage option"):
+        Hdf5Dumper().dumps(
+            container,
+            schemaview=schemaview,
+            output_file_path=output_file_path,
+            storage_options={"compresion": "gzip"},
+        )
+
+
+def _append_frames(writer):
+    """Append two days of temperature frames and dates, and the days since the reference date."""
+    for day in range(2, 4):
+        frame = np.full((2, 2, 1), day)
+        writer.append("temperature_dataset/temperatures_in_K/values", frame, axis=2)
+        writer.append("temperature_dataset/date/values", [f"2020-01-0{day + 1}"])
+    # the days since the reference date were empty so they are created on the first append
+    writer.append("temperature_dataset/day_in_d/values", [0, 1, 2, 3])
+
+
+def _check_appended(root):
+    """Check the arrays written by _append_frames."""
+    temperatures = root["temperature_dataset/temperatures_in_K/values"]
+    assert temperatures.shape == (2, 2, 4)
+    np.testing.assert_array_equal(temperatures[:, :, :2], [[[0, 1], [2, 3]], [[4, 5], [6, 7]]])
+    np.testing.assert_array_equal(
+        temperatures[:, :, 2:], np.stack([np.full((2, 2), 2), np.full((2, 2), 3)], axis=2)
+    )
+    np.testing.assert_array_equal(root["temperature_dataset/day_in_d/values"][:], [0, 1, 2, 3])
+    assert root.attrs["name"] == "my_container"
+    assert root["temperature_dataset/day_in_d"].attrs["reference_date"] == "2020-01-01"
+
+
+def test_hdf5_append_writer(tmp_path):
+    """Test Hdf5AppendWriter appending batches to the datasets of a dumped container."""
+    container = _create_container()
+    container.temperature_dataset.day_in_d = DaysInDSinceSeries(
+        values=[], reference_date="2020-01-01"
+    )
+
+    schemaview = SchemaView(INPUT_DIR / "temperature_schema.yaml")
+    output_file_path = tmp_path / "my_container.h5"
+    with Hdf5AppendWriter(
+        container,
+        schemaview=schemaview,
+        output_file_path=output_file_path,
+        slot_storage_options={"TemperaturesInKMatrix.values": {"chunks": [2, 2, 1]}},
+    ) as writer:
+        _append_frames(writer)
+        with pytest.raises(ValueError, match="Cannot append data with shape"):
+            writer.append("temperature_dataset/temperatures_in_K/values", np.zeros((3, 2, 1)), 2)
+        with pytest.raises(KeyError):
+            writer.append("temperature_dataset/not_an_array", [0])
+
+    with h5py.File(output_file_path, "r") as f:
+        _check_appended(f)
+        assert f["temperature_dataset/temperatures_in_K/values"].chunks == (2, 2, 1)
+        np.testing.assert_array_equal(
+            f["temperature_dataset/date/values"].asstr()[:],
+            ["2020-01-01", "2020-01-02", "2020-01-03", "2020-01-04"],
+        )
+
+
+def test_zarr_directory_store_append_writer(tmp_path):
+    """Test ZarrDirectoryStoreAppendWriter appending batches to the arrays of a dumped container."""
+    container = _create_container()
+    container.temperature_dataset.day_in_d = DaysInDSinceSeries(
+        values=[], reference_date="2020-01-01"
+    )
+
+    schemaview = SchemaView(INPUT_DIR / "temperature_schema.yaml")
+    output_file_path = tmp_path / "my_container.zarr"
+    with ZarrDirectoryStoreAppendWriter(
+        container,
+        schemaview=schemaview,
+        output_file_path=output_file_path,
+        slot_storage_options={"TemperaturesInKMatrix.values": {"chunks": [2, 2, 1]}},
+    ) as writer:
+        _append_frames(writer)
+
+    root = zarr.group(store=output_file_path)
+    _check_appended(root)
+    np.testing.assert_array_equal(
+        root["temperature_dataset/date/values"][:],
+        ["2020-01-01", "2020-01-02", "2020-01-03", "2020-01-04"],
+    )
+
+
 def test_zarr_directory_store_dumper(tmp_path):
     """Test ZarrDumper dumping to an HDF5 file."""
     container = _create_container()
@@ -167,3 +450,158 @@ def test_zarr_directory_store_dumper(tmp_path):
         root["temperature_dataset/temperatures_in_K/values"][:],
         [[[0, 1], [2, 3]], [[4, 5], [6, 7]]],
     )
+
+
+def test_zarr_directory_store_dumper_storage_options(tmp_path):
+    """Test ZarrDirectoryStoreDumper creating chunked and compressed arrays."""
+    container = _create_container()
+
+    schemaview = SchemaView(INPUT_DIR / "temperature_schema.yaml")
+    output_file_path = tmp_path / "my_container.zarr"
+    ZarrDirectoryStoreDumper().dumps(
+        container,
+        schemaview=schemaview,
+        output_file_path=output_file_path,
+        storage_options={"compression": "zstd", "compression_level": 5},
+        slot_storage_options={
+            "temperature_dataset/temperatures_in_K/values": {
+                "chunks": [2, 2, 1],
+                "compression": "blosc",
+                "shuffle": True,
+            },
+            "LatitudeInDegSeries.values": {"compression": "none"},
+        },
+    )
+
+    root = zarr.group(store=output_file_path)
+    temperatures = root["temperature_dataset/temperatures_in_K/values"]
+    assert temperatures.chunks == (2, 2, 1)
+    assert isinstance(temperatures.compressor, numcodecs.Blosc)
+    assert temperatures.compressor.shuffle == numcodecs.Blosc.SHUFFLE
+    np.testing.assert_array_equal(temperatures[:], [[[0, 1], [2, 3]], [[4, 5], [6, 7]]])
+    assert root["latitude_series/values"].compressor is None
+    assert root["longitude_series/values"].compressor == numcodecs.Zstd(5)
+
+
+@pytest.mark.parametrize("pool", ["thread", "process"])
+def test_zarr_directory_store_dumper_parallel(tmp_path, pool):
+    """Test ZarrDirectoryStoreDumper writing regions of arrays concurrently in a pool."""
+    container = _create_container()
+    values = np.arange(20 * 30 * 10, dtype=np.float64).reshape((20, 30, 10))
+    # construct without validation so that the array is not converted to lists
+    container.temperature_dataset.temperatures_in_K = TemperaturesInKMatrix.model_construct(
+        conversion_factor=1000.0, values=values
+    )
+    schemaview = SchemaView(INPUT_DIR / "temperature_schema.yaml")
+    # chunks that do not divide the shape, so that the last chunks along each axis are partial
+    slot_storage_options = {"TemperaturesInKMatrix.values": {"chunks": [3, 7, 4]}}
+    ZarrDirectoryStoreDumper().dumps(
+        container, schemaview, tmp_path / "serial.zarr", slot_storage_options=slot_storage_options
+    )
+    ZarrDirectoryStoreDumper().dumps(
+        container,
+        schemaview,
+        tmp_path / "parallel.zarr",
+        slot_storage_options=slot_storage_options,
+        max_workers=4,
+        pool=pool,
+        region_bytes=2000,
+    )
+
+    serial = zarr.open(str(tmp_path / "serial.zarr"), mode="r")
+    parallel = zarr.open(str(tmp_path / "parallel.zarr"), mode="r")
+    temperatures = parallel["temperature_dataset/temperatures_in_K/values"]
+    assert temperatures.chunks == (3, 7, 4)
+    np.testing.assert_array_equal(temperatures[:], values)
+    np.testing.assert_array_equal(
+        parallel["temperature_dataset/date/values"][:], ["2020-01-01", "2020-01-02"]
+    )
+    # the chunks are identical to those written serially
+    for path in ("temperature_dataset/temperatures_in_K/values", "latitude_series/values"):
+        chunk_names = sorted(k for k in os.listdir(tmp_path / "serial.zarr" / path))
+        assert chunk_names == sorted(os.listdir(tmp_path / "parallel.zarr" / path))
+        for name in chunk_names:
+            assert (tmp_path / "serial.zarr" / path / name).read_bytes() == (
+                tmp_path / "parallel.zarr" / path / name
+            ).read_bytes()
+    assert serial.attrs.asdict() == parallel.attrs.asdict()
+
+    with pytest.raises(ValueError, match="Unsupported pool"):
+        ZarrDirectoryStoreDumper().dumps(
+            container, schemaview, tmp_path / "other.zarr", max_workers=2, pool="gpu"
+        )
+
+
+def _create_ndarray_container() -> Container:
+    """Create a container whose arrays are NumPy arrays, a buffer, and lists of integers."""
+    container = _create_container()
+    # construct without validation so that the arrays are not converted to lists
+    container.latitude_series = LatitudeInDegSeries.model_construct(
+        name="my_latitude", values=[[1, 2], [3, 4]]
+    )
+    container.temperature_dataset.temperatures_in_K = TemperaturesInKMatrix.model_construct(
+        conversion_factor=1000.0,
+        values=np.asfortranarray(np.arange(8, dtype=np.float32).reshape((2, 2, 2))),
+    )
+    container.temperature_dataset.day_in_d = DaysInDSinceSeries.model_construct(
+        values=memoryview(np.array([0, 1], dtype=np.int32)), reference_date="2020-01-01"
+    )
+    return container
+
+
+def test_dumpers_ndarray_inputs(tmp_path):
+    """Test dumping NumPy arrays and buffers as-is and lists with the data type of the range."""
+    container = _create_ndarray_container()
+    schemaview = SchemaView(INPUT_DIR / "temperature_schema.yaml")
+    expected_temperatures = np.arange(8, dtype=np.float32).reshape((2, 2, 2))
+
+    Hdf5Dumper().dumps(container, schemaview, output_file_path=tmp_path / "container.h5")
+    ZarrDirectoryStoreDumper().dumps(
+        container, schemaview, output_file_path=tmp_path / "container.zarr"
+    )
+    with h5py.File(tmp_path / "container.h5", "r") as f:
+        zarr_root = zarr.open(str(tmp_path / "container.zarr"), mode="r")
+        for root in (f, zarr_root):
+            # the latitude range is float, so the lists of integers are written as floats
+            assert root["latitude_series/values"].dtype == np.float64
+            temperatures = root["temperature_dataset/temperatures_in_K/values"]
+            assert temperatures.dtype == np.float32
+            np.testing.assert_array_equal(temperatures[:], expected_temperatures)
+            days = root["temperature_dataset/day_in_d/values"]
+            assert days.dtype == np.int32
+            np.testing.assert_array_equal(days[:], [0, 1])
+
+    YamlNumpyDumper().dumps(container, schemaview, output_dir=tmp_path)
+    assert np.load(tmp_path / "my_latitude.values.npy").dtype == np.float64
+    temperatures = np.load(tmp_path / "my_temperature.temperatures_in_K.values.npy")
+    np.testing.assert_array_equal(temperatures, expected_temperatures)
+    np.testing.assert_array_equal(np.load(tmp_path / "my_temperature.day_in_d.values.npy"), [0, 1])
+
+
+def test_dumpers_dask_inputs(tmp_path):
+    """Test dumping Dask arrays chunk by chunk."""
+    da = pytest.importorskip("dask.array")
+    container = _create_container()
+    schemaview = SchemaView(INPUT_DIR / "temperature_schema.yaml")
+    values = np.arange(8, dtype=np.float32).reshape((2, 2, 2))
+    # construct without validation so that the Dask array is not converted to lists
+    container.temperature_dataset.temperatures_in_K = TemperaturesInKMatrix.model_construct(
+        conversion_factor=1000.0, values=da.from_array(values, chunks=(1, 2, 1))
+    )
+
+    Hdf5Dumper().dumps(container, schemaview, output_file_path=tmp_path / "container.h5")
+    ZarrDirectoryStoreDumper().dumps(
+        container, schemaview, output_file_path=tmp_path / "container.zarr"
+    )
+    with h5py.File(tmp_path / "container.h5", "r") as f:
+        zarr_root = zarr.open(str(tmp_path / "container.zarr"), mode="r")
+        for root in (f, zarr_root):
+            temperatures = root["temperature_dataset/temperatures_in_K/values"]
+            assert temperatures.dtype == np.float32
+            np.testing.assert_array_equal(temperatures[:], values)
+        # the Zarr chunks default to those of the Dask array
+        assert zarr_root["temperature_dataset/temperatures_in_K/values"].chunks == (1, 2, 1)
+
+    YamlNumpyDumper().dumps(container, schemaview, output_dir=tmp_path)
+    temperatures = np.load(tmp_path / "my_temperature.temperatures_in_K.values.npy")
+    np.testing.assert_array_equal(temperatures, values)
@@ -0,0 +1 @@
+"""Tests for loading the objects of collections one at a time."""
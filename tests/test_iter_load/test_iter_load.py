@@ -0,0 +1,199 @@
+"""Test loading the objects of collections one at a time with iter_load."""
+
+import io
+import subprocess
+import sys
+import textwrap
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import h5py
+import numpy as np
+import pytest
+from linkml_runtime import SchemaView
+from pydantic import BaseModel
+
+from linkml_arrays.dumpers import (
+    Hdf5Dumper,
+    YamlDumper,
+    YamlHdf5Dumper,
+    YamlNumpyDumper,
+    ZarrDirectoryStoreDumper,
+)
+from linkml_arrays.lazy_array import LazyArray
+from linkml_arrays.loaders import (
+    Hdf5Loader,
+    YamlArrayFileLoader,
+    YamlLoader,
+    ZarrDirectoryStoreLoader,
+)
+
+INPUT_DIR = Path(__file__).parent.parent / "input"
+
+
+class Batch(BaseModel):
+    """A batch of measurements."""
+
+    label: Optional[str] = None
+    values: List[float]
+
+
+class Station(BaseModel):
+    """A station with its readings."""
+
+    id: str
+    readings: List[float]
+
+
+class Survey(BaseModel):
+    """A survey with batches of measurements taken at stations."""
+
+    name: str
+    batches: Optional[List[Batch]] = None
+    stations: Optional[Dict[str, Station]] = None
+
+
+def _create_survey() -> Survey:
+    return Survey(
+        name="my_survey",
+        batches=[Batch(label=f"batch {i}", values=[float(i)] * (i + 1)) for i in range(12)],
+        stations={
+            "north": Station(id="north", readings=[1.0, 2.0]),
+            "south": Station(id="south", readings=[3.0]),
+        },
+    )
+
+
+def _dump(survey: Survey, schemaview: SchemaView, format: str, tmp_path: Path):
+    """Dump the survey in the format and return its source for the loaders."""
+    if format == "yaml":
+        return YamlDumper().dumps(survey, schemaview=schemaview)
+    if format == "hdf5":
+        source = tmp_path / "my_survey.h5"
+        Hdf5Dumper().dumps(survey, schemaview=schemaview, output_file_path=source)
+        return source
+    source = tmp_path / "my_survey.zarr"
+    ZarrDirectoryStoreDumper().dumps(survey, schemaview=schemaview, output_file_path=source)
+    return source
+
+
+LOADERS = {"yaml": YamlLoader, "hdf5": Hdf5Loader, "zarr": ZarrDirectoryStoreLoader}
+
+
+@pytest.mark.parametrize("format", LOADERS)
+def test_iter_load(format, tmp_path):
+    """Test that iter_load yields the objects of collections in order and load round-trips them."""
+    schemaview = SchemaView(INPUT_DIR / "collection_schema.yaml")
+    survey = _create_survey()
+    source = _dump(survey, schemaview, format, tmp_path)
+    with ExitStack() as stack:
+        loader = LOADERS[format]()
+        if isinstance(loader, Hdf5Loader):
+            stack.enter_context(loader)
+
+        batches = loader.iter_load(
+            source, target_class=Survey, schemaview=schemaview, path="batches"
+        )
+        assert not isinstance(batches, list)
+        assert list(batches) == survey.batches
+
+        stations = list(
+            loader.iter_load(source, target_class=Survey, schemaview=schemaview, path="stations")
+        )
+        assert sorted(stations, key=lambda station: station.id) == list(survey.stations.values())
+
+        assert loader.load(source, target_class=Survey, schemaview=schemaview) == survey
+    assert len(h5py.h5f.get_obj_ids(types=h5py.h5f.OBJ_FILE)) == 0
+
+
+@pytest.mark.parametrize("dumper_class", [YamlNumpyDumper, YamlHdf5Dumper])
+def test_yaml_array_file_collections(dumper_class, tmp_path):
+    """Test dumping collections to YAML + array files and loading their arrays memory-mapped."""
+    schemaview = SchemaView(INPUT_DIR / "collection_schema.yaml")
+    survey = _create_survey()
+    read_yaml = dumper_class().dumps(survey, schemaview=schemaview, output_dir=tmp_path)
+    loader = YamlArrayFileLoader()
+    assert loader.loads(read_yaml, target_class=Survey, schemaview=schemaview) == survey
+
+    if dumper_class is YamlNumpyDumper:
+        # memory-mapped arrays in collections are not converted to lists by validation
+        loaded = loader.loads(read_yaml, target_class=Survey, schemaview=schemaview, mmap_mode="r")
+        assert isinstance(loaded.stations["south"].readings, np.memmap)
+        survey.stations = None
+        read_yaml = dumper_class().dumps(survey, schemaview=schemaview, output_dir=tmp_path)
+        loaded = loader.loads(read_yaml, target_class=Survey, schemaview=schemaview, mmap_mode="r")
+        assert isinstance(loaded.batches[11].values, np.memmap)
+        np.testing.assert_array_equal(loaded.batches[11].values, survey.batches[11].values)
+
+
+def test_yaml_loader_iter_load_stream():
+    """Test that a keyed collection is streamed from a file and keys become identifiers."""
+    schemaview = SchemaView(INPUT_DIR / "collection_schema.yaml")
+    source = io.StringIO(
+        "name: my_survey\n"
+        "stations:\n"
+        "  north:\n"
+        "    readings: [1.0, 2.0]\n"
+        "  south:\n"
+        "    readings: [3.0]\n"
+        "batches:\n"
+        "  - values: [0.0]\n"
+    )
+    stations = YamlLoader().iter_load(
+        source, target_class=Survey, schemaview=schemaview, path="stations"
+    )
+    assert next(stations) == Station(id="north", readings=[1.0, 2.0])
+    assert list(stations) == [Station(id="south", readings=[3.0])]
+
+
+def test_hdf5_loader_iter_load_lazy(tmp_path):
+    """Test that objects are loaded lazily and the file is closed with the loader."""
+    schemaview = SchemaView(INPUT_DIR / "collection_schema.yaml")
+    source = _dump(_create_survey(), schemaview, "hdf5", tmp_path)
+    with Hdf5Loader() as loader:
+        batches = loader.iter_load(
+            source, target_class=Survey, schemaview=schemaview, path="batches", lazy=True
+        )
+        batch = next(batches)
+        assert isinstance(batch.values, LazyArray)
+        batches.close()
+        np.testing.assert_array_equal(batch.values[:], [0.0])
+    assert len(h5py.h5f.get_obj_ids(types=h5py.h5f.OBJ_FILE)) == 0
+
+
+def test_iter_load_invalid_path(tmp_path):
+    """Test that iter_load raises an error for a path that is not a collection."""
+    schemaview = SchemaView(INPUT_DIR / "collection_schema.yaml")
+    source = _dump(_create_survey(), schemaview, "yaml", tmp_path)
+    with pytest.raises(ValueError, match="not a multivalued slot of objects"):
+        next(
+            YamlLoader().iter_load(source, target_class=Survey, schemaview=schemaview, path="name")
+        )
+    with pytest.raises(ValueError, match="not a single-valued slot of an object"):
+        next(
+            YamlLoader().iter_load(
+                source, target_class=Survey, schemaview=schemaview, path="batches/values"
+            )
+        )
+
+
+def test_yaml_loader_iter_load_without_libyaml():
+    """Test that the loaders import and stream with PyYAML built without LibYAML."""
+    # run in a fresh process, so that the modules are imported after LibYAML is removed
+    script = textwrap.dedent("""
+        import yaml
+
+        for name in ("CSafeLoader", "CLoader", "CDumper", "CSafeDumper", "CParser", "CEmitter"):
+            if hasattr(yaml, name):
+                delattr(yaml, name)
+        yaml.__with_libyaml__ = False
+
+        import linkml_arrays.loaders  # noqa: F401
+        from linkml_arrays.yaml_backend import iter_yaml_collection, resolve_yaml_backend
+
+        assert resolve_yaml_backend("auto") == "pyyaml"
+        items = iter_yaml_collection("batches:\\n  - {values: [0.0]}\\n", ["batches"])
+        assert list(items) == [(None, {"values": [0.0]})]
+        """)
+    subprocess.run([sys.executable, "-c", script], check=True)
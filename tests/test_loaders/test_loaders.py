@@ -1,16 +1,29 @@
 """Test loading data from various file formats into pydantic models with arrays as LoLs."""
 
+import asyncio
+import gc
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
 from pathlib import Path
 
+import h5py
+import numpy as np
+import pytest
 from hbreader import hbread
 from linkml_runtime import SchemaView
 
+from linkml_arrays.dumpers import YamlHdf5Dumper, YamlNumpyDumper
+from linkml_arrays.lazy_array import LazyArray
 from linkml_arrays.loaders import (
+    FileHandlePool,
     Hdf5Loader,
     YamlArrayFileLoader,
     YamlLoader,
     ZarrDirectoryStoreLoader,
 )
+from linkml_arrays.yaml_backend import has_libyaml, yaml_dump, yaml_load
 from tests.array_classes_lol import (
     Container,
     DateSeries,
@@ -20,6 +33,7 @@ from tests.array_classes_lol import (
     TemperatureDataset,
     TemperaturesInKMatrix,
 )
+from tests.test_dumpers.test_dumpers import _create_container
 
 
 def _check_container(container: Container):
@@ -66,6 +80,53 @@ def test_yaml_loader():
     _check_container(container)
 
 
+@pytest.mark.parametrize("yaml_backend", ["libyaml", "pyyaml", "ruamel"])
+def test_yaml_loader_backends(yaml_backend):
+    """Test YamlLoader loading pydantic classes from YAML arrays with each YAML backend."""
+    if yaml_backend == "libyaml" and not has_libyaml():
+        pytest.skip("PyYAML was not built with LibYAML")
+    data_yaml = hbread("container_yaml.yaml", base_path=str(Path(__file__) / "../../input"))
+    schemaview = SchemaView(Path(__file__) / "../../input/temperature_schema.yaml")
+    container = YamlLoader().loads(
+        data_yaml, target_class=Container, schemaview=schemaview, yaml_backend=yaml_backend
+    )
+    _check_container(container)
+
+    with pytest.raises(ValueError, match="Unsupported YAML backend"):
+        YamlLoader().loads(
+            data_yaml, target_class=Container, schemaview=schemaview, yaml_backend="c"
+        )
+
+
+def test_yaml_loader_base64():
+    """Test YamlLoader loading pydantic classes from YAML arrays encoded as base64 bytes."""
+    data_yaml = hbread("container_yaml_base64.yaml", base_path=str(Path(__file__) / "../../input"))
+    schemaview = SchemaView(Path(__file__) / "../../input/temperature_schema.yaml")
+    container = YamlLoader().loads(data_yaml, target_class=Container, schemaview=schemaview)
+    _check_container(container)
+
+
+@pytest.mark.parametrize("base64_strings", [False, True])
+def test_yaml_loader_base64_writeable(base64_strings, monkeypatch):
+    """Test that arrays decoded from !!binary scalars and base64 strings are writeable."""
+    # decode base64 strings in small chunks, split within the lines of the scalars
+    monkeypatch.setattr("linkml_arrays.binary_array._BASE64_CHUNK_SIZE", 8)
+    data_yaml = hbread("container_yaml_base64.yaml", base_path=str(Path(__file__) / "../../input"))
+    if base64_strings:
+        data_yaml = data_yaml.replace("!!binary ", "")
+    schemaview = SchemaView(Path(__file__) / "../../input/temperature_schema.yaml")
+    container = YamlLoader().loads(
+        data_yaml, target_class=Container, schemaview=schemaview, validate=False
+    )
+    temperatures = container.temperature_dataset.temperatures_in_K.values
+    assert isinstance(temperatures, np.ndarray)
+    assert temperatures.flags.writeable
+    np.testing.assert_array_equal(temperatures, [[[0, 1], [2, 3]], [[4, 5], [6, 7]]])
+    np.testing.assert_array_equal(
+        container.temperature_dataset.date.values, ["2020-01-01", "2020-01-02"]
+    )
+
+
 def test_yaml_array_file_loader_numpy():
     """Test loading of pydantic-style classes from YAML + Numpy arrays."""
     read_yaml = hbread("container_yaml_numpy.yaml", base_path=str(Path(__file__) / "../../input"))
@@ -76,6 +137,84 @@ def test_yaml_array_file_loader_numpy():
     _check_container(container)
 
 
+def test_yaml_array_file_loader_numpy_mmap():
+    """Test loading of pydantic-style classes from YAML + memory-mapped Numpy arrays."""
+    read_yaml = hbread("container_yaml_numpy.yaml", base_path=str(Path(__file__) / "../../input"))
+    schemaview = SchemaView(Path(__file__) / "../../input/temperature_schema.yaml")
+    container = YamlArrayFileLoader().loads(
+        read_yaml, target_class=Container, schemaview=schemaview, mmap_mode="r"
+    )
+    temperatures = container.temperature_dataset.temperatures_in_K.values
+    assert isinstance(temperatures, np.memmap)
+    assert not temperatures.flags.writeable
+    np.testing.assert_array_equal(temperatures, [[[0, 1], [2, 3]], [[4, 5], [6, 7]]])
+    assert container.temperature_dataset.day_in_d.reference_date == "2020-01-01"
+
+    with pytest.raises(ValueError, match="unsupported mmap_mode"):
+        YamlArrayFileLoader().loads(
+            read_yaml, target_class=Container, schemaview=schemaview, mmap_mode="w+"
+        )
+
+
+def test_yaml_array_file_loader_source_mmap_mode(tmp_path):
+    """Test that the mmap_mode of a source entry overrides the mmap_mode of the call."""
+    schemaview = SchemaView(Path(__file__) / "../../input/temperature_schema.yaml")
+    read_yaml = YamlNumpyDumper().dumps(
+        _create_container(), schemaview=schemaview, output_dir=tmp_path
+    )
+    input_dict = yaml_load(read_yaml)
+    source = input_dict["temperature_dataset"]["temperatures_in_K"]["values"]["source"][0]
+
+    source["mmap_mode"] = "r"
+    container = YamlArrayFileLoader().loads(
+        yaml_dump(input_dict), target_class=Container, schemaview=schemaview
+    )
+    assert isinstance(container.temperature_dataset.temperatures_in_K.values, np.memmap)
+    assert not isinstance(container.latitude_series.values, np.memmap)
+
+    source["mmap_mode"] = None
+    container = YamlArrayFileLoader().loads(
+        yaml_dump(input_dict), target_class=Container, schemaview=schemaview, mmap_mode="r"
+    )
+    assert not isinstance(container.temperature_dataset.temperatures_in_K.values, np.memmap)
+    assert isinstance(container.latitude_series.values, np.memmap)
+    np.testing.assert_array_equal(
+        container.temperature_dataset.temperatures_in_K.values,
+        [[[0, 1], [2, 3]], [[4, 5], [6, 7]]],
+    )
+
+
+def test_yaml_array_file_loader_copy_on_write(tmp_path):
+    """Test that arrays memory-mapped copy-on-write can be modified without modifying the file."""
+    schemaview = SchemaView(Path(__file__) / "../../input/temperature_schema.yaml")
+    read_yaml = YamlNumpyDumper().dumps(
+        _create_container(), schemaview=schemaview, output_dir=tmp_path
+    )
+    file_bytes = {path: path.read_bytes() for path in tmp_path.iterdir()}
+    container = YamlArrayFileLoader().loads(
+        read_yaml, target_class=Container, schemaview=schemaview, mmap_mode="c"
+    )
+    temperatures = container.temperature_dataset.temperatures_in_K.values
+    assert isinstance(temperatures, np.memmap)
+    assert temperatures.flags.writeable
+    temperatures[...] = -1
+    temperatures.flush()
+    np.testing.assert_array_equal(temperatures, np.full((2, 2, 2), -1))
+    del container, temperatures
+    gc.collect()
+    assert {path: path.read_bytes() for path in tmp_path.iterdir()} == file_bytes
+
+
+def test_yaml_array_file_loader_parallel():
+    """Test loading of pydantic-style classes from YAML + Numpy arrays read concurrently."""
+    read_yaml = hbread("container_yaml_numpy.yaml", base_path=str(Path(__file__) / "../../input"))
+    schemaview = SchemaView(Path(__file__) / "../../input/temperature_schema.yaml")
+    container = YamlArrayFileLoader().loads(
+        read_yaml, target_class=Container, schemaview=schemaview, max_workers=4
+    )
+    _check_container(container)
+
+
 def test_yaml_array_file_loader_hdf5():
     """Test loading of pydantic-style classes from YAML + HDF5 arrays."""
     read_yaml = hbread("container_yaml_hdf5.yaml", base_path=str(Path(__file__) / "../../input"))
@@ -86,6 +225,114 @@ def test_yaml_array_file_loader_hdf5():
     _check_container(container)
 
 
+@pytest.mark.parametrize("dumper_class", [YamlNumpyDumper, YamlHdf5Dumper])
+def test_yaml_array_file_loader_consolidated(tmp_path, dumper_class):
+    """Test loading of pydantic-style classes from YAML + arrays in a single file."""
+    schemaview = SchemaView(Path(__file__) / "../../input/temperature_schema.yaml")
+    read_yaml = dumper_class().dumps(
+        _create_container(), schemaview=schemaview, output_dir=tmp_path, consolidated=True
+    )
+    container = YamlArrayFileLoader().loads(
+        read_yaml, target_class=Container, schemaview=schemaview, max_workers=4
+    )
+    _check_container(container)
+
+
+def test_yaml_array_file_loader_consolidated_mmap(tmp_path):
+    """Test loading of pydantic-style classes from YAML + memory-mapped arrays in an .npz file."""
+    schemaview = SchemaView(Path(__file__) / "../../input/temperature_schema.yaml")
+    read_yaml = YamlNumpyDumper().dumps(
+        _create_container(), schemaview=schemaview, output_dir=tmp_path, consolidated=True
+    )
+    container = YamlArrayFileLoader().loads(
+        read_yaml, target_class=Container, schemaview=schemaview, mmap_mode="r"
+    )
+    temperatures = container.temperature_dataset.temperatures_in_K.values
+    assert isinstance(temperatures, np.memmap)
+    np.testing.assert_array_equal(temperatures, [[[0, 1], [2, 3]], [[4, 5], [6, 7]]])
+    np.testing.assert_array_equal(container.temperature_dataset.day_in_d.values, [0, 1])
+    assert container.temperature_dataset.date.values.tolist() == ["2020-01-01", "2020-01-02"]
+
+
+def test_yaml_array_file_loader_file_pool(tmp_path):
+    """Test sharing open files across loads through a bounded pool of file handles."""
+    schemaview = SchemaView(Path(__file__) / "../../input/temperature_schema.yaml")
+    read_yaml = YamlHdf5Dumper().dumps(
+        _create_container(), schemaview=schemaview, output_dir=tmp_path, consolidated=True
+    )
+    other_yaml = YamlNumpyDumper().dumps(
+        _create_container(), schemaview=schemaview, output_dir=tmp_path, consolidated=True
+    )
+
+    with YamlArrayFileLoader(FileHandlePool(max_size=1)) as loader:
+        for _ in range(2):
+            _check_container(loader.loads(read_yaml, target_class=Container, schemaview=schemaview))
+            assert len(loader.file_pool) == 1
+        with loader.file_pool.open(tmp_path / "my_container.h5", "hdf5") as f:
+            assert f.id.valid
+        _check_container(loader.loads(other_yaml, target_class=Container, schemaview=schemaview))
+        # the least recently used HDF5 file was closed to open the .npz file
+        assert len(loader.file_pool) == 1
+        assert not f.id.valid
+    assert len(loader.file_pool) == 0
+
+    with pytest.raises(ValueError, match="at least 1"):
+        FileHandlePool(max_size=0)
+
+    # a file in use when the pool is closed is closed once it is no longer in use
+    pool = FileHandlePool()
+    with pool.open(tmp_path / "my_container.h5", "hdf5") as f:
+        pool.close()
+        assert len(pool) == 0
+        assert f.id.valid
+    assert not f.id.valid
+
+
+def _open_file_ids(file: Path) -> int:
+    """Return the number of open h5py file identifiers of a file."""
+    ids = h5py.h5f.get_obj_ids(types=h5py.h5f.OBJ_FILE)
+    return sum(
+        1
+        for file_id in ids
+        if os.path.realpath(os.fsdecode(file_id.name)) == os.path.realpath(file)
+    )
+
+
+def _touch(file: Path):
+    """Change the modification time of a file, so that a pool reopens it."""
+    stat = os.stat(file)
+    os.utime(file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+def test_file_handle_pool_modified_file(tmp_path):
+    """Test that stale handles of modified files are closed once no array reads from them."""
+    file = tmp_path / "my_container.h5"
+    with h5py.File(file, "w") as f:
+        f.create_dataset("data", data=np.arange(4))
+
+    with FileHandlePool(max_size=1) as pool:
+        for _ in range(5):
+            _touch(file)
+            with pool.open(file, "hdf5") as f:
+                np.testing.assert_array_equal(f["data"][()], np.arange(4))
+            assert len(pool) == 1
+            assert _open_file_ids(file) == 1
+
+        # a handle that an array reads from is kept open until the array is garbage collected
+        with pool.open(file, "hdf5") as f:
+            array = LazyArray(f["data"])
+            pool.keep_open(f, array)
+        _touch(file)
+        with pool.open(file, "hdf5"):
+            pass
+        assert _open_file_ids(file) == 2
+        np.testing.assert_array_equal(array[:], np.arange(4))
+        del array
+        gc.collect()
+        assert _open_file_ids(file) == 1
+    assert _open_file_ids(file) == 0
+
+
 def test_hdf5_loader():
     """Test loading of pydantic-style classes from HDF5 datasets."""
     file_path = str(Path(__file__).parent.parent / "input" / "my_container.h5")
@@ -94,6 +341,34 @@ def test_hdf5_loader():
     _check_container(container)
 
 
+def test_hdf5_loader_lazy():
+    """Test lazy loading of pydantic-style classes from HDF5 datasets."""
+    file_path = str(Path(__file__).parent.parent / "input" / "my_container.h5")
+    schemaview = SchemaView(Path(__file__) / "../../input/temperature_schema.yaml")
+    with Hdf5Loader() as loader:
+        container = loader.loads(
+            file_path, target_class=Container, schemaview=schemaview, lazy=True
+        )
+        assert container.name == "my_container"
+        assert container.temperature_dataset.day_in_d.reference_date == "2020-01-01"
+
+        temperatures = container.temperature_dataset.temperatures_in_K.values
+        assert isinstance(temperatures, LazyArray)
+        assert temperatures.shape == (2, 2, 2)
+        np.testing.assert_array_equal(temperatures[1, :, 0], [4, 6])
+        np.testing.assert_array_equal(
+            np.asarray(temperatures), [[[0, 1], [2, 3]], [[4, 5], [6, 7]]]
+        )
+        np.testing.assert_array_equal(
+            container.temperature_dataset.date.values[:], ["2020-01-01", "2020-01-02"]
+        )
+
+    # the file is closed when the loader is closed, so the dataset identifier is no longer valid.
+    # h5py raises an OSError or a RuntimeError depending on the HDF5 call that fails first
+    with pytest.raises((OSError, RuntimeError), match="identifier is not of specified type"):
+        temperatures[0]
+
+
 def test_zarr_directory_store_loader():
     """Test loading of pydantic-style classes from Zarr arrays."""
     file_path = str(Path(__file__).parent.parent / "input" / "my_container.zarr")
@@ -102,3 +377,309 @@ def test_zarr_directory_store_loader():
         file_path, target_class=Container, schemaview=schemaview
     )
     _check_container(container)
+
+
+def test_zarr_directory_store_loader_lazy():
+    """Test lazy loading of pydantic-style classes from Zarr arrays."""
+    file_path = str(Path(__file__).parent.parent / "input" / "my_container.zarr")
+    schemaview = SchemaView(Path(__file__) / "../../input/temperature_schema.yaml")
+    container = ZarrDirectoryStoreLoader().loads(
+        file_path, target_class=Container, schemaview=schemaview, lazy=True
+    )
+    assert container.name == "my_container"
+    assert container.temperature_dataset.day_in_d.reference_date == "2020-01-01"
+
+    temperatures = container.temperature_dataset.temperatures_in_K.values
+    assert isinstance(temperatures, LazyArray)
+    assert temperatures.shape == (2, 2, 2)
+    assert temperatures.chunks is not None
+    np.testing.assert_array_equal(temperatures[1, :, 0], [4, 6])
+    np.testing.assert_array_equal(np.asarray(temperatures), [[[0, 1], [2, 3]], [[4, 5], [6, 7]]])
+    np.testing.assert_array_equal(
+        container.temperature_dataset.date.values[:], ["2020-01-01", "2020-01-02"]
+    )
+
+
+@pytest.mark.parametrize(
+    "loader_class,file_name",
+    [(Hdf5Loader, "my_container.h5"), (ZarrDirectoryStoreLoader, "my_container.zarr")],
+)
+def test_loader_include_exclude(loader_class, file_name):
+    """Test loading only the slots selected by include and exclude slot path patterns."""
+    file_path = str(Path(__file__).parent.parent / "input" / file_name)
+    schemaview = SchemaView(Path(__file__) / "../../input/temperature_schema.yaml")
+    container = loader_class().loads(
+        file_path,
+        target_class=Container,
+        schemaview=schemaview,
+        include=["temperature_dataset.temperatures_in_K", "*/name"],
+        exclude=["*/temperatures_in_K/conversion_factor"],
+    )
+    # the root has no slot at a path matched by "*/name"
+    assert container.model_fields_set == {
+        "latitude_series",
+        "longitude_series",
+        "temperature_dataset",
+    }
+    assert container.latitude_series.model_fields_set == {"name"}
+    temperature_dataset = container.temperature_dataset
+    assert temperature_dataset.model_fields_set == {"name", "temperatures_in_K"}
+    assert temperature_dataset.name == "my_temperature"
+    assert temperature_dataset.temperatures_in_K.model_fields_set == {"values"}
+    np.testing.assert_array_equal(
+        temperature_dataset.temperatures_in_K.values, [[[0, 1], [2, 3]], [[4, 5], [6, 7]]]
+    )
+
+    container = loader_class().loads(
+        file_path, target_class=Container, schemaview=schemaview, exclude=["temperature_dataset"]
+    )
+    assert container.name == "my_container"
+    assert container.model_fields_set == {"name", "latitude_series", "longitude_series"}
+
+
+SELECTIONS = {
+    "DaysInDSinceSeries.values": slice(-1, None),
+    "temperature_dataset/temperatures_in_K/values": (Ellipsis, [1]),
+    "LatitudeInDegSeries.values": ([1, 0, 1], [True, False]),
+}
+
+
+def _check_selected_container(container: Container):
+    """Check the arrays of the test container selected by SELECTIONS."""
+    np.testing.assert_array_equal(container.temperature_dataset.day_in_d.values, [1])
+    np.testing.assert_array_equal(
+        container.temperature_dataset.temperatures_in_K.values, [[[1], [3]], [[5], [7]]]
+    )
+    np.testing.assert_array_equal(container.latitude_series.values, [[3], [1], [3]])
+    np.testing.assert_array_equal(container.longitude_series.values, [[5, 6], [7, 8]])
+
+
+@pytest.mark.parametrize(
+    "loader_class,file_name",
+    [(Hdf5Loader, "my_container.h5"), (ZarrDirectoryStoreLoader, "my_container.zarr")],
+)
+def test_loader_selections(loader_class, file_name):
+    """Test loading only the selected elements of arrays from HDF5 datasets and Zarr arrays."""
+    file_path = str(Path(__file__).parent.parent / "input" / file_name)
+    schemaview = SchemaView(Path(__file__) / "../../input/temperature_schema.yaml")
+    container = loader_class().loads(
+        file_path, target_class=Container, schemaview=schemaview, selections=SELECTIONS
+    )
+    _check_selected_container(container)
+
+
+@pytest.mark.parametrize("dumper_class", [YamlNumpyDumper, YamlHdf5Dumper])
+@pytest.mark.parametrize("consolidated", [False, True])
+def test_yaml_array_file_loader_selections(tmp_path, dumper_class, consolidated):
+    """Test loading only the selected elements of arrays from YAML + array files."""
+    schemaview = SchemaView(Path(__file__) / "../../input/temperature_schema.yaml")
+    read_yaml = dumper_class().dumps(
+        _create_container(), schemaview=schemaview, output_dir=tmp_path, consolidated=consolidated
+    )
+    container = YamlArrayFileLoader().loads(
+        read_yaml, target_class=Container, schemaview=schemaview, selections=SELECTIONS
+    )
+    _check_selected_container(container)
+
+    with pytest.raises(ValueError, match="out of bounds"):
+        YamlArrayFileLoader().loads(
+            read_yaml,
+            target_class=Container,
+            schemaview=schemaview,
+            selections={"DaysInDSinceSeries.values": [2]},
+        )
+
+
+@pytest.mark.parametrize("format", ["hdf5", "yaml_hdf5"])
+def test_loader_selections_strings(tmp_path, format):
+    """Test that selected strings of HDF5 datasets are loaded as str, like unselected ones."""
+    # without validation, so that pydantic does not convert bytes to str
+    schemaview = SchemaView(Path(__file__) / "../../input/temperature_schema.yaml")
+    if format == "hdf5":
+        loader = Hdf5Loader()
+        source = str(Path(__file__).parent.parent / "input" / "my_container.h5")
+    else:
+        loader = YamlArrayFileLoader()
+        source = YamlHdf5Dumper().dumps(
+            _create_container(), schemaview=schemaview, output_dir=tmp_path, consolidated=True
+        )
+    with loader:
+        container = loader.loads(
+            source,
+            target_class=Container,
+            schemaview=schemaview,
+            selections={"DateSeries.values": [1]},
+            validate=False,
+        )
+    dates = container.temperature_dataset.date.values
+    np.testing.assert_array_equal(dates, ["2020-01-02"])
+    assert all(isinstance(date, str) for date in dates)
+
+
+@pytest.mark.parametrize(
+    "loader_class,file_name",
+    [(Hdf5Loader, "my_container.h5"), (ZarrDirectoryStoreLoader, "my_container.zarr")],
+)
+def test_loader_as_dask(loader_class, file_name):
+    """Test loading arrays from HDF5 datasets and Zarr arrays as Dask arrays."""
+    da = pytest.importorskip("dask.array")
+    file_path = str(Path(__file__).parent.parent / "input" / file_name)
+    schemaview = SchemaView(Path(__file__) / "../../input/temperature_schema.yaml")
+    with ExitStack() as stack:
+        loader = loader_class()
+        if isinstance(loader, Hdf5Loader):
+            # the file of the Dask arrays stays open until the loader is closed
+            stack.enter_context(loader)
+        container = loader.loads(
+            file_path, target_class=Container, schemaview=schemaview, as_dask=True
+        )
+        temperatures = container.temperature_dataset.temperatures_in_K.values
+        assert isinstance(temperatures, da.Array)
+        assert temperatures.shape == (2, 2, 2)
+        np.testing.assert_array_equal(
+            (temperatures + 1).compute(), [[[1, 2], [3, 4]], [[5, 6], [7, 8]]]
+        )
+        np.testing.assert_array_equal(
+            container.temperature_dataset.date.values.compute(), ["2020-01-01", "2020-01-02"]
+        )
+
+
+@pytest.mark.parametrize(
+    "loader_class,file_name",
+    [
+        (YamlLoader, "container_yaml_base64.yaml"),
+        (YamlArrayFileLoader, "container_yaml_hdf5.yaml"),
+        (Hdf5Loader, "my_container.h5"),
+        (ZarrDirectoryStoreLoader, "my_container.zarr"),
+    ],
+)
+def test_loader_without_validation(loader_class, file_name):
+    """Test that loads without validation keep the arrays that were read as NumPy arrays."""
+    file_path = Path(__file__).parent.parent / "input" / file_name
+    source = file_path.read_text() if file_path.suffix == ".yaml" else str(file_path)
+    schemaview = SchemaView(Path(__file__) / "../../input/temperature_schema.yaml")
+    container = loader_class().loads(
+        source, target_class=Container, schemaview=schemaview, validate=False
+    )
+    assert isinstance(container, Container)
+    assert isinstance(container.temperature_dataset, TemperatureDataset)
+    assert container.temperature_dataset.latitude_in_deg == "my_latitude"
+    temperatures = container.temperature_dataset.temperatures_in_K.values
+    assert isinstance(temperatures, np.ndarray)
+    np.testing.assert_array_equal(temperatures, [[[0, 1], [2, 3]], [[4, 5], [6, 7]]])
+    np.testing.assert_array_equal(
+        container.temperature_dataset.date.values, ["2020-01-01", "2020-01-02"]
+    )
+
+
+@pytest.mark.parametrize("dumper_class", [YamlNumpyDumper, YamlHdf5Dumper])
+@pytest.mark.parametrize("consolidated", [False, True])
+def test_yaml_array_file_loader_as_dask(tmp_path, dumper_class, consolidated):
+    """Test loading arrays from NumPy and HDF5 files as Dask arrays."""
+    da = pytest.importorskip("dask.array")
+    schemaview = SchemaView(Path(__file__) / "../../input/temperature_schema.yaml")
+    read_yaml = dumper_class().dumps(
+        _create_container(), schemaview=schemaview, output_dir=tmp_path, consolidated=consolidated
+    )
+    with YamlArrayFileLoader() as loader:
+        container = loader.loads(
+            read_yaml, target_class=Container, schemaview=schemaview, as_dask=True
+        )
+        temperatures = container.temperature_dataset.temperatures_in_K.values
+        assert isinstance(temperatures, da.Array)
+        np.testing.assert_array_equal(temperatures.sum(axis=0).compute(), [[4, 6], [8, 10]])
+        np.testing.assert_array_equal(container.latitude_series.values.compute(), [[1, 2], [3, 4]])
+
+
+def test_yaml_array_file_loader_as_dask_modified_file(tmp_path):
+    """Test that Dask arrays of a load can be computed after their file is reopened by a load."""
+    da = pytest.importorskip("dask.array")
+    schemaview = SchemaView(Path(__file__) / "../../input/temperature_schema.yaml")
+    read_yaml = YamlHdf5Dumper().dumps(
+        _create_container(), schemaview=schemaview, output_dir=tmp_path, consolidated=True
+    )
+    with YamlArrayFileLoader() as loader:
+        first = loader.loads(read_yaml, target_class=Container, schemaview=schemaview, as_dask=True)
+        _touch(tmp_path / "my_container.h5")
+        second = loader.loads(
+            read_yaml, target_class=Container, schemaview=schemaview, as_dask=True
+        )
+        for container in (first, second):
+            temperatures = container.temperature_dataset.temperatures_in_K.values
+            assert isinstance(temperatures, da.Array)
+            np.testing.assert_array_equal(temperatures.sum(axis=0).compute(), [[4, 6], [8, 10]])
+    assert len(h5py.h5f.get_obj_ids(types=h5py.h5f.OBJ_FILE)) == 0
+
+
+@pytest.mark.parametrize("dumper_class", [YamlNumpyDumper, YamlHdf5Dumper])
+def test_yaml_array_file_loader_base_dir(tmp_path, dumper_class):
+    """Test loading a YAML file and its array files after moving them to another directory."""
+    schemaview = SchemaView(Path(__file__) / "../../input/temperature_schema.yaml")
+    dumper_class().dump(
+        _create_container(),
+        tmp_path / "dump" / "my_container.yaml",
+        schemaview,
+        output_dir=tmp_path / "dump" / "arrays",
+    )
+    moved_dir = (tmp_path / "dump").rename(tmp_path / "moved")
+    container = YamlArrayFileLoader().loads(
+        (moved_dir / "my_container.yaml").read_text(),
+        target_class=Container,
+        schemaview=schemaview,
+        base_dir=moved_dir,
+    )
+    _check_container(container)
+
+
+def test_loaders_aload(tmp_path):
+    """Test loading in an executor from an asyncio event loop."""
+    schemaview = SchemaView(Path(__file__) / "../../input/temperature_schema.yaml")
+    read_yaml = YamlHdf5Dumper().dumps(
+        _create_container(), schemaview=schemaview, output_dir=tmp_path
+    )
+
+    async def load_all():
+        return await asyncio.gather(
+            Hdf5Loader().aload(
+                str(Path(__file__).parent.parent / "input" / "my_container.h5"),
+                Container,
+                schemaview,
+            ),
+            ZarrDirectoryStoreLoader().aload(
+                str(Path(__file__).parent.parent / "input" / "my_container.zarr"),
+                Container,
+                schemaview,
+            ),
+            YamlArrayFileLoader().aload(read_yaml, Container, schemaview),
+        )
+
+    for container in asyncio.run(load_all()):
+        _check_container(container)
+
+
+def test_hdf5_loader_aload_cancel():
+    """Test that the file of a cancelled lazy load is closed once the load has finished."""
+    schemaview = SchemaView(Path(__file__) / "../../input/temperature_schema.yaml")
+    file_path = str(Path(__file__).parent.parent / "input" / "my_container.h5")
+    release = threading.Event()
+
+    async def cancel_load(executor, loader):
+        # the load waits in the executor until the blocking task is released
+        executor.submit(release.wait)
+        task = asyncio.ensure_future(
+            loader.aload(file_path, Container, schemaview, executor=executor, lazy=True)
+        )
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        release.set()
+        # wait for the load to finish and for its done callbacks to run
+        await asyncio.get_running_loop().run_in_executor(executor, lambda: None)
+        for _ in range(3):
+            await asyncio.sleep(0)
+
+    with ThreadPoolExecutor(max_workers=1) as executor, Hdf5Loader() as loader:
+        asyncio.run(cancel_load(executor, loader))
+        assert loader._open_files == []
+    assert len(h5py.h5f.get_obj_ids(types=h5py.h5f.OBJ_FILE)) == 0
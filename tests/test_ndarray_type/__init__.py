@@ -0,0 +1 @@
+"""Tests for the NumPy array slot types of linkml-arrays."""
@@ -0,0 +1,152 @@
+"""Test pydantic models whose array slots are NumPy arrays with each dumper and loader."""
+
+import typing
+from pathlib import Path
+
+import numpy as np
+import pytest
+from linkml_runtime import SchemaView
+from pydantic import ValidationError
+
+from linkml_arrays.dumpers import (
+    Hdf5Dumper,
+    YamlDumper,
+    YamlHdf5Dumper,
+    YamlNumpyDumper,
+    ZarrDirectoryStoreDumper,
+)
+from linkml_arrays.loaders import (
+    Hdf5Loader,
+    YamlArrayFileLoader,
+    YamlLoader,
+    ZarrDirectoryStoreLoader,
+)
+from linkml_arrays.ndarray_type import NDArraySpec, ndarray_type
+from tests.array_classes_numpy import (
+    Container,
+    DateSeries,
+    DaysInDSinceSeries,
+    LatitudeInDegSeries,
+    LongitudeInDegSeries,
+    TemperatureDataset,
+    TemperaturesInKMatrix,
+)
+
+INPUT_DIR = Path(__file__).parent.parent / "input"
+
+
+def _create_container() -> Container:
+    return Container(
+        name="my_container",
+        latitude_series=LatitudeInDegSeries(
+            name="my_latitude", values=np.array([[1.0, 2.0], [3.0, 4.0]])
+        ),
+        longitude_series=LongitudeInDegSeries(
+            name="my_longitude", values=np.array([[5.0, 6.0], [7.0, 8.0]])
+        ),
+        temperature_dataset=TemperatureDataset(
+            name="my_temperature",
+            latitude_in_deg="my_latitude",
+            longitude_in_deg="my_longitude",
+            date=DateSeries(values=np.array(["2020-01-01", "2020-01-02"])),
+            day_in_d=DaysInDSinceSeries(values=np.arange(2), reference_date="2020-01-01"),
+            temperatures_in_K=TemperaturesInKMatrix(
+                conversion_factor=1000.0, values=np.arange(8.0).reshape(2, 2, 2)
+            ),
+        ),
+    )
+
+
+def test_ndarray_type():
+    """Test that the spec of an array slot is derived from the schema."""
+    schemaview = SchemaView(INPUT_DIR / "temperature_schema.yaml")
+    annotation = ndarray_type(schemaview, "TemperaturesInKMatrix", "values")
+    assert typing.get_args(annotation) == (np.ndarray, NDArraySpec("float64", ndim=3))
+    annotation = ndarray_type(schemaview, "DateSeries", "values")
+    assert typing.get_args(annotation) == (np.ndarray, NDArraySpec(ndim=1))
+    with pytest.raises(ValueError, match="not an array slot"):
+        ndarray_type(schemaview, "TemperaturesInKMatrix", "conversion_factor")
+
+
+def test_ndarray_spec_validation():
+    """Test that arrays are validated without copies and lists are converted to arrays."""
+    values = np.zeros((2, 2, 2))
+    assert TemperaturesInKMatrix(values=values).values is values
+    values_float32 = values.astype(np.float32)
+    assert TemperaturesInKMatrix(values=values_float32).values is values_float32
+
+    matrix = TemperaturesInKMatrix(values=[[[0, 1], [2, 3]], [[4, 5], [6, 7]]])
+    assert isinstance(matrix.values, np.ndarray)
+    assert matrix.values.dtype == np.float64
+    assert TemperaturesInKMatrix(values=np.zeros((2, 2, 2), dtype=int)).values.dtype == np.float64
+    assert matrix.model_dump_json() == (
+        '{"conversion_factor":null,"values":[[[0.0,1.0],[2.0,3.0]],[[4.0,5.0],[6.0,7.0]]]}'
+    )
+
+    with pytest.raises(ValidationError, match="fewer than the minimum of 3"):
+        TemperaturesInKMatrix(values=np.zeros((2, 2)))
+    with pytest.raises(ValidationError, match="cannot be cast to float64"):
+        TemperaturesInKMatrix(values=np.full((2, 2, 2), "a"))
+
+    # lists are validated like arrays of the data type that NumPy infers
+    with pytest.raises(ValidationError, match="float64 cannot be cast to int64"):
+        DaysInDSinceSeries(values=[1.5, 2.7], reference_date="2020-01-01")
+    with pytest.raises(ValidationError, match="float64 cannot be cast to int64"):
+        DaysInDSinceSeries(values=np.array([1.5, 2.7]), reference_date="2020-01-01")
+    days = DaysInDSinceSeries(values=[True, 2], reference_date="2020-01-01")
+    assert days.values.dtype == np.int64
+    assert DaysInDSinceSeries(values=[], reference_date="2020-01-01").values.dtype == np.int64
+
+
+def _dump_and_load(format: str, container: Container, schemaview: SchemaView, tmp_path: Path):
+    """Dump the container in the format and load it back."""
+    if format in ("yaml", "yaml_base64"):
+        array_encoding = "base64" if format == "yaml_base64" else None
+        yaml_str = YamlDumper().dumps(container, schemaview, array_encoding=array_encoding)
+        return YamlLoader().loads(yaml_str, target_class=Container, schemaview=schemaview)
+    if format in ("yaml_numpy", "yaml_hdf5"):
+        dumper = YamlNumpyDumper() if format == "yaml_numpy" else YamlHdf5Dumper()
+        dumper.dump(container, tmp_path / "container.yaml", schemaview)
+        return YamlArrayFileLoader().loads(
+            (tmp_path / "container.yaml").read_text(),
+            target_class=Container,
+            schemaview=schemaview,
+            base_dir=tmp_path,
+        )
+    if format == "hdf5":
+        Hdf5Dumper().dumps(container, schemaview, output_file_path=tmp_path / "container.h5")
+        return Hdf5Loader().loads(
+            tmp_path / "container.h5", target_class=Container, schemaview=schemaview
+        )
+    ZarrDirectoryStoreDumper().dumps(
+        container, schemaview, output_file_path=tmp_path / "container.zarr"
+    )
+    return ZarrDirectoryStoreLoader().loads(
+        tmp_path / "container.zarr", target_class=Container, schemaview=schemaview
+    )
+
+
+@pytest.mark.parametrize(
+    "format", ["yaml", "yaml_base64", "yaml_numpy", "yaml_hdf5", "hdf5", "zarr"]
+)
+def test_ndarray_round_trip(format, tmp_path):
+    """Test that NumPy array slots are dumped and loaded back as NumPy arrays."""
+    schemaview = SchemaView(INPUT_DIR / "temperature_schema.yaml")
+    container = _create_container()
+    loaded = _dump_and_load(format, container, schemaview, tmp_path)
+
+    assert isinstance(loaded, Container)
+    assert loaded.temperature_dataset.temperatures_in_K.conversion_factor == 1000.0
+    for expected, actual in [
+        (container.latitude_series, loaded.latitude_series),
+        (container.longitude_series, loaded.longitude_series),
+        (container.temperature_dataset.date, loaded.temperature_dataset.date),
+        (container.temperature_dataset.day_in_d, loaded.temperature_dataset.day_in_d),
+        (
+            container.temperature_dataset.temperatures_in_K,
+            loaded.temperature_dataset.temperatures_in_K,
+        ),
+    ]:
+        assert isinstance(actual.values, np.ndarray)
+        assert actual.values.dtype.kind == expected.values.dtype.kind
+        np.testing.assert_array_equal(actual.values, expected.values)
@@ -0,0 +1 @@
+"""Tests for the schema plan of linkml-arrays."""
@@ -0,0 +1,48 @@
+"""Test precomputing and caching schema lookups in class plans."""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+from linkml_runtime import SchemaView
+from linkml_runtime.linkml_model import ClassDefinition
+
+from linkml_arrays.schema_plan import get_class_plan
+
+INPUT_DIR = Path(__file__).parent.parent / "input"
+
+
+def test_class_plan():
+    """Test that a class plan records array slots, ranges, and the identifier slot."""
+    schemaview = SchemaView(INPUT_DIR / "temperature_schema.yaml")
+
+    plan = get_class_plan(schemaview, "TemperatureDataset")
+    assert plan.identifier_slot == "name"
+    assert not plan.get_slot("temperatures_in_K").is_array
+    assert plan.get_slot("temperatures_in_K").range == "TemperaturesInKMatrix"
+    assert plan.get_range_plan("temperatures_in_K").get_slot("values").is_array
+
+    plan = get_class_plan(schemaview, "TemperaturesInKMatrix")
+    assert plan.identifier_slot is None
+    assert plan.get_slot("values").is_array
+    assert plan.get_slot("values").range == "float"
+    assert plan.get_slot("values").dtype == np.float64
+    assert get_class_plan(schemaview, "DaysInDSinceSeries").get_slot("values").dtype == np.int64
+    assert get_class_plan(schemaview, "DateSeries").get_slot("values").dtype is None
+
+    with pytest.raises(ValueError):
+        get_class_plan(schemaview, "NotAClass")
+
+
+def test_class_plan_cache():
+    """Test that class plans are cached per SchemaView and invalidated when the schema changes."""
+    schemaview = SchemaView(INPUT_DIR / "temperature_schema.yaml")
+    plan = get_class_plan(schemaview, "Container")
+    assert get_class_plan(schemaview, "Container") is plan
+
+    other_schemaview = SchemaView(INPUT_DIR / "temperature_schema.yaml")
+    assert get_class_plan(other_schemaview, "Container") is not plan
+
+    schemaview.add_class(ClassDefinition(name="NewClass"))
+    assert get_class_plan(schemaview, "Container") is not plan
+    assert get_class_plan(schemaview, "NewClass").name == "NewClass"
@@ -0,0 +1 @@
+"""Tests for sharing LinkML models in shared memory."""
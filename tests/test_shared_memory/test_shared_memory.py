@@ -0,0 +1,87 @@
+"""Test sharing the arrays of LinkML models with worker processes through shared memory."""
+
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from linkml_runtime import SchemaView
+
+from linkml_arrays.loaders import Hdf5Loader
+from linkml_arrays.shared_memory import SharedContainer
+from tests.array_classes_lol import Container, TemperaturesInKMatrix
+from tests.test_dumpers.test_dumpers import _create_container
+
+INPUT_DIR = Path(__file__).parent.parent / "input"
+
+
+def _sum_temperatures(shared: SharedContainer) -> float:
+    """Load the shared container in a worker process and sum its temperatures."""
+    container = shared.load()
+    temperatures = container.temperature_dataset.temperatures_in_K.values
+    assert not temperatures.flags.writeable
+    total = float(temperatures.sum())
+    del container, temperatures
+    shared.close()
+    return total
+
+
+def _check_shared_container(container: Container):
+    """Check the arrays of a container loaded from shared memory."""
+    assert isinstance(container, Container)
+    assert container.temperature_dataset.name == "my_temperature"
+    assert container.temperature_dataset.day_in_d.reference_date == "2020-01-01"
+    np.testing.assert_array_equal(container.latitude_series.values, [[1, 2], [3, 4]])
+    np.testing.assert_array_equal(container.longitude_series.values, [[5, 6], [7, 8]])
+    np.testing.assert_array_equal(
+        container.temperature_dataset.date.values, ["2020-01-01", "2020-01-02"]
+    )
+    np.testing.assert_array_equal(container.temperature_dataset.day_in_d.values, [0, 1])
+    np.testing.assert_array_equal(
+        container.temperature_dataset.temperatures_in_K.values,
+        [[[0, 1], [2, 3]], [[4, 5], [6, 7]]],
+    )
+
+
+def test_shared_container():
+    """Test loading a container from shared memory in the creating process."""
+    schemaview = SchemaView(INPUT_DIR / "temperature_schema.yaml")
+    with SharedContainer.create(_create_container(), schemaview) as shared:
+        container = shared.load()
+        _check_shared_container(container)
+        assert isinstance(container.latitude_series.values, np.ndarray)
+        assert container.temperature_dataset.day_in_d.values.dtype == np.int64
+        del container
+
+
+def test_shared_container_lazy():
+    """Test copying a lazily loaded container into shared memory."""
+    schemaview = SchemaView(INPUT_DIR / "temperature_schema.yaml")
+    with Hdf5Loader() as loader:
+        lazy_container = loader.loads(
+            str(INPUT_DIR / "my_container.h5"),
+            target_class=Container,
+            schemaview=schemaview,
+            lazy=True,
+        )
+        shared = SharedContainer.create(lazy_container, schemaview)
+    with shared:
+        container = shared.load()
+        _check_shared_container(container)
+        del container
+
+
+def test_shared_container_workers():
+    """Test that workers load the arrays from shared memory instead of the pickled handle."""
+    schemaview = SchemaView(INPUT_DIR / "temperature_schema.yaml")
+    container = _create_container()
+    values = np.arange(100 * 100 * 10, dtype=np.float64).reshape((100, 100, 10))
+    # construct without validation so that the array is not converted to lists
+    container.temperature_dataset.temperatures_in_K = TemperaturesInKMatrix.model_construct(
+        conversion_factor=1000.0, values=values
+    )
+    with SharedContainer.create(container, schemaview) as shared:
+        assert len(pickle.dumps(shared)) < values.nbytes / 100
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            totals = list(executor.map(_sum_temperatures, [shared] * 4))
+    assert totals == [values.sum()] * 4
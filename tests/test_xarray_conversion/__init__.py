@@ -0,0 +1 @@
+"""Tests for the xarray conversion of linkml-arrays."""
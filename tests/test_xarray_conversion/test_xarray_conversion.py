@@ -0,0 +1,90 @@
+"""Test converting LinkML DataArray objects to and from xarray Datasets."""
+
+from contextlib import ExitStack
+from pathlib import Path
+
+import numpy as np
+import pytest
+from linkml_runtime import SchemaView
+
+from linkml_arrays.loaders import Hdf5Loader, ZarrDirectoryStoreLoader
+from linkml_arrays.xarray_conversion import from_xarray, to_xarray
+from tests.array_classes_lol import (
+    Container,
+    LatitudeInDegSeries,
+    TemperatureDataset,
+    TemperaturesInKMatrix,
+)
+from tests.test_dumpers.test_dumpers import _create_container
+
+INPUT_DIR = Path(__file__).parent.parent / "input"
+
+
+def test_to_xarray():
+    """Test converting a DataArray object to a Dataset with coordinates and data variables."""
+    schemaview = SchemaView(INPUT_DIR / "temperature_schema.yaml")
+    container = _create_container()
+    values = np.arange(8, dtype=np.float32).reshape((2, 2, 2))
+    # construct without validation so that the array is not converted to lists
+    container.temperature_dataset.temperatures_in_K = TemperaturesInKMatrix.model_construct(
+        conversion_factor=1000.0, values=values
+    )
+    ds = to_xarray(container.temperature_dataset, schemaview, root=container)
+
+    assert ds.attrs == {"name": "my_temperature"}
+    temperatures = ds["temperatures_in_K"]
+    assert temperatures.dims == ("x", "y", "date")
+    assert temperatures.attrs == {"conversion_factor": 1000.0}
+    assert np.shares_memory(temperatures.data, values)
+    assert ds["lat"].dims == ("x", "y")
+    assert ds["lat"].attrs == {"name": "my_latitude"}
+    assert ds["day"].attrs == {"reference_date": "2020-01-01"}
+    np.testing.assert_array_equal(ds["lon"], [[5, 6], [7, 8]])
+    np.testing.assert_array_equal(temperatures.sel(date="2020-01-02"), [[1, 3], [5, 7]])
+
+    with pytest.raises(ValueError, match="Cannot resolve reference my_latitude"):
+        to_xarray(container.temperature_dataset, schemaview)
+
+
+def test_from_xarray():
+    """Test converting a Dataset back to a DataArray object and its referenced objects."""
+    schemaview = SchemaView(INPUT_DIR / "temperature_schema.yaml")
+    container = _create_container()
+    ds = to_xarray(container.temperature_dataset, schemaview, root=container)
+    references = dict()
+    temperature_dataset = from_xarray(ds, TemperatureDataset, schemaview, references)
+
+    assert temperature_dataset.name == "my_temperature"
+    assert temperature_dataset.latitude_in_deg == "my_latitude"
+    assert temperature_dataset.temperatures_in_K.conversion_factor == 1000.0
+    assert np.shares_memory(
+        temperature_dataset.temperatures_in_K.values, ds["temperatures_in_K"].data
+    )
+    np.testing.assert_array_equal(temperature_dataset.date.values, ["2020-01-01", "2020-01-02"])
+    assert temperature_dataset.day_in_d.reference_date == "2020-01-01"
+    assert set(references) == {"my_latitude", "my_longitude"}
+    assert isinstance(references["my_latitude"], LatitudeInDegSeries)
+    np.testing.assert_array_equal(references["my_latitude"].values, [[1, 2], [3, 4]])
+
+
+@pytest.mark.parametrize(
+    "loader_class,file_name",
+    [(Hdf5Loader, "my_container.h5"), (ZarrDirectoryStoreLoader, "my_container.zarr")],
+)
+def test_to_xarray_lazy(loader_class, file_name):
+    """Test that a Dataset of a lazily loaded object reads the selected elements from the file."""
+    schemaview = SchemaView(INPUT_DIR / "temperature_schema.yaml")
+    with ExitStack() as stack:
+        loader = loader_class()
+        if isinstance(loader, Hdf5Loader):
+            # the file of a lazy load stays open until the loader is closed
+            stack.enter_context(loader)
+        container = loader.loads(
+            str(INPUT_DIR / file_name), target_class=Container, schemaview=schemaview, lazy=True
+        )
+        ds = to_xarray(container.temperature_dataset, schemaview, root=container)
+        temperatures = ds["temperatures_in_K"]
+        assert not isinstance(temperatures.variable._data, np.ndarray)
+        np.testing.assert_array_equal(temperatures.isel(x=[1, 0], date=1), [[5, 7], [1, 3]])
+        np.testing.assert_array_equal(temperatures.isel(y=slice(None, None, -1))[0, :, 0], [2, 0])
+        np.testing.assert_array_equal(ds["lat"], [[1, 2], [3, 4]])